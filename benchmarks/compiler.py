@@ -0,0 +1,137 @@
+import argparse
+import time
+from io import StringIO
+from pathlib import Path
+
+from helpers.compiler import compile_arguments
+from helpers.parsing.lexer import Lexer
+from helpers.parsing.parser import Parser
+from helpers.runner import Runner
+
+# The commands a generated configuration is made of
+LINES = [
+    'echo "${COLOR:2}Copying ${name}...${RESET}"',
+    'file assets --destination "build/${name}/assets" --jobs 4',
+    'command ls -la build',
+    'command cp "${name}.txt" "build/${name} copy.txt"',
+    'echo done',
+]
+
+
+def apply(node, visitor):
+    """
+    Visit a node, getting the name of the method of the visitor on each visit as done before compiling the tree
+    :param node: The node
+    :param visitor: The visitor
+    """
+    name = ''.join((f"_{c.lower()}" if c.isupper() else c) for c in node.__class__.__name__).lstrip('_')
+    getattr(visitor, f"visit_{name}")(node)
+
+
+class VisitorResolver:
+    """
+    The resolution of the arguments by visiting the abstract syntax tree, as done before compiling it
+    """
+
+    def __init__(self, runner):
+        self.runner = runner
+        self.result = ''
+
+    def visit_word(self, word):
+        for segment in word.segments:
+            apply(segment, self)
+
+    def visit_raw(self, word):
+        self.result += word.value
+
+    def visit_quoted(self, quoted):
+        for segment in quoted.segments:
+            apply(segment, self)
+
+    def visit_variable(self, variable):
+        self.result += self.runner.get_variable(variable.name)
+
+
+class CachedVisitorResolver(VisitorResolver):
+    """
+    The resolution of the arguments by visiting the abstract syntax tree, with the method names cached on the nodes
+    """
+
+    def visit_word(self, word):
+        for segment in word.segments:
+            segment.apply(self)
+
+    def visit_quoted(self, quoted):
+        for segment in quoted.segments:
+            segment.apply(self)
+
+
+def visit(runner, commands):
+    for command in commands:
+        arguments = []
+        for argument in command.arguments:
+            resolver = VisitorResolver(runner)
+            apply(argument, resolver)
+            arguments.append(resolver.result)
+
+
+def cached(runner, commands):
+    for command in commands:
+        arguments = []
+        for argument in command.arguments:
+            resolver = CachedVisitorResolver(runner)
+            argument.apply(resolver)
+            arguments.append(resolver.result)
+
+
+def compiled(runner, commands):
+    for command in commands:
+        compile_arguments(command.arguments)(runner)
+
+
+def resolve(runner, resolvers):
+    for resolver in resolvers:
+        resolver(runner)
+
+
+def timed(function, runner, commands, repeat):
+    """
+    Time the resolution of the arguments of commands
+    :param function: The function resolving them
+    :param runner: The runner holding the variables
+    :param commands: The commands
+    :param repeat: The number of measures, the best one is kept
+    :return: The duration in seconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(runner, commands)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='compare the resolution of the arguments, visited or compiled')
+    parser.add_argument('--commands', help='the number of commands of the configuration', type=int, default=10000)
+    parser.add_argument('--repeat', help='the number of measures, the best one is kept', type=int, default=5)
+    args = parser.parse_args()
+
+    config = '\n'.join(LINES[i % len(LINES)] for i in range(args.commands))
+    commands = Parser(Lexer(StringIO(config))).parse().commands
+    runner = Runner(Path.cwd())
+    runner.set_variable('name', 'project')
+
+    visitor = timed(visit, runner, commands, args.repeat)
+    cache = timed(cached, runner, commands, args.repeat)
+    compiler = timed(compiled, runner, commands, args.repeat)
+    resolvers = [compile_arguments(command.arguments) for command in commands]
+    run = timed(resolve, runner, resolvers, args.repeat)
+    # The elements kept in memory are compiled once, the later runs only run them
+    print(f"visitor: {visitor * 1000:.1f}ms, visitor with cached names: {cache * 1000:.1f}ms, "
+          f"compiling and running: {compiler * 1000:.1f}ms, "
+          f"running once compiled: {run * 1000:.1f}ms ({cache / run:.1f}x faster than the visitor with cached names)")
+
+
+if __name__ == '__main__':
+    main()
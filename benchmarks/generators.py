@@ -0,0 +1,73 @@
+import random
+from pathlib import Path
+
+# The words of the generated commands
+WORDS = ['build', 'assets', 'src', 'main.py', 'README.md', '-la', '--force', 'x86_64', 'v2.0', 'output.txt']
+# The variables of the generated words
+VARIABLES = ['name', 'version', 'COLOR:2', 'RESET', 'COLOR:10:20:30']
+# The commands of the generated lines
+COMMANDS = ['echo', 'set', 'command', 'file', 'step']
+
+
+def generate_word(generator: random.Random, quoting: float, variables: float):
+    """
+    Generate a word
+    :param generator: The random generator
+    :param quoting: The probability of the word being quoted
+    :param variables: The probability of the word containing a variable
+    :return: The word
+    """
+    word = generator.choice(WORDS)
+    if generator.random() < variables:
+        word += f'${{{generator.choice(VARIABLES)}}}'
+    if generator.random() < quoting:
+        word = f'"{word} {generator.choice(WORDS)}\\t"'
+    return word
+
+
+def generate_config(lines: int, quoting: float = 0.3, variables: float = 0.3, seed: int = 0):
+    """
+    Generate a configuration
+    :param lines: The number of lines
+    :param quoting: The probability of each word being quoted
+    :param variables: The probability of each word containing a variable
+    :param seed: The seed of the random generator, the same seed generating the same configuration
+    :return: The configuration
+    """
+    generator = random.Random(seed)
+    result = []
+    for i in range(lines):
+        if i % 20 == 0:
+            result.append('# a comment')
+            continue
+        words = [generate_word(generator, quoting, variables) for _ in range(generator.randint(1, 6))]
+        result.append(' '.join([generator.choice(COMMANDS), *words]))
+    return '\n'.join(result) + '\n'
+
+
+def generate_commands(commands: int):
+    """
+    Generate a configuration running commands doing nothing
+    :param commands: The number of commands
+    :return: The configuration
+    """
+    return ''.join(f'set noop "value ${{COLOR:{i % 256}}}"\n' for i in range(commands))
+
+
+def generate_tree(root: Path, depth: int, width: int, files: int, size: int = 1024):
+    """
+    Generate a tree of files
+    :param root: The directory to create
+    :param depth: The number of nested directories
+    :param width: The number of subdirectories of each directory
+    :param files: The number of files in each directory
+    :param size: The size of each file
+    :return: The number of files created
+    """
+    root.mkdir(parents=True)
+    content = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    for i in range(files):
+        (root / f'file{i}.bin').write_bytes(content)
+    if depth == 0:
+        return files
+    return files + sum(generate_tree(root / f'directory{i}', depth - 1, width, files, size) for i in range(width))
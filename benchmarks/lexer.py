@@ -0,0 +1,78 @@
+import argparse
+import time
+from io import StringIO
+
+from helpers.parsing.incremental import LineCache
+from helpers.parsing.lexer import Lexer, TOKEN, tokenize
+
+# The lines a generated configuration is made of
+LINES = [
+    '# copy the files of the project',
+    'echo "${COLOR:2}Copying ${name}...${RESET}"',
+    'file assets --destination "build/assets" --jobs 4 --sync',
+    'set name "my project \\"v2\\""',
+    '',
+    'command ls -la build | command grep assets > files.txt',
+    'step --needs copy list command find build -name "*.py" &',
+    'command sh -c "echo done; exit 0" >> log.txt; wait',
+]
+
+
+def generate(lines: int):
+    """
+    Generate a configuration
+    :param lines: The number of lines
+    :return: The configuration
+    """
+    return '\n'.join(LINES[i % len(LINES)] for i in range(lines)) + '\n'
+
+
+def lex(config: str, tokenize=tokenize):
+    """
+    Split a configuration into tokens
+    :param config: The configuration
+    :param tokenize: The function splitting each line
+    :return: The number of tokens
+    """
+    lexer = Lexer(StringIO(config), tokenize)
+    tokens = 0
+    while lexer.current().type != TOKEN.END:
+        lexer.eat()
+        tokens += 1
+    return tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description='measure the throughput of the lexer')
+    parser.add_argument('--lines', help='the number of lines of the configuration', type=int, default=100000)
+    parser.add_argument('--repeat', help='the number of measures, the best one is kept', type=int, default=5)
+    parser.add_argument('--incremental', help='also measure lexing again after editing one line, with a line cache',
+                        action='store_true')
+    args = parser.parse_args()
+
+    config = generate(args.lines)
+    best = min(timed(config) for _ in range(args.repeat))
+    print(f"lexer: {args.lines / best:,.0f} lines/s ({args.lines} lines in {best:.3f}s)")
+
+    if args.incremental:
+        lines = LineCache()
+        lex(config, lines)
+        edited = config.replace('echo done', 'echo edited', 1)
+        best = min(timed(edited, LineCache(lines.used)) for _ in range(args.repeat))
+        print(f"incremental: {args.lines / best:,.0f} lines/s ({args.lines} lines in {best:.3f}s, one line edited)")
+
+
+def timed(config: str, tokenize=tokenize):
+    """
+    Time the lexing of a configuration
+    :param config: The configuration
+    :param tokenize: The function splitting each line
+    :return: The duration in seconds
+    """
+    start = time.perf_counter()
+    lex(config, tokenize)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# The script
+SCRIPT = Path(__file__).parent.parent / 'script.py'
+# The arguments of the script whose startup is measured, by name
+STARTUPS = {
+    'help': ['--help'],
+    'list': ['list'],
+    'run-help': ['run', '--help'],
+}
+
+
+def get_imports(arguments, home: Path):
+    """
+    Run a Python process, recording the time taken to import each module
+    :param arguments: The arguments of the interpreter
+    :param home: The home directory
+    :return: The time taken to import each module itself, in seconds, by name
+    """
+    environment = {**os.environ, 'HOME': str(home), 'SETUPS_DAEMON': '0'}
+    process = subprocess.run([sys.executable, '-X', 'importtime', *arguments], env=environment, cwd=SCRIPT.parent,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    imports = {}
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:'):
+            duration, _, name = line[len('import time:'):].split('|')
+            if duration.strip().isdigit():
+                imports[name.strip()] = int(duration) / 1e6
+    return imports
+
+
+def get_startup_time(arguments, home: Path):
+    """
+    Measure the time the script spends importing the modules the interpreter does not import by itself
+    :param arguments: The arguments of the script
+    :param home: The home directory
+    :return: The time in seconds, and the modules imported by the script
+    """
+    interpreter = get_imports(['-c', 'pass'], home)
+    imports = get_imports([str(SCRIPT), *arguments], home)
+    return sum(duration for name, duration in imports.items() if name not in interpreter), imports
@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from benchmarks.generators import generate_config, generate_commands, generate_tree
+from benchmarks.lexer import lex
+from benchmarks.startup import STARTUPS, get_startup_time
+from helpers.parsing.lexer import Lexer
+from helpers.parsing.parser import Parser
+from helpers.runner import Runner
+
+# The version of the format of the results
+VERSION = 1
+# The densities of quoted words and variables of the generated configurations, by name
+DENSITIES = {
+    'plain': (0.0, 0.0),
+    'mixed': (0.3, 0.3),
+    'dense': (0.9, 0.9),
+}
+# The shapes of the generated trees, their depth, width and number of files in each directory, by name
+SHAPES = {
+    'deep': (12, 1, 8),
+    'wide': (1, 40, 8),
+}
+# The time the modules imported by the script, and not by the interpreter, can take to import, in seconds
+STARTUP_BUDGET = 0.06
+
+
+def best(function, repeat: int):
+    """
+    Time a function several times
+    :param function: The function, called without arguments
+    :param repeat: The number of measures
+    :return: The duration of the fastest call in seconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def parse(config: str):
+    """
+    Parse a configuration
+    :param config: The configuration
+    :return: The abstract syntax tree
+    """
+    return Parser(Lexer(StringIO(config))).parse()
+
+
+def get_words(ast):
+    """
+    Get the words of an abstract syntax tree
+    :param ast: The abstract syntax tree
+    :return: The arguments and redirection targets of its commands
+    """
+    words = []
+    for element in ast.commands:
+        element = getattr(element, 'command', element)
+        for command in getattr(element, 'commands', [element]):
+            words.extend(command.arguments)
+            words.extend(redirect.target for redirect in command.redirects)
+    return words
+
+
+def bench_lexer(density: str, lines: int, repeat: int):
+    config = generate_config(lines, *DENSITIES[density])
+    return lines, 'lines', best(lambda: lex(config), repeat)
+
+
+def bench_parser(density: str, lines: int, repeat: int):
+    config = generate_config(lines, *DENSITIES[density])
+    return lines, 'lines', best(lambda: parse(config), repeat)
+
+
+def bench_resolve(density: str, lines: int, repeat: int):
+    words = get_words(parse(generate_config(lines, *DENSITIES[density])))
+    runner = Runner(Path.cwd())
+    runner.set_variable('name', 'project')
+    runner.set_variable('version', '2.0')
+
+    def resolve():
+        for word in words:
+            runner.resolve(word)
+    return len(words), 'words', best(resolve, repeat)
+
+
+def bench_run(commands: int, repeat: int):
+    ast = parse(generate_commands(commands))
+    with open(os.devnull, 'w') as output, redirect_stdout(output):
+        return commands, 'commands', best(lambda: Runner(Path.cwd()).run(ast), repeat)
+
+
+def bench_startup(arguments, repeat: int):
+    with tempfile.TemporaryDirectory() as home:
+        home = Path(home)
+        (home / '.setups').mkdir()
+        return 1, 'starts', min(get_startup_time(arguments, home)[0] for _ in range(repeat))
+
+
+def bench_file(shape: str, scale: float, repeat: int):
+    depth, width, files = SHAPES[shape]
+    files = max(1, round(files * scale))
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        count = generate_tree(directory / 'tree', depth, width, files)
+        runner = Runner(directory)
+        destinations = iter(range(repeat))
+
+        def copy():
+            runner.execute(['file', 'tree', '--destination', str(directory / f'copy{next(destinations)}')])
+        return count, 'files', best(copy, repeat)
+
+
+def get_benchmarks(scale: float):
+    """
+    Get the benchmarks of the suite
+    :param scale: The factor applied to the size of the workloads
+    :return: The functions running each benchmark given the number of measures, by name
+    """
+    lines = max(1, round(20000 * scale))
+    benchmarks = {}
+    for density in DENSITIES:
+        benchmarks[f'lexer.{density}'] = lambda repeat, density=density: bench_lexer(density, lines, repeat)
+    for density in ['mixed', 'dense']:
+        benchmarks[f'parser.{density}'] = lambda repeat, density=density: bench_parser(density, lines, repeat)
+        benchmarks[f'resolve.{density}'] = lambda repeat, density=density: bench_resolve(density, lines, repeat)
+    benchmarks['run.noop'] = lambda repeat: bench_run(lines, repeat)
+    for shape in SHAPES:
+        benchmarks[f'file.{shape}'] = lambda repeat, shape=shape: bench_file(shape, scale, repeat)
+    for name, arguments in STARTUPS.items():
+        benchmarks[f'startup.{name}'] = lambda repeat, arguments=arguments: bench_startup(arguments, repeat)
+    return benchmarks
+
+
+def run(names, scale: float, repeat: int):
+    """
+    Run the benchmarks
+    :param names: The prefixes of the names of the benchmarks to run, all of them if empty
+    :param scale: The factor applied to the size of the workloads
+    :param repeat: The number of measures of each benchmark, the fastest one is kept
+    :return: The results
+    """
+    results = {}
+    for name, benchmark in get_benchmarks(scale).items():
+        if names and not any(name == prefix or name.startswith(f'{prefix}.') for prefix in names):
+            continue
+        items, unit, seconds = benchmark(repeat)
+        results[name] = {'items': items, 'unit': unit, 'seconds': seconds, 'rate': items / seconds}
+        if name.startswith('startup.'):
+            results[name]['budget'] = STARTUP_BUDGET
+        over = '  OVER BUDGET' if seconds > results[name].get('budget', seconds) else ''
+        print(f"{name:<16} {items / seconds:>14,.0f} {unit}/s ({items} {unit} in {seconds:.3f}s){over}",
+              file=sys.stderr)
+    return {
+        'version': VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': scale,
+        'repeat': repeat,
+        'benchmarks': results,
+    }
+
+
+def compare(base, new, threshold: float):
+    """
+    Compare two results
+    :param base: The results of reference
+    :param new: The results to compare to the reference
+    :param threshold: The relative loss of throughput above which a benchmark regressed
+    :return: The name, the base and new throughputs, the relative change and whether it regressed for each benchmark
+             present in both results
+    """
+    rows = []
+    for name, result in new['benchmarks'].items():
+        if name not in base['benchmarks']:
+            continue
+        before, after = base['benchmarks'][name]['rate'], result['rate']
+        change = after / before - 1
+        rows.append((name, before, after, change, change < -threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='measure the performance of the lexer, the parser and the runner')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    run_parser = subparsers.add_parser('run', help='run the benchmarks, failing if one takes longer than its budget')
+    run_parser.add_argument('names', help='the benchmarks to run, or their groups like lexer, all of them by default',
+                            nargs='*')
+    run_parser.add_argument('--output', help='the file to write the results to, as JSON')
+    run_parser.add_argument('--scale', help='the factor applied to the size of the workloads', type=float,
+                            default=1.0)
+    run_parser.add_argument('--repeat', help='the number of measures, the best one is kept', type=int, default=5)
+    compare_parser = subparsers.add_parser('compare', help='compare two results, failing if a benchmark regressed')
+    compare_parser.add_argument('base', help='the results of reference')
+    compare_parser.add_argument('new', help='the results to compare to the reference')
+    compare_parser.add_argument('--threshold', help='the relative loss of throughput tolerated', type=float,
+                                default=0.1)
+    args = parser.parse_args()
+
+    if args.action == 'run':
+        results = run(args.names, args.scale, args.repeat)
+        output = json.dumps(results, indent=2)
+        if args.output:
+            Path(args.output).write_text(output + '\n')
+        else:
+            print(output)
+        return 1 if any(result['seconds'] > result.get('budget', result['seconds'])
+                        for result in results['benchmarks'].values()) else 0
+
+    base, new = (json.loads(Path(path).read_text()) for path in (args.base, args.new))
+    rows = compare(base, new, args.threshold)
+    for name, before, after, change, regressed in rows:
+        print(f"{name:<16} {before:>14,.0f} -> {after:>14,.0f} {change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+    return 1 if any(regressed for *_, regressed in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,29 @@
+from commands.command import Command
+from helpers.lookup import get_setup, CONFIG
+
+
+class ClearCacheCommand(Command):
+    name = "clear-cache"
+    help = "clear the cached configurations"
+
+    def setup_parser(self, parser):
+        """
+        Setup the command parser
+        :param parser: The parser
+        """
+        parser.add_argument('setup', help='the setup to clear, all of them if not present', nargs='?')
+
+    def __call__(self, setup: str, **kwargs):
+        """
+        Run the clear-cache command
+        :param setup: The name of the setup
+        :param kwargs: The arguments
+        :return: Always zero
+        """
+        # The cache module is only imported when clearing it, to keep the script quick to start
+        from helpers import cache
+
+        config = None if setup is None else get_setup(setup) / CONFIG
+        removed = cache.invalidate(config)
+        print(f'Removed {removed} cached configuration{"" if removed == 1 else "s"}')
+        return 0
@@ -0,0 +1,56 @@
+import argparse
+from typing import List
+
+from commands.command import Command
+from helpers.registry import Registry
+
+# The commands of the script, imported when run
+COMMANDS: Registry[Command] = Registry('setups.commands', {
+    'run': 'commands.run:RunCommand',
+    'list': 'commands.list:ListCommand',
+    'clear-cache': 'commands.clear_cache:ClearCacheCommand',
+    'serve': 'commands.serve:ServeCommand',
+})
+
+
+def get_arguments(arguments: List[str]):
+    """
+    Get the arguments of the script, naming the run command when omitted
+    :param arguments: The arguments given to the script
+    :return: The arguments, starting with the name of the command unless they are options
+    """
+    if arguments and not arguments[0].startswith('-') and arguments[0] not in COMMANDS:
+        return ['run', *arguments]
+    return arguments
+
+
+def parse(arguments: List[str]):
+    """
+    Parse the arguments of the script
+    :param arguments: The arguments, starting with the name of the command unless they are options
+    :return: The parsed arguments, the command to run being func
+    """
+    # Only the command run is imported, all of them are to describe them
+    names = [arguments[0]] if arguments and not arguments[0].startswith('-') else COMMANDS.names()
+
+    parser = argparse.ArgumentParser(prog='script.py', description='setup projects')
+    subparsers = parser.add_subparsers(title="command", description="the command to run", dest="command", required=True)
+
+    for name in names:
+        command = COMMANDS.get(name)()
+        subparser = subparsers.add_parser(command.get_name(), help=command.get_help())
+        command.setup_parser(subparser)
+        subparser.set_defaults(func=command)
+
+    return parser.parse_args(arguments)
+
+
+def main(arguments: List[str]):
+    """
+    Run the script
+    :param arguments: The arguments given to the script
+    :return: The result of the command
+    """
+    args = parse(get_arguments(arguments))
+
+    return args.func(**args.__dict__)
@@ -1,18 +1,91 @@
+import sys
+from datetime import datetime
+from json import dumps
+
 from commands.command import Command
-from helpers.setups import list_setups
+from helpers.lookup import list_setups
+
+# The units of the sizes, each 1024 times the previous one
+UNITS = ['B', 'K', 'M', 'G', 'T']
+
+
+def format_size(size: int):
+    """
+    Format a size for humans
+    :param size: The size, in bytes
+    :return: The size in the largest unit keeping it at least 1
+    """
+    for unit in UNITS[:-1]:
+        if size < 1024:
+            return f'{size:.0f}{unit}' if unit == 'B' else f'{size:.1f}{unit}'
+        size /= 1024
+    return f'{size:.1f}{UNITS[-1]}'
+
+
+def format_time(modified: int):
+    """
+    Format a modification time
+    :param modified: The modification time, in nanoseconds, 0 if unknown
+    :return: The local date and time, to the minute
+    """
+    return datetime.fromtimestamp(modified / 1e9).strftime('%Y-%m-%d %H:%M') if modified else '-'
 
 
 class ListCommand(Command):
     name = "list"
     help = "list the setups"
 
-    def __call__(self, **kwargs):
+    def setup_parser(self, parser):
+        """
+        Setup the command parser
+        :param parser: The parser
+        """
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--long', help='show the number of commands, the size of the files, the modification time '
+                                          'and the description of each setup', action='store_true')
+        group.add_argument('--json', help='print the information of the setups as JSON', action='store_true')
+
+    def __call__(self, long: bool = False, json: bool = False, **kwargs):
         """
         Run the list command
+        :param long: Whether to show the information of each setup
+        :param json: Whether to print the information of the setups as JSON
         :param kwargs: The arguments
         :return: Always zero
         """
+        if json:
+            return self.print_json()
+        if long:
+            return self.print_long()
         print('Available setups:')
-        for setup in list_setups():
-            print(setup)
+        for setup in list_setups(check=False):
+            print(setup.name)
+        return 0
+
+    def print_long(self):
+        """
+        Print a line with the information of each setup
+        :return: Always zero
+        """
+        setups = list_setups()
+        width = max([len(setup.name) for setup in setups], default=0)
+        for setup in setups:
+            commands = '?' if setup.commands is None else str(setup.commands)
+            line = f'{setup.name:<{width}} {commands:>5} {format_size(setup.assets):>7} {format_time(setup.modified)}'
+            print(f'{line}  {setup.description}'.rstrip())
+        return 0
+
+    def print_json(self):
+        """
+        Print the information of the setups as a JSON array
+        :return: Always zero
+        """
+        setups = [{
+            'name': setup.name,
+            'commands': setup.commands,
+            'assets': setup.assets,
+            'modified': setup.modified / 1e9 if setup.modified else None,
+            'description': setup.description,
+        } for setup in list_setups()]
+        sys.stdout.write(dumps(setups, indent=2) + '\n')
         return 0
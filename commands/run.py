@@ -1,10 +1,10 @@
 import sys
-from contextlib import contextmanager
-from os import makedirs, chdir
+from os import makedirs
 from pathlib import Path
+from typing import List, Optional
 
 from commands.command import Command
-from helpers.setups import setup as setup_fun
+from helpers.argparse import positive_integer
 
 
 class RunCommand(Command):
@@ -17,27 +17,59 @@ class RunCommand(Command):
         :param parser: The parser
         """
         parser.add_argument('setup', help='the setup to run')
-        parser.add_argument('directory', help='where to run the setup', default='.', nargs='?')
+        parser.add_argument('directories', help='where to run the setup, several directories being set up at the same '
+                                               'time', default=['.'], nargs='*', metavar='directory')
+        parser.add_argument('--no-cache', help='do not use the cached configuration', action='store_true')
+        parser.add_argument('--jobs', help='the maximum number of steps running at the same time, or of directories '
+                                           'set up at the same time if several', default=1, type=positive_integer)
+        parser.add_argument('--infer', help='make the steps using the files copied by a file step depend on it',
+                            action='store_true')
+        parser.add_argument('--coprocess', help='run the commands in a single persistent shell', action='store_true')
+        parser.add_argument('--validate-first', help='parse the whole configuration before running any command',
+                            action='store_true')
+        parser.add_argument('--trace', help='write the time spent lexing, parsing, resolving, binding and running each '
+                                            'command to a file, as Chrome trace events')
+        parser.add_argument('--summary', help='print the slowest steps at the end of the run', action='store_true')
+        parser.add_argument('--force', help='run the steps which already ran the same way in the directory',
+                            action='store_true')
 
-    def __call__(self, setup: str, directory: str, **kwargs):
+    def __call__(self, setup: str, directories: List[str], no_cache: bool, jobs: int, infer: bool, coprocess: bool,
+                 validate_first: bool, trace: Optional[str], summary: bool, force: bool, **kwargs):
         """
         Run the run command
         :param setup: The name of the setup
+        :param directories: Where to run the setup
+        :param no_cache: Whether to bypass the cached configuration
+        :param jobs: The maximum number of steps running at the same time, or of directories set up at the same time
+                     if several
+        :param infer: Whether to infer the dependencies of the steps on the files copied
+        :param coprocess: Whether to run the commands in a persistent shell
+        :param validate_first: Whether to parse the whole configuration before running any command
+        :param trace: The file to write the trace of the run to, None to not write it
+        :param summary: Whether to print the slowest steps at the end of the run
+        :param force: Whether to run the steps which already ran the same way in the directory
         :param kwargs: The arguments
         :return: The exit code of the commands: 0 if successful, 1 if lexer error, 2 if parser error,
                  more if another error
         """
-        destination = Path(directory).resolve()
-        makedirs(destination, exist_ok=True)
+        # The parsing and running machinery is only imported when running, to keep the script quick to start
+        from helpers.setups import setup as setup_fun, setup_all
+        from helpers.trace import Tracer
 
-        @contextmanager
-        def cd(path):
-            cwd = Path.cwd()
-            try:
-                chdir(path)
-                yield path
-            finally:
-                chdir(cwd)
+        destinations = [Path(directory).resolve() for directory in directories]
+        trace = Path(trace).resolve() if trace else None
+        tracer = Tracer() if trace or summary else None
+        for destination in destinations:
+            makedirs(destination, exist_ok=True)
 
-        with cd(destination):
-            return setup_fun(setup)
+        try:
+            if len(destinations) > 1:
+                return setup_all(setup, destinations, jobs, use_cache=not no_cache, infer=infer, shell=coprocess,
+                                 tracer=tracer, force=force)
+            return setup_fun(setup, use_cache=not no_cache, workers=jobs, infer=infer, shell=coprocess,
+                             validate_first=validate_first, tracer=tracer, directory=destinations[0], force=force)
+        finally:
+            if trace:
+                tracer.write(trace)
+            if summary:
+                print(tracer.summary(), file=sys.stderr)
@@ -0,0 +1,69 @@
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import Dict, List
+
+from commands.cli import get_arguments, main, parse
+from commands.command import Command
+from helpers.client import SOCKET
+
+
+class ServeCommand(Command):
+    name = "serve"
+    help = "keep the setups parsed in a long-lived process, the script running them in it"
+
+    def prepare(self, arguments: List[str], environment: Dict[str, str]):
+        """
+        Parse the configuration of the setup a client runs, for its runs to share it
+        :param arguments: The arguments of the script
+        :param environment: The environment variables of the client, giving the directories of setups
+        """
+        from helpers.lookup import CONFIG, get_setup
+        from helpers.parsing.lexer_error import LexerError
+        from helpers.parsing.parser_error import ParserError
+        from helpers.setups import MEMORY, parse_configuration
+
+        try:
+            with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+                args = parse(get_arguments(arguments))
+        except SystemExit:
+            return
+        if args.command == 'clear-cache':
+            MEMORY.entries.clear()
+        if args.command != 'run' or args.no_cache:
+            return
+        try:
+            parse_configuration(get_setup(args.setup, environment) / CONFIG)
+        except (ValueError, OSError, LexerError, ParserError):
+            # The run reports the error
+            pass
+
+    def __call__(self, **kwargs):
+        """
+        Run the serve command
+        :param kwargs: The arguments
+        :return: Zero when interrupted, one if another daemon is running
+        """
+        # The daemon imports everything the runs need once, for them not to import it
+        from helpers.daemon import Daemon
+        from helpers.runner import BUILTINS
+        from helpers.setups import MEMORY
+
+        for name in BUILTINS.names():
+            BUILTINS.get(name)
+        MEMORY.enabled = True
+
+        daemon = Daemon(Path(SOCKET), main, self.prepare)
+        try:
+            daemon.listen()
+            print(f'Listening on {SOCKET}')
+            sys.stdout.flush()
+            daemon.serve()
+        except ValueError as e:
+            print(str(e).capitalize(), file=sys.stderr)
+            return 1
+        except KeyboardInterrupt:
+            return 0
+        finally:
+            daemon.close()
@@ -8,3 +8,10 @@ def check_to_type(check: Callable[[str], bool], message: str):
         return value
 
     return type_fn
+
+
+def positive_integer(value: str):
+    number = int(value)
+    if number < 1:
+        raise ValueError("expected a positive integer")
+    return number
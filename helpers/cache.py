@@ -0,0 +1,136 @@
+import os
+import pickle
+import struct
+from hashlib import sha256
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Optional
+
+from helpers.parsing.incremental import LineCache
+from helpers.parsing.parser import Sequence
+
+# The directory containing the cached abstract syntax trees
+DIRECTORY = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'setups'
+# The version of the cache format, must be increased whenever the abstract syntax tree changes
+VERSION = 4
+# The header of a cache file: magic, version, modification time, size and content hash of the configuration
+HEADER = struct.Struct('<8sHqq32s')
+MAGIC = b'SETUPAST'
+# The header of a line cache file: magic and version
+LINES_HEADER = struct.Struct('<8sH')
+LINES_MAGIC = b'SETUPLNS'
+
+
+def get_path(config: Path, suffix: str = '.ast'):
+    """
+    Get the path to the cache file of a configuration
+    :param config: The path to the configuration
+    :param suffix: The suffix of the cache file, .ast for the abstract syntax tree and .lines for the line cache
+    :return: The path to the cache file
+    """
+    key = sha256(str(config.resolve()).encode()).hexdigest()
+    return DIRECTORY / f'{key}{suffix}'
+
+
+def get_header(stat: os.stat_result, content: bytes):
+    """
+    Get the cache header of a configuration
+    :param stat: The stat of the configuration
+    :param content: The content of the configuration
+    :return: The header
+    """
+    return HEADER.pack(MAGIC, VERSION, stat.st_mtime_ns, stat.st_size, sha256(content).digest())
+
+
+def load(config: Path, stat: os.stat_result, content: bytes) -> Optional[Sequence]:
+    """
+    Load the cached abstract syntax tree of a configuration
+    :param config: The path to the configuration
+    :param stat: The stat of the configuration
+    :param content: The content of the configuration
+    :return: The abstract syntax tree, None if it is not cached or the cache is outdated
+    """
+    try:
+        with get_path(config).open('rb') as f:
+            if f.read(HEADER.size) != get_header(stat, content):
+                return None
+            ast = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return ast if isinstance(ast, Sequence) else None
+
+
+def write(path: Path, header: bytes, value):
+    """
+    Write a cache file atomically, failing silently if the cache is not writable
+    :param path: The path to the cache file
+    :param header: The header of the file
+    :param value: The value to pickle after the header
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile('wb', dir=path.parent, delete=False) as f:
+            f.write(header)
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, path)
+    except OSError:
+        pass
+
+
+def store(config: Path, stat: os.stat_result, content: bytes, ast: Sequence):
+    """
+    Store the abstract syntax tree of a configuration, failing silently if the cache is not writable
+    :param config: The path to the configuration
+    :param stat: The stat of the configuration
+    :param content: The content of the configuration
+    :param ast: The abstract syntax tree
+    """
+    write(get_path(config), get_header(stat, content), ast)
+
+
+def load_lines(config: Path):
+    """
+    Load the line cache of a configuration
+    :param config: The path to the configuration
+    :return: The line cache, empty if there is none
+    """
+    try:
+        with get_path(config, '.lines').open('rb') as f:
+            if f.read(LINES_HEADER.size) != LINES_HEADER.pack(LINES_MAGIC, VERSION):
+                return LineCache()
+            entries = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return LineCache()
+    return LineCache(entries) if isinstance(entries, dict) else LineCache()
+
+
+def store_lines(config: Path, lines: LineCache, complete: bool = True):
+    """
+    Store the line cache of a configuration, failing silently if the cache is not writable
+    :param config: The path to the configuration
+    :param lines: The line cache
+    :param complete: Whether the whole configuration was split, only the lines used being kept if so, while the lines
+                     after an interruption are kept otherwise
+    """
+    entries = lines.used if complete else {**lines.entries, **lines.used}
+    write(get_path(config, '.lines'), LINES_HEADER.pack(LINES_MAGIC, VERSION), entries)
+
+
+def invalidate(config: Optional[Path] = None):
+    """
+    Remove cached abstract syntax trees and line caches
+    :param config: The path to the configuration to invalidate, all of them if not present
+    :return: The number of configurations whose cache was removed
+    """
+    if config is not None:
+        paths = [get_path(config), get_path(config, '.lines')]
+    else:
+        paths = [*DIRECTORY.glob('*.ast'), *DIRECTORY.glob('*.lines')]
+    removed = set()
+    for path in paths:
+        try:
+            path.unlink()
+            removed.add(path.stem)
+        except FileNotFoundError:
+            pass
+    return len(removed)
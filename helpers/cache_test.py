@@ -0,0 +1,76 @@
+from io import StringIO
+
+import pytest
+
+from helpers import cache
+from helpers.parsing.lexer import Lexer
+from helpers.parsing.parser import Parser
+
+CONTENT = b'echo "hello ${COLOR:1}world"\ncommand ls -a\n'
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'DIRECTORY', tmp_path / 'cache')
+    config = tmp_path / '.config.setup'
+    config.write_bytes(CONTENT)
+    return config
+
+
+def parse(content: bytes):
+    return Parser(Lexer(StringIO(content.decode()))).parse()
+
+
+def test_cache_roundtrip(config):
+    ast = parse(CONTENT)
+    assert cache.load(config, config.stat(), CONTENT) is None
+    cache.store(config, config.stat(), CONTENT, ast)
+    assert cache.load(config, config.stat(), CONTENT) == ast
+
+
+def test_cache_outdated(config):
+    cache.store(config, config.stat(), CONTENT, parse(CONTENT))
+    content = CONTENT + b'echo changed\n'
+    config.write_bytes(content)
+    assert cache.load(config, config.stat(), content) is None
+
+
+def test_cache_corrupted(config):
+    cache.store(config, config.stat(), CONTENT, parse(CONTENT))
+    path = cache.get_path(config)
+    path.write_bytes(path.read_bytes()[:cache.HEADER.size + 4])
+    assert cache.load(config, config.stat(), CONTENT) is None
+
+
+def test_cache_invalidate(config):
+    cache.store(config, config.stat(), CONTENT, parse(CONTENT))
+    assert cache.invalidate(config) == 1
+    assert cache.invalidate() == 0
+    assert cache.load(config, config.stat(), CONTENT) is None
+
+
+def test_cache_lines(config):
+    lines = cache.load_lines(config)
+    ast = Parser(Lexer(StringIO(CONTENT.decode()), lines)).parse()
+    assert lines.misses == 2
+    cache.store_lines(config, lines)
+
+    lines = cache.load_lines(config)
+    assert Parser(Lexer(StringIO(CONTENT.decode()), lines)).parse() == ast
+    assert lines.misses == 0
+    cache.store(config, config.stat(), CONTENT, ast)
+    assert cache.invalidate() == 1
+
+
+def test_cache_lines_interrupted(config):
+    lines = cache.load_lines(config)
+    Parser(Lexer(StringIO(CONTENT.decode()), lines)).parse()
+    cache.store_lines(config, lines)
+
+    lines = cache.load_lines(config)
+    lines(CONTENT.decode().splitlines()[0])
+    cache.store_lines(config, lines, complete=False)
+
+    lines = cache.load_lines(config)
+    Parser(Lexer(StringIO(CONTENT.decode()), lines)).parse()
+    assert lines.misses == 0
@@ -0,0 +1,100 @@
+import os
+import socket
+import struct
+from typing import Dict, List, Optional
+
+# The socket the daemon listens on
+SOCKET = os.environ.get('SETUPS_SOCKET') or os.path.join(os.environ.get('XDG_RUNTIME_DIR') or '/tmp',
+                                                         f'setups-{os.getuid()}.sock')
+# The header of a request, the size of the request, sent with the standard streams of the client
+REQUEST = struct.Struct('<I')
+# The exit code of a run, sent back by the daemon
+RESPONSE = struct.Struct('<i')
+# The byte sent by the client to interrupt the run
+INTERRUPT = b'\x03'
+
+
+def connect() -> Optional[socket.socket]:
+    """
+    Connect to the daemon, if one is listening and owned by the current user
+    :return: The connection, None if there is no daemon to connect to or if disabled by SETUPS_DAEMON=0
+    """
+    if os.environ.get('SETUPS_DAEMON') == '0':
+        return None
+    try:
+        if os.stat(SOCKET).st_uid != os.getuid():
+            return None
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except OSError:
+        return None
+    try:
+        connection.connect(SOCKET)
+    except OSError:
+        connection.close()
+        return None
+    return connection
+
+
+def receive(connection: socket.socket, size: int):
+    """
+    Receive an exact number of bytes
+    :param connection: The connection
+    :param size: The number of bytes
+    :return: The bytes, fewer if the connection was closed before
+    """
+    data = b''
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def encode(arguments: List[str], directory: str, environment: Dict[str, str]):
+    """
+    Encode a request, as strings separated by null characters which cannot appear in them
+    :param arguments: The arguments of the script
+    :param directory: The working directory
+    :param environment: The environment variables
+    :return: The request
+    """
+    fields = [directory, str(len(arguments)), *arguments, *(f'{name}={value}' for name, value in environment.items())]
+    return b'\0'.join(os.fsencode(field) for field in fields)
+
+
+def decode(data: bytes):
+    """
+    Decode a request
+    :param data: The request
+    :return: The arguments of the script, the working directory and the environment variables
+    """
+    fields = [os.fsdecode(field) for field in data.split(b'\0')]
+    count = int(fields[1])
+    environment = dict(field.split('=', 1) for field in fields[2 + count:])
+    return fields[2:2 + count], fields[0], environment
+
+
+def request(connection: socket.socket, arguments: List[str]):
+    """
+    Run the script in the daemon, with the standard streams, working directory and environment of the client
+    :param connection: The connection to the daemon
+    :param arguments: The arguments of the script
+    :return: The exit code of the run
+    """
+    payload = encode(arguments, os.getcwd(), dict(os.environ))
+    with connection:
+        socket.send_fds(connection, [REQUEST.pack(len(payload))], [0, 1, 2])
+        connection.sendall(payload)
+        response = b''
+        while len(response) < RESPONSE.size:
+            try:
+                data = connection.recv(RESPONSE.size - len(response))
+            except KeyboardInterrupt:
+                connection.sendall(INTERRUPT)
+                continue
+            if not data:
+                raise ConnectionError("the daemon closed the connection before the end of the run")
+            response += data
+    exit, = RESPONSE.unpack(response)
+    return exit if exit >= 0 else 128 - exit
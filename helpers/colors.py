@@ -16,3 +16,24 @@ def number(n: int):
     if n < 0 or n > 255:
         raise ValueError('invalid color number')
     return f'\033[38;5;{n}m'
+
+
+def get_color(name: str):
+    """
+    Get the escape sequence of a color variable
+    :param name: The name of the variable: COLOR:n, COLOR:r:g:b or RESET
+    :return: The escape sequence, None if the variable is not a valid color
+    """
+    if name == 'RESET':
+        return reset()
+    if not name.startswith('COLOR:'):
+        return None
+    values = name[len('COLOR:'):].split(':')
+    try:
+        if len(values) == 1:
+            return number(int(values[0]))
+        if len(values) == 3:
+            return rgb(*(int(value) for value in values))
+    except ValueError:
+        pass
+    return None
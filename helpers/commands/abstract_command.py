@@ -1,7 +1,14 @@
 from argparse import ArgumentParser
-from typing import Optional, Mapping, List, TYPE_CHECKING
+from functools import partial
+from pathlib import Path
+from typing import Optional, Mapping, List, Union, TYPE_CHECKING
+
+from helpers.commands.arguments import Binder, Positional, Option, Unsupported
+from helpers.output import with_capture
 
 if TYPE_CHECKING:
+    import asyncio
+
     from helpers.runner import Runner
 
 
@@ -26,8 +33,19 @@ class CommandArgumentParser(ArgumentParser):
 class AbstractCommand:
     name: str
     description: str
+    # The positional arguments and options of the command, the arguments are parsed by setup_parser if None
+    schema: Optional[List[Union[Positional, Option]]] = None
+    binder: Optional[Binder] = None
     parser: Optional[CommandArgumentParser]
 
+    def __init_subclass__(cls, **kwargs):
+        """
+        Compile the schema of a command class, once
+        """
+        super().__init_subclass__(**kwargs)
+        if cls.__dict__.get('schema') is not None:
+            cls.binder = Binder(cls.name, cls.schema)
+
     def __init__(self):
         """
         Create a new command
@@ -60,19 +78,30 @@ class AbstractCommand:
 
     def setup_parser(self, parser: CommandArgumentParser):
         """
-        Setup the command parser
+        Setup the command parser, from the schema by default
         :param parser: The command parser
         """
-        pass
+        groups = {}
+        for argument in self.schema or []:
+            group = getattr(argument, 'group', None)
+            if group is not None and group not in groups:
+                groups[group] = parser.add_mutually_exclusive_group()
+            argument.add_to(parser, groups.get(group))
 
     def parse(self, arguments: List[str]) -> Mapping[str, str]:
         """
-        Parse the arguments
+        Parse the arguments, with the binder compiled from the schema if there is one and with argparse otherwise
         :param arguments: The arguments to parsed
         :return: The arguments parsed
         """
-        self.init_parser()
-        self.setup_parser(self.parser)
+        if self.binder is not None:
+            try:
+                return self.binder(arguments)
+            except Unsupported:
+                pass
+        if self.parser is None:
+            self.init_parser()
+            self.setup_parser(self.parser)
         return self.parser.parse_args(arguments).__dict__
 
     def __call__(self, runner: 'Runner', **kwargs):
@@ -82,3 +111,39 @@ class AbstractCommand:
         :param kwargs: The arguments
         """
         raise NotImplementedError("missing call for command")
+
+    def get_inputs(self, runner: 'Runner', **kwargs) -> List[Path]:
+        """
+        Get the paths the command reads, besides the paths declared by its step, none by default
+        :param runner: The runner
+        :param kwargs: The arguments
+        :return: The paths
+        """
+        return []
+
+    def get_outputs(self, runner: 'Runner', **kwargs) -> List[Path]:
+        """
+        Get the paths the command creates, its step running again if one of them is missing, none by default
+        :param runner: The runner
+        :param kwargs: The arguments
+        :return: The paths
+        """
+        return []
+
+    def get_replacing_arguments(self, **kwargs) -> Mapping[str, str]:
+        """
+        Get the arguments of the command running again, for it to replace the paths it created, the same by default
+        :param kwargs: The arguments
+        :return: The arguments replacing the paths
+        """
+        return kwargs
+
+    def start(self, runner: 'Runner', loop: 'asyncio.AbstractEventLoop', **kwargs) -> 'asyncio.Future':
+        """
+        Start the command in the background, by default on a thread of the loop executor
+        :param runner: The runner
+        :param loop: The event loop driving the background commands
+        :param kwargs: The arguments
+        :return: The future of the result of the command
+        """
+        return loop.run_in_executor(None, with_capture(partial(self, runner, **kwargs)))
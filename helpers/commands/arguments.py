@@ -0,0 +1,222 @@
+import re
+from argparse import ArgumentParser, ArgumentTypeError, REMAINDER
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+# The arguments looking like negative numbers, which are positional arguments and not options
+NEGATIVE_NUMBER = re.compile(r'^-\d+$|^-\d*\.\d+$')
+
+
+class Unsupported(Exception):
+    """
+    The arguments use a feature of argparse the binder does not handle, they must be parsed by argparse
+    """
+
+
+class Positional:
+    name: str
+    type: Optional[Callable[[str], Any]]
+    nargs: Optional[str]
+
+    def __init__(self, name, type=None, nargs=None):
+        """
+        Create a positional argument
+        :param name: The name of the argument
+        :param type: The function converting the value, None to keep the string
+        :param nargs: None for a single value, '+' for one or more values, REMAINDER for all the remaining arguments
+        """
+        self.name = name
+        self.type = type
+        self.nargs = nargs
+
+    def add_to(self, parser: ArgumentParser, group: Optional[Any] = None):
+        """
+        Add the argument to an argparse parser
+        :param parser: The parser
+        :param group: Unused, positional arguments are never exclusive
+        """
+        kwargs = {'type': self.type} if self.type is not None else {}
+        if self.nargs is not None:
+            kwargs['nargs'] = self.nargs
+        parser.add_argument(self.name, **kwargs)
+
+
+class Option:
+    flag: str
+    name: str
+    type: Optional[Callable[[str], Any]]
+    default: Any
+    choices: Optional[Sequence[str]]
+    action: str
+    group: Optional[str]
+
+    def __init__(self, flag, type=None, default=None, choices=None, action='store', group=None):
+        """
+        Create an option
+        :param flag: The flag of the option, starting with --
+        :param type: The function converting the value, None to keep the string
+        :param default: The value when the option is absent, False for a flag by default
+        :param choices: The accepted values, None to accept any value
+        :param action: 'store' to keep the last value, 'append' to keep all of them, 'store_true' for a flag
+        :param group: The name of the group of mutually exclusive options the option belongs to, if any
+        """
+        self.flag = flag
+        self.name = flag.lstrip('-').replace('-', '_')
+        self.type = type
+        self.default = False if action == 'store_true' and default is None else default
+        self.choices = choices
+        self.action = action
+        self.group = group
+
+    def add_to(self, parser: ArgumentParser, group: Optional[Any] = None):
+        """
+        Add the option to an argparse parser
+        :param parser: The parser
+        :param group: The argparse group of mutually exclusive options to add the option to, if any
+        """
+        kwargs = {'default': self.default}
+        if self.action == 'store_true':
+            kwargs.update(action='store_const', const=True)
+        else:
+            kwargs['action'] = self.action
+            if self.type is not None:
+                kwargs['type'] = self.type
+            if self.choices is not None:
+                kwargs['choices'] = self.choices
+        (group or parser).add_argument(self.flag, **kwargs)
+
+
+class Binder:
+    """
+    Binds the arguments of a command to their schema, the way argparse does for the features used by the schema
+
+    The options can be abbreviated and their value given after an equal sign, the arguments looking like negative
+    numbers or containing spaces are positional, and the arguments after a REMAINDER positional argument are all
+    bound to it, options included. Any error is reported as argparse errors are reported by the commands.
+    """
+    prog: str
+    schema: List[Any]
+    positionals: List[Positional]
+    options: Dict[str, Option]
+
+    def __init__(self, prog, schema):
+        """
+        Compile the schema of a command
+        :param prog: The name of the command
+        :param schema: The positional arguments and options of the command
+        """
+        self.prog = prog
+        self.schema = schema
+        self.positionals = [argument for argument in schema if isinstance(argument, Positional)]
+        self.options = {argument.flag: argument for argument in schema if isinstance(argument, Option)}
+
+    def error(self):
+        raise ValueError(f"invalid arguments for {self.prog}")
+
+    def find(self, argument: str):
+        """
+        Find the option an argument starts, if it looks like one
+        :param argument: The argument
+        :return: The option and its value given after an equal sign, None if the argument is positional
+        """
+        if not argument.startswith('-') or argument == '-':
+            return None
+        if argument in self.options:
+            return self.options[argument], None
+        flag, value = argument.split('=', 1) if '=' in argument else (argument, None)
+        if flag in self.options:
+            return self.options[flag], value
+        if flag.startswith('--'):
+            matches = [option for option in self.options if option.startswith(flag)]
+            if len(matches) > 1:
+                self.error()
+            if matches:
+                return self.options[matches[0]], value
+        if NEGATIVE_NUMBER.match(argument) or ' ' in argument:
+            return None
+        self.error()
+
+    def convert(self, argument: Any, value: str):
+        """
+        Convert the value of an argument
+        :param argument: The positional argument or option
+        :param value: The value
+        :return: The converted value
+        """
+        if argument.type is not None:
+            try:
+                value = argument.type(value)
+            except (ArgumentTypeError, TypeError, ValueError):
+                self.error()
+        if getattr(argument, 'choices', None) is not None and value not in argument.choices:
+            self.error()
+        return value
+
+    def __call__(self, arguments: List[str]) -> Mapping[str, Any]:
+        """
+        Bind arguments
+        :param arguments: The arguments
+        :return: The value of each argument, by name
+        """
+        if '--' in arguments:
+            raise Unsupported()
+
+        values = {}
+        for option in self.options.values():
+            default = option.default
+            if isinstance(default, str) and option.type is not None:
+                default = self.convert(option, default)
+            values[option.name] = list(default) if option.action == 'append' else default
+        groups = {}
+        positional = 0
+        i = 0
+        while i < len(arguments):
+            found = self.find(arguments[i])
+            if found is None:
+                if positional == len(self.positionals):
+                    self.error()
+                argument = self.positionals[positional]
+                positional += 1
+                if argument.nargs == REMAINDER:
+                    values[argument.name] = [self.convert(argument, value) for value in arguments[i:]]
+                    break
+                end = i + 1
+                if argument.nargs == '+':
+                    while end < len(arguments) and self.find(arguments[end]) is None:
+                        end += 1
+                    values[argument.name] = [self.convert(argument, value) for value in arguments[i:end]]
+                else:
+                    values[argument.name] = self.convert(argument, arguments[i])
+                i = end
+                if positional < len(self.positionals) and self.positionals[positional].nargs == REMAINDER:
+                    values[self.positionals[positional].name] = [
+                        self.convert(self.positionals[positional], value) for value in arguments[i:]]
+                    positional += 1
+                    break
+                continue
+
+            option, value = found
+            if option.group is not None:
+                if groups.setdefault(option.group, option) is not option:
+                    self.error()
+            i += 1
+            if option.action == 'store_true':
+                if value is not None:
+                    self.error()
+                values[option.name] = True
+                continue
+            if value is None:
+                if i == len(arguments) or self.find(arguments[i]) is not None:
+                    self.error()
+                value = arguments[i]
+                i += 1
+            value = self.convert(option, value)
+            if option.action == 'append':
+                values[option.name].append(value)
+            else:
+                values[option.name] = value
+
+        for argument in self.positionals[positional:]:
+            if argument.nargs != REMAINDER:
+                self.error()
+            values[argument.name] = []
+        return values
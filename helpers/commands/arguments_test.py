@@ -0,0 +1,71 @@
+import pytest
+
+from helpers.commands.abstract_command import CommandArgumentParser
+from helpers.commands.arguments import Unsupported
+from helpers.commands.ask import Ask
+from helpers.commands.command import Command
+from helpers.commands.echo import Echo
+from helpers.commands.file import File
+from helpers.commands.set import Set
+from helpers.commands.step import Step
+
+
+def parse_with_argparse(command, arguments):
+    parser = CommandArgumentParser(command.get_name())
+    command.setup_parser(parser)
+    return parser.parse_args(arguments).__dict__
+
+
+@pytest.mark.parametrize(['command', 'arguments'], [
+    pytest.param(Echo(), ['a'], id="echo"),
+    pytest.param(Echo(), ['a', 'b c', '-1', '-', '', '-a b'], id="echo positionals"),
+    pytest.param(Echo(), [], id="echo nothing"),
+    pytest.param(Echo(), ['a', '-n'], id="echo option"),
+    pytest.param(Set(), ['name', 'value'], id="set"),
+    pytest.param(Set(), ['name', '-1'], id="set negative number"),
+    pytest.param(Set(), ['name'], id="set missing value"),
+    pytest.param(Set(), ['name', 'value', 'other'], id="set extra value"),
+    pytest.param(Set(), ['na-me', 'value'], id="set invalid name"),
+    pytest.param(Ask(), ['name', 'query?', '--default', 'value'], id="ask default"),
+    pytest.param(Ask(), ['--required', 'name', 'query?'], id="ask required first"),
+    pytest.param(Ask(), ['name', '--def=value', 'query?'], id="ask abbreviated"),
+    pytest.param(Ask(), ['name', 'query?', '--default', 'a', '--required'], id="ask exclusive"),
+    pytest.param(Ask(), ['name', 'query?', '--default', 'a', '--default', 'b'], id="ask repeated"),
+    pytest.param(Ask(), ['name', 'query?', '--required=yes'], id="ask flag with value"),
+    pytest.param(Ask(), ['name', 'query?', '--default'], id="ask missing value"),
+    pytest.param(Command(), ['ls', '-la', '--color=auto'], id="command"),
+    pytest.param(Command(), [], id="command nothing"),
+    pytest.param(Command(), ['--version'], id="command option first"),
+    pytest.param(Step(), ['--needs', 'a', '--needs=b', 'name', 'echo', '--needs', 'c'], id="step"),
+    pytest.param(Step(), ['name'], id="step without command"),
+    pytest.param(Step(), ['--needs', 'a'], id="step without name"),
+    pytest.param(File(), ['assets', '--destination', 'build', '--jobs', '4', '--sync', '--checksum'], id="file"),
+    pytest.param(File(), ['--link', 'sym', '--link-directories', '--preserve', 'assets'], id="file links"),
+    pytest.param(File(), ['assets', '--li', 'sym'], id="file ambiguous"),
+    pytest.param(File(), ['assets', '--link-d', '--dest', 'build', '--meth=copy'], id="file abbreviated"),
+    pytest.param(File(), ['assets', '--method', 'other'], id="file invalid choice"),
+    pytest.param(File(), ['assets', '--jobs', '0'], id="file invalid type"),
+    pytest.param(File(), ['assets', '--jobs', '-1'], id="file negative number"),
+    pytest.param(File(), ['assets', '--destination', '--sync'], id="file option as value"),
+    pytest.param(File(), ['assets', '--unknown'], id="file unknown option"),
+    pytest.param(File(), ['assets', 'other'], id="file extra value"),
+])
+def test_binder_like_argparse(command, arguments):
+    try:
+        expected = parse_with_argparse(command, arguments)
+    except ValueError as e:
+        with pytest.raises(ValueError, match=str(e)):
+            command.binder(arguments)
+    else:
+        assert command.binder(arguments) == expected
+
+
+def test_binder_unsupported():
+    with pytest.raises(Unsupported):
+        Command.binder(['sh', '--', 'x'])
+    assert Command().parse(['sh', '--', 'x']) == parse_with_argparse(Command(), ['sh', '--', 'x'])
+
+
+def test_binder_defaults_not_shared():
+    Step().parse(['--needs', 'a', 'name'])
+    assert Step().parse(['name'])['needs'] == []
@@ -3,6 +3,8 @@ from typing import TYPE_CHECKING, Optional
 
 from helpers.argparse import check_to_type
 from helpers.commands.abstract_command import AbstractCommand
+from helpers.commands.arguments import Positional, Option
+from helpers.output import is_captured
 
 if TYPE_CHECKING:
     from helpers.runner import Runner
@@ -17,15 +19,12 @@ class Ask(AbstractCommand):
     name = 'ask'
     description = 'get input from the user'
 
-    def setup_parser(self, parser):
-        """
-        Setup the parser
-        """
-        parser.add_argument('variable', type=check_to_type(is_variable, "invalid name for variable"))
-        parser.add_argument('query')
-        group = parser.add_mutually_exclusive_group()
-        group.add_argument('--default', default=None)
-        group.add_argument('--required', default=False, action='store_const', const=True)
+    schema = [
+        Positional('variable', type=check_to_type(is_variable, "invalid name for variable")),
+        Positional('query'),
+        Option('--default', group='input'),
+        Option('--required', action='store_true', group='input'),
+    ]
 
     def input(self, query: str, default: Optional[str], required: bool):
         """
@@ -63,5 +62,7 @@ class Ask(AbstractCommand):
         :param default: The default value
         :param required: Whether the input is required
         """
+        if is_captured():
+            raise ValueError("cannot ask for input while the output is captured")
         value = self.input(query, default, required)
         runner.set_variable(variable, value)
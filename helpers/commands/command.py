@@ -1,8 +1,15 @@
+import asyncio
+import os
+import sys
 from argparse import REMAINDER
+from pathlib import Path
 from subprocess import Popen
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, Union, TYPE_CHECKING
 
 from helpers.commands.abstract_command import AbstractCommand
+from helpers.commands.arguments import Positional
+from helpers.output import Capture, Prefixed, Pumps, get_capture
+from helpers.trace import span, wait
 
 if TYPE_CHECKING:
     from helpers.runner import Runner
@@ -12,11 +19,9 @@ class Command(AbstractCommand):
     name = 'command'
     description = 'run a command'
 
-    def setup_parser(self, parser):
-        """
-        Setup the parser
-        """
-        parser.add_argument('command', nargs=REMAINDER)
+    schema = [
+        Positional('command', nargs=REMAINDER),
+    ]
 
     def __call__(self, runner: 'Runner', command: List[str], **kwargs):
         """
@@ -24,7 +29,83 @@ class Command(AbstractCommand):
         :param runner: The runner
         :param command: The command
         """
-        process = Popen(command)
-        process.wait()
-        if process.returncode != 0:
-            raise ValueError(f"command returned a non-zero exit code: {process.returncode}")
+        capture = get_capture()
+        coprocess = None if capture is not None else runner.get_coprocess()
+        if coprocess is not None:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            returncode = coprocess.run(command)
+        else:
+            process, pumps = self.open(runner, command, capture)
+            returncode = wait(process, runner.tracer)
+            if pumps is not None:
+                pumps.join()
+        self.check(returncode)
+
+    def open(self, runner: 'Runner', command: List[str], capture: Optional[Union[Capture, Prefixed]]):
+        """
+        Start the command, its output being copied to a capture as it is written
+        :param runner: The runner
+        :param command: The command
+        :param capture: The capture, None if the output is not captured
+        :return: The process, and the pumps copying its output, None if not captured
+        """
+        if capture is None:
+            return Popen(command, cwd=runner.get_working_directory()), None
+        pumps = Pumps(capture)
+        stdout, stderr = pumps.open('stdout'), pumps.open('stderr')
+        try:
+            return Popen(command, stdout=stdout, stderr=stderr, cwd=runner.get_working_directory()), pumps
+        finally:
+            os.close(stdout)
+            os.close(stderr)
+
+    def spawn(self, command: List[str], stdin: Optional[int] = None, stdout: Optional[int] = None,
+              directory: Optional[Path] = None, stderr: Optional[int] = None):
+        """
+        Start the command with its standard streams connected to file descriptors
+        :param command: The command
+        :param stdin: The file descriptor of the standard input, inherited if None
+        :param stdout: The file descriptor of the standard output, inherited if None
+        :param directory: The directory the command runs in, the current directory if None
+        :param stderr: The file descriptor of the standard error, inherited if None
+        :return: The process
+        """
+        return Popen(command, stdin=stdin, stdout=stdout, stderr=stderr, cwd=directory)
+
+    def check(self, returncode: int):
+        """
+        Check the exit code of the command
+        :param returncode: The exit code
+        """
+        if returncode != 0:
+            raise ValueError(f"command returned a non-zero exit code: {returncode}")
+
+    def start(self, runner: 'Runner', loop: asyncio.AbstractEventLoop, command: List[str], **kwargs):
+        """
+        Start the command in the background
+        :param runner: The runner
+        :param loop: The event loop driving the background commands
+        :param command: The command
+        :return: The future of the result of the command
+        """
+        capture = get_capture()
+        if runner.tracer is not None or capture is not None:
+            # The process is reaped on a thread, with os.wait4 to record the resources it used, once its output was
+            # copied to the capture of the run
+            process, pumps = self.open(runner, command, capture)
+
+            def reap():
+                with span(runner.tracer, self.get_name(), 'execute'):
+                    returncode = wait(process, runner.tracer)
+                if pumps is not None:
+                    pumps.join()
+                self.check(returncode)
+
+            return loop.run_in_executor(None, reap)
+        process = loop.run_until_complete(asyncio.create_subprocess_exec(*command, cwd=runner.get_working_directory()))
+
+        async def finish():
+            self.check(await process.wait())
+
+        return loop.create_task(finish())
@@ -1,6 +1,7 @@
 from typing import List, TYPE_CHECKING
 
 from helpers.commands.abstract_command import AbstractCommand
+from helpers.commands.arguments import Positional
 
 if TYPE_CHECKING:
     from helpers.runner import Runner
@@ -10,11 +11,9 @@ class Echo(AbstractCommand):
     name = 'echo'
     description = 'print arguments'
 
-    def setup_parser(self, parser):
-        """
-        Setup the parser
-        """
-        parser.add_argument('arguments', nargs='+')
+    schema = [
+        Positional('arguments', nargs='+'),
+    ]
 
     def __call__(self, runner: 'Runner', arguments: List[str], **kwargs):
         """
@@ -1,9 +1,12 @@
 from pathlib import Path
-from shutil import copyfile
-from typing import TYPE_CHECKING, Optional
-from os import listdir
+from typing import TYPE_CHECKING, List, Mapping, Optional
 
+from helpers.argparse import positive_integer
 from helpers.commands.abstract_command import AbstractCommand
+from helpers.commands.arguments import Positional, Option
+from helpers.files.backends import METHODS
+from helpers.files.engine import CopyEngine
+from helpers.files.links import LINKS
 
 if TYPE_CHECKING:
     from helpers.runner import Runner
@@ -13,32 +16,69 @@ class File(AbstractCommand):
     name = 'file'
     description = 'copies a file'
 
-    def setup_parser(self, parser):
-        """
-        Setup the parser
-        """
-        parser.add_argument('file')
-        parser.add_argument('--destination', default=None)
+    schema = [
+        Positional('file'),
+        Option('--destination'),
+        Option('--jobs', type=positive_integer, default=1),
+        Option('--sync', action='store_true'),
+        Option('--checksum', action='store_true'),
+        Option('--method', choices=METHODS, default='auto'),
+        Option('--link', choices=LINKS),
+        Option('--link-directories', action='store_true'),
+        Option('--preserve', action='store_true'),
+    ]
 
-    def __call__(self, runner: 'Runner', file: str, destination: Optional[str], **kwargs):
+    def __call__(self, runner: 'Runner', file: str, destination: Optional[str], jobs: int, sync: bool,
+                 checksum: bool, method: str, link: Optional[str], link_directories: bool, preserve: bool, **kwargs):
         """
         Call the command
         :param runner: The runner
         :param file: The path to the file
         :param destination: Where to copy the file, based on its name if not present
+        :param jobs: The number of files copied concurrently
+        :param sync: Whether to only copy the files missing or changed in the destination
+        :param checksum: Whether to compare the content of the files when synchronizing
+        :param method: The backend copying the content of the files, falling back to the others if not supported
+        :param link: The kind of link created instead of copying the files, hard links falling back to copies
+        :param link_directories: Whether to symbolically link whole directories instead of walking them
+        :param preserve: Whether to preserve the permissions, modification times and symbolic links
         """
-
-        def copy(file: Path, destination: Path):
-            if destination.exists():
-                raise ValueError(f"{destination} already exists")
-            if file.is_dir():
-                destination.mkdir()
-                for sub in listdir(file):
-                    copy(file / sub, destination / sub)
-            else:
-                copyfile(file, destination)
-
+        if checksum and not sync:
+            raise ValueError("--checksum requires --sync")
         destination = destination if destination else file
         file = runner.get_directory() / file
-        destination = Path.cwd() / destination
-        copy(file, destination)
+        destination = runner.get_working_directory() / destination
+        engine = CopyEngine(jobs, method, link, link_directories, preserve)
+        if sync:
+            engine.sync(file, destination, checksum)
+        else:
+            engine.copy(file, destination)
+
+    def get_inputs(self, runner: 'Runner', file: str, **kwargs) -> List[Path]:
+        """
+        Get the paths the command reads
+        :param runner: The runner
+        :param file: The path to the file
+        :param kwargs: The arguments
+        :return: The file copied
+        """
+        return [runner.get_directory() / file]
+
+    def get_outputs(self, runner: 'Runner', file: str, destination: Optional[str], **kwargs) -> List[Path]:
+        """
+        Get the paths the command creates
+        :param runner: The runner
+        :param file: The path to the file
+        :param destination: Where to copy the file, based on its name if not present
+        :param kwargs: The arguments
+        :return: The copy
+        """
+        return [runner.get_working_directory() / (destination if destination else file)]
+
+    def get_replacing_arguments(self, **kwargs) -> Mapping[str, str]:
+        """
+        Get the arguments of the command running again, synchronizing the copy instead of failing as it exists
+        :param kwargs: The arguments
+        :return: The arguments replacing the copy
+        """
+        return {**kwargs, 'sync': True}
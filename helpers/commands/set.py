@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING
 
 from helpers.argparse import check_to_type
 from helpers.commands.abstract_command import AbstractCommand
+from helpers.commands.arguments import Positional
 
 if TYPE_CHECKING:
     from helpers.runner import Runner
@@ -17,12 +18,10 @@ class Set(AbstractCommand):
     name = 'set'
     description = 'set a variable'
 
-    def setup_parser(self, parser):
-        """
-        Setup the parser
-        """
-        parser.add_argument('variable', type=check_to_type(is_variable, "invalid name for variable"))
-        parser.add_argument('value')
+    schema = [
+        Positional('variable', type=check_to_type(is_variable, "invalid name for variable")),
+        Positional('value'),
+    ]
 
     def __call__(self, runner: 'Runner', variable: str, value: str, **kwargs):
         """
@@ -0,0 +1,39 @@
+from argparse import REMAINDER
+from typing import List, TYPE_CHECKING
+
+from helpers.commands.abstract_command import AbstractCommand
+from helpers.commands.arguments import Positional, Option
+
+if TYPE_CHECKING:
+    from helpers.runner import Runner
+
+
+class Step(AbstractCommand):
+    name = 'step'
+    description = 'run a named command, after the steps it needs'
+
+    schema = [
+        Option('--needs', action='append', default=[]),
+        Option('--reads', action='append', default=[]),
+        Option('--always', action='store_true'),
+        Positional('step'),
+        Positional('command', nargs=REMAINDER),
+    ]
+
+    def __call__(self, runner: 'Runner', step: str, needs: List[str], reads: List[str], always: bool,
+                 command: List[str], **kwargs):
+        """
+        Call the command
+        :param runner: The runner
+        :param step: The name of the step
+        :param needs: The names of the steps that must run before
+        :param reads: The paths read by the command, the step running again when their content changes
+        :param always: Whether to run the step even if it already ran the same way
+        :param command: The command of the step
+        :return: The result of the command
+        """
+        runner.check_step(step, needs, command)
+        result = runner.run_step(step, command, reads, always)
+        if result == 0:
+            runner.complete_step(step)
+        return result
@@ -0,0 +1,19 @@
+from typing import TYPE_CHECKING
+
+from helpers.commands.abstract_command import AbstractCommand
+
+if TYPE_CHECKING:
+    from helpers.runner import Runner
+
+
+class Wait(AbstractCommand):
+    name = 'wait'
+    description = 'wait for the background commands'
+
+    def __call__(self, runner: 'Runner', **kwargs):
+        """
+        Call the command
+        :param runner: The runner
+        :return: The exit code of the first background command that failed
+        """
+        return runner.wait()
@@ -0,0 +1,153 @@
+from typing import Callable, List, Optional, Union, TYPE_CHECKING
+
+from helpers.colors import get_color
+from helpers.parsing.parser import Sequence as SequenceNode, Command as CommandNode, Pipeline as PipelineNode, \
+    Background as BackgroundNode
+from helpers.parsing.word import Word, Raw, Quoted, Variable
+from helpers.scheduler import is_step
+
+if TYPE_CHECKING:
+    from helpers.runner import Runner
+
+
+def describe(node: Union[CommandNode, PipelineNode, BackgroundNode]):
+    """
+    Describe a command as it was written
+    :param node: The command
+    :return: The description
+    """
+    if isinstance(node, BackgroundNode):
+        return describe(node.command) + ' &'
+    if isinstance(node, PipelineNode):
+        return ' | '.join(describe(command) for command in node.commands)
+    return ' '.join([str(argument) for argument in node.arguments] + [str(redirect) for redirect in node.redirects])
+
+
+def fold(segments: List[Union[Raw, Quoted, Variable]], parts: List[Union[str, Variable]]):
+    """
+    Flatten the segments of a word, resolving the color variables and merging the consecutive constant segments
+    :param segments: The segments
+    :param parts: The parts to extend, the merged constant segments as strings and the other variables
+    :return: The parts
+    """
+    for segment in segments:
+        if isinstance(segment, Quoted):
+            fold(segment.segments, parts)
+            continue
+        value = segment.value if isinstance(segment, Raw) else get_color(segment.name)
+        if value is None:
+            parts.append(segment)
+        elif parts and isinstance(parts[-1], str):
+            parts[-1] += value
+        else:
+            parts.append(value)
+    return parts
+
+
+def compile_parts(parts: List[Union[str, Variable]]) -> Callable[['Runner'], str]:
+    """
+    Compile the folded parts of a word to a function resolving them
+    :param parts: The parts
+    :return: The function, taking the runner holding the variables
+    """
+    if not parts:
+        return lambda runner: ''
+    if len(parts) == 1 and isinstance(parts[0], str):
+        value = parts[0]
+        return lambda runner: value
+    if len(parts) == 1:
+        name = parts[0].name
+        return lambda runner: runner.get_variable(name)
+    parts = [(part, None) if isinstance(part, str) else ('', part.name) for part in parts]
+    return lambda runner: ''.join([value if name is None else runner.get_variable(name) for value, name in parts])
+
+
+def compile_word(word: Word) -> Callable[['Runner'], str]:
+    """
+    Compile a word to a function resolving it
+    :param word: The word
+    :return: The function, taking the runner holding the variables
+    """
+    return compile_parts(fold(word.segments, []))
+
+
+def compile_arguments(arguments: List[Word]) -> Callable[['Runner'], List[str]]:
+    """
+    Compile the arguments of a command to a function resolving them
+    :param arguments: The arguments
+    :return: The function, taking the runner holding the variables
+    """
+    values = []
+    for argument in arguments:
+        parts = fold(argument.segments, [])
+        if all(isinstance(part, str) for part in parts):
+            values.append(''.join(parts))
+        else:
+            values.append(compile_parts(parts))
+    if all(isinstance(value, str) for value in values):
+        return lambda runner: list(values)
+    return lambda runner: [value if isinstance(value, str) else value(runner) for value in values]
+
+
+def compile_element(element: Union[CommandNode, PipelineNode, BackgroundNode],
+                    description: Optional[str] = None) -> Callable[['Runner'], int]:
+    """
+    Compile an element of a sequence to a function running it
+    :param element: The element
+    :param description: The description of the element, described again if None
+    :return: The function, taking the runner and returning the exit code of the element
+    """
+    header = '> ' + (describe(element) if description is None else description)
+    if isinstance(element, BackgroundNode):
+        command = element.command
+
+        def run(runner: 'Runner'):
+            print(header)
+            runner.background(command)
+            return 0
+    elif isinstance(element, PipelineNode) or element.redirects:
+        stages = element.commands if isinstance(element, PipelineNode) else [element]
+
+        def run(runner: 'Runner'):
+            print(header)
+            return runner.pipe(stages)
+    else:
+        arguments = compile_arguments(element.arguments)
+
+        def run(runner: 'Runner'):
+            print(header)
+            if runner.tracer is None:
+                return runner.execute(arguments(runner))
+            with runner.tracer.span('resolve', 'resolve'):
+                values = arguments(runner)
+            return runner.execute(values)
+    return run
+
+
+class CompiledElement:
+    """
+    An element of a sequence compiled to a function running it, with what the runner needs to know about it
+    """
+    description: str
+    step: Optional[CommandNode]
+    run: Callable[['Runner'], int]
+    __slots__ = ('description', 'step', 'run')
+
+    def __init__(self, element: Union[CommandNode, PipelineNode, BackgroundNode]):
+        """
+        Compile an element
+        :param element: The element
+        """
+        self.description = describe(element)
+        # Only the steps keep their node, to be scheduled as a dependency graph with the steps around them
+        self.step = element if is_step(element) else None
+        self.run = compile_element(element, self.description)
+
+
+def compile_sequence(ast: SequenceNode) -> List[CompiledElement]:
+    """
+    Compile the elements of a sequence
+    :param ast: The sequence
+    :return: The compiled elements
+    """
+    return [CompiledElement(element) for element in ast.commands]
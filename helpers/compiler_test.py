@@ -0,0 +1,63 @@
+from io import StringIO
+
+import pytest
+
+from helpers.compiler import compile_arguments, compile_element, fold
+from helpers.parsing.lexer import Lexer
+from helpers.parsing.parser import Parser
+from helpers.runner import Runner
+
+
+def parse(config: str):
+    return Parser(Lexer(StringIO(config))).parse().commands[0]
+
+
+@pytest.mark.parametrize(['config', 'expected'], [
+    pytest.param('echo a b', ['echo', 'a', 'b'], id="constant"),
+    pytest.param('echo ${name}', ['echo', 'value'], id="variable"),
+    pytest.param('echo "a ${name} b"x\\$', ['echo', 'a value bx$'], id="quoted"),
+    pytest.param('echo ""', ['echo', ''], id="empty"),
+    pytest.param('echo "${COLOR:2}a${COLOR:1:2:3}"${RESET}', ['echo', '\033[38;5;2ma\033[38;2;1;2;3m\033[39m'],
+                 id="colors"),
+])
+def test_compile_arguments(tmp_path, config, expected):
+    runner = Runner(tmp_path)
+    runner.set_variable('name', 'value')
+    assert compile_arguments(parse(config).arguments)(runner) == expected
+
+
+def test_compile_element(tmp_path, capfd):
+    runner = Runner(tmp_path)
+    runner.set_variable('name', 'value')
+    assert compile_element(parse('echo "${name}"'))(runner) == 0
+    assert capfd.readouterr().out == '> echo "${name}"\nvalue\n'
+
+
+class RecordingRunner(Runner):
+    """
+    A runner recording the variables it is asked for
+    """
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.names = []
+
+    def get_variable(self, name: str):
+        self.names.append(name)
+        return super().get_variable(name)
+
+
+def test_compile_colors_folded(tmp_path):
+    arguments = parse('echo ${COLOR:2}a${name}${RESET}').arguments
+    parts = fold(arguments[1].segments, [])
+    assert [part if isinstance(part, str) else part.name for part in parts] == ['\033[38;5;2ma', 'name', '\033[39m']
+    runner = RecordingRunner(tmp_path)
+    runner.set_variable('name', 'value')
+    assert compile_arguments(arguments)(runner) == ['echo', '\033[38;5;2mavalue\033[39m']
+    assert runner.names == ['name']
+
+
+def test_compile_invalid_color(tmp_path):
+    resolve = compile_arguments(parse('echo ${COLOR:256}').arguments)
+    with pytest.raises(ValueError, match='variable COLOR:256 not found'):
+        resolve(Runner(tmp_path))
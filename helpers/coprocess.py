@@ -0,0 +1,110 @@
+import os
+import shlex
+import shutil
+from subprocess import Popen
+from threading import Lock
+from typing import List, Optional
+
+# The shell running the commands
+SHELL = '/bin/sh'
+# The directory exposing the file descriptors of a process as files
+DESCRIPTORS = '/dev/fd'
+
+
+class Coprocess:
+    """
+    A long-lived shell running commands one after the other
+
+    The shell reads the commands from a pipe opened as its script, so that the commands keep the original standard
+    input. The exit code of each command is written by the shell to a status pipe.
+    """
+    process: Popen
+    commands: int
+    status: int
+    output: int
+    lock: Lock
+
+    def __init__(self, process, commands, status, output):
+        """
+        Create a coprocess, use start to start one
+        :param process: The shell process
+        :param commands: The descriptor writing the script of the shell
+        :param status: The descriptor reading the exit codes
+        :param output: The descriptor of the status pipe, in the shell
+        """
+        self.process = process
+        self.commands = commands
+        self.status = status
+        self.output = output
+        self.lock = Lock()
+
+    @classmethod
+    def start(cls, directory: Optional[str] = None) -> Optional['Coprocess']:
+        """
+        Start a shell coprocess
+        :param directory: The directory the commands run in, the current directory if None
+        :return: The coprocess, None if it could not be started
+        """
+        if not os.path.exists(SHELL) or not os.path.isdir(DESCRIPTORS):
+            return None
+        commands_read, commands_write = os.pipe()
+        status_read, status_write = os.pipe()
+        try:
+            process = Popen([SHELL, f'{DESCRIPTORS}/{commands_read}'], pass_fds=(commands_read, status_write),
+                            cwd=directory)
+        except OSError:
+            os.close(commands_write)
+            os.close(status_read)
+            return None
+        finally:
+            os.close(commands_read)
+            os.close(status_write)
+        return cls(process, commands_write, status_read, status_write)
+
+    def send(self, script: str):
+        """
+        Send a script to the shell
+        :param script: The script
+        """
+        data = script.encode()
+        while data:
+            data = data[os.write(self.commands, data):]
+
+    def receive(self):
+        """
+        Receive an exit code from the shell
+        :return: The exit code
+        """
+        line = b''
+        while not line.endswith(b'\n'):
+            chunk = os.read(self.status, 1)
+            if not chunk:
+                raise ValueError("the shell coprocess exited")
+            line += chunk
+        return int(line)
+
+    def run(self, command: List[str]):
+        """
+        Run a command in the shell, as a program and never as a shell builtin
+        :param command: The command
+        :return: The exit code of the command
+        """
+        program = command[0] if os.sep in command[0] else shutil.which(command[0])
+        if program is None:
+            raise FileNotFoundError(f"No such file or directory: {repr(command[0])}")
+        arguments = ' '.join(shlex.quote(argument) for argument in [program, *command[1:]])
+        with self.lock:
+            self.send(f"{arguments}\nprintf '%s\\n' \"$?\" >{DESCRIPTORS}/{self.output}\n")
+            return self.receive()
+
+    def close(self):
+        """
+        Stop the shell
+        """
+        try:
+            self.send('exit 0\n')
+        except OSError:
+            pass
+        os.close(self.commands)
+        self.process.wait()
+        os.close(self.status)
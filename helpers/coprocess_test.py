@@ -0,0 +1,45 @@
+from io import StringIO
+
+import pytest
+
+from helpers.coprocess import Coprocess
+from helpers.parsing.lexer import Lexer
+from helpers.parsing.parser import Parser
+from helpers.runner import Runner
+
+
+@pytest.fixture
+def coprocess():
+    coprocess = Coprocess.start()
+    yield coprocess
+    coprocess.close()
+
+
+def test_coprocess_exit_codes(coprocess):
+    assert coprocess.run(['true']) == 0
+    assert coprocess.run(['sh', '-c', 'exit 3']) == 3
+    assert coprocess.run(['true']) == 0
+
+
+def test_coprocess_quoting(capfd):
+    coprocess = Coprocess.start()
+    try:
+        assert coprocess.run(['echo', "it's", '$HOME', 'a;b', '`x`']) == 0
+    finally:
+        coprocess.close()
+    assert capfd.readouterr().out == "it's $HOME a;b `x`\n"
+
+
+def test_coprocess_missing(coprocess):
+    with pytest.raises(FileNotFoundError):
+        coprocess.run(['missing-program-for-the-test'])
+    assert coprocess.run(['true']) == 0
+
+
+def test_runner_coprocess(tmp_path, capfd):
+    config = 'command echo first\ncommand sh -c "exit 4"\n'
+    runner = Runner(tmp_path, shell=True)
+    assert runner.run(Parser(Lexer(StringIO(config))).parse()) == 1
+    lines = [line for line in capfd.readouterr().out.splitlines() if not line.startswith('>')]
+    assert lines == ['first']
+    assert runner.coprocess is None
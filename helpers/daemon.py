@@ -0,0 +1,219 @@
+import os
+import selectors
+import signal
+import socket
+import struct
+import sys
+import traceback
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from helpers.client import REQUEST, RESPONSE, INTERRUPT, decode, receive
+
+# The time a client has to send its request, in seconds
+TIMEOUT = 5
+
+
+class Daemon:
+    """
+    A long-lived process running the script for the clients connected to a Unix socket
+
+    Each run happens in a process forked from the daemon, in its own session, with the standard streams, working
+    directory and environment of the client: the output goes straight to the client, and the commands read its input.
+    The state prepared by the daemon before forking, like the parsed configurations, is shared by the runs.
+    """
+    path: Path
+    run: Callable[[List[str]], int]
+    prepare: Callable[[List[str], Dict[str, str]], None]
+    listener: socket.socket
+    selector: selectors.BaseSelector
+    wakeup: int
+    runs: Dict[int, socket.socket]
+
+    def __init__(self, path, run, prepare):
+        """
+        Create a daemon
+        :param path: The path to the socket
+        :param run: The function running the script given its arguments, returning its exit code
+        :param prepare: The function preparing a run in the daemon given the arguments of the script and the environment
+                        variables of the client, before forking
+        """
+        self.path = path
+        self.run = run
+        self.prepare = prepare
+        self.listener = None
+        self.selector = selectors.DefaultSelector()
+        self.wakeup = -1
+        self.runs = {}
+
+    def listen(self):
+        """
+        Listen on the socket, replacing the socket left by a daemon that stopped
+        """
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.path))
+            raise ValueError(f"a daemon is already listening on {self.path}")
+        except (FileNotFoundError, ConnectionRefusedError):
+            pass
+        finally:
+            probe.close()
+        if self.path.is_socket():
+            self.path.unlink()
+
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        mask = os.umask(0o177)
+        try:
+            self.listener.bind(str(self.path))
+        finally:
+            os.umask(mask)
+        self.listener.listen()
+        self.selector.register(self.listener, selectors.EVENT_READ, self.accept)
+
+        self.wakeup, wakeup = os.pipe()
+        os.set_blocking(wakeup, False)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.set_wakeup_fd(wakeup)
+        self.selector.register(self.wakeup, selectors.EVENT_READ, self.reap)
+
+    def serve(self):
+        """
+        Run the clients until interrupted, once listening
+        """
+        while True:
+            for key, _ in self.selector.select():
+                key.data(key.fileobj)
+
+    def accept(self, listener: socket.socket):
+        """
+        Accept a client and start its run
+        :param listener: The listening socket
+        """
+        connection, _ = listener.accept()
+        descriptors = []
+        try:
+            connection.settimeout(TIMEOUT)
+            header, descriptors, _, _ = socket.recv_fds(connection, REQUEST.size, 3)
+            size, = REQUEST.unpack(header)
+            request = decode(receive(connection, size))
+            connection.settimeout(None)
+            if len(descriptors) != 3:
+                raise ValueError("missing standard streams")
+        except (OSError, ValueError, IndexError, struct.error):
+            connection.close()
+            for descriptor in descriptors:
+                os.close(descriptor)
+            return
+
+        try:
+            self.prepare(request[0], request[2])
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pid = os.fork()
+            if pid == 0:
+                self.child(request, descriptors)
+        except BaseException:
+            connection.close()
+            raise
+        finally:
+            for descriptor in descriptors:
+                os.close(descriptor)
+        self.runs[pid] = connection
+        self.selector.register(connection, selectors.EVENT_READ, self.interrupt)
+
+    def child(self, request, descriptors: List[int]):
+        """
+        Run the script for a client, in the forked process
+        :param request: The arguments of the script, the working directory and the environment variables of the client
+        :param descriptors: The standard input, output and error of the client
+        """
+        exit = 1
+        try:
+            os.setsid()
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            signal.signal(signal.SIGHUP, signal.SIG_DFL)
+            self.selector.close()
+            self.listener.close()
+            for connection in self.runs.values():
+                connection.close()
+            for target, descriptor in enumerate(descriptors):
+                os.dup2(descriptor, target)
+            for descriptor in descriptors:
+                if descriptor > 2:
+                    os.close(descriptor)
+            sys.stdin = open(0, closefd=False)
+            sys.stdout = open(1, 'w', closefd=False)
+            sys.stderr = open(2, 'w', buffering=1, closefd=False)
+            arguments, directory, environment = request
+            os.chdir(directory)
+            os.environ.clear()
+            os.environ.update(environment)
+            exit = self.run(arguments)
+        except SystemExit as e:
+            if isinstance(e.code, int) or e.code is None:
+                exit = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+        except KeyboardInterrupt:
+            exit = 128 + signal.SIGINT
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(exit)
+
+    def interrupt(self, connection: socket.socket):
+        """
+        Forward the interruption of a client to its run, or hang up the run if the client left
+        :param connection: The connection of the client
+        """
+        pid = next(pid for pid, run in self.runs.items() if run is connection)
+        try:
+            data = connection.recv(1)
+        except OSError:
+            data = b''
+        if not data:
+            self.selector.unregister(connection)
+        try:
+            os.killpg(pid, signal.SIGINT if data == INTERRUPT else signal.SIGHUP)
+        except ProcessLookupError:
+            pass
+
+    def reap(self, wakeup: int):
+        """
+        Send the exit code of the runs that ended to their client
+        :param wakeup: The descriptor the signals are written to
+        """
+        os.read(wakeup, 512)
+        for pid in list(self.runs):
+            try:
+                ended, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                ended, status = pid, 1 << 8
+            if ended == 0:
+                continue
+            connection = self.runs.pop(pid)
+            try:
+                connection.sendall(RESPONSE.pack(os.waitstatus_to_exitcode(status)))
+            except OSError:
+                pass
+            if connection.fileno() in self.selector.get_map():
+                self.selector.unregister(connection)
+            connection.close()
+
+    def close(self):
+        """
+        Stop listening, the runs started continue
+        """
+        signal.set_wakeup_fd(-1)
+        self.selector.close()
+        if self.listener is not None:
+            self.listener.close()
+            self.path.unlink(missing_ok=True)
+        for connection in self.runs.values():
+            connection.close()
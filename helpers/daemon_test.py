@@ -0,0 +1,60 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from helpers.client import encode, decode
+
+# The script
+SCRIPT = Path(__file__).parent.parent / 'script.py'
+
+
+def test_request_encoding():
+    arguments = ['run', 'my setup', '--jobs', '2', 'é']
+    environment = {'HOME': '/home/me', 'EMPTY': '', 'EQUALS': 'a=b'}
+    assert decode(encode(arguments, '/tmp', environment)) == (arguments, '/tmp', environment)
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    setup = tmp_path / '.setups' / 'greet'
+    setup.mkdir(parents=True)
+    (setup / '.config.setup').write_text('ask name "Name?"\necho "hello ${name}"\ncommand sh -c "exit 4"\n')
+    environment = {**os.environ, 'HOME': str(tmp_path), 'SETUPS_SOCKET': str(tmp_path / 'daemon.sock'),
+                   'XDG_CACHE_HOME': str(tmp_path / 'cache')}
+    process = subprocess.Popen([sys.executable, str(SCRIPT), 'serve'], env=environment, stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        if (tmp_path / 'daemon.sock').exists():
+            break
+        time.sleep(0.05)
+    assert (tmp_path / 'daemon.sock').exists()
+    yield environment
+    process.send_signal(signal.SIGINT)
+    process.wait()
+    assert not (tmp_path / 'daemon.sock').exists()
+
+
+def test_daemon_run(daemon, tmp_path):
+    for _ in range(2):
+        result = subprocess.run([sys.executable, str(SCRIPT), 'greet', str(tmp_path / 'target')], env=daemon,
+                                input='world\n', capture_output=True, text=True)
+        assert 'hello world\n' in result.stdout
+        assert 'non-zero exit code: 4' in result.stderr
+        assert result.returncode == 3
+    result = subprocess.run([sys.executable, str(SCRIPT), 'list'], env=daemon, capture_output=True, text=True)
+    assert result.stdout == 'Available setups:\ngreet\n'
+
+
+def test_daemon_setups_path(daemon, tmp_path):
+    setup = tmp_path / 'other' / 'greet'
+    setup.mkdir(parents=True)
+    (setup / '.config.setup').write_text('echo "from the client path"\n')
+    environment = {**daemon, 'SETUPS_PATH': str(tmp_path / 'other')}
+    result = subprocess.run([sys.executable, str(SCRIPT), 'greet', str(tmp_path / 'target')], env=environment,
+                            capture_output=True, text=True)
+    assert 'from the client path\n' in result.stdout
+    assert result.returncode == 0
@@ -0,0 +1,170 @@
+import errno
+import os
+from pathlib import Path
+from shutil import copyfileobj
+from typing import BinaryIO
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# The ioctl cloning a file on copy-on-write filesystems (btrfs, xfs), from linux/fs.h
+FICLONE = getattr(fcntl, 'FICLONE', 0x40049409)
+# The maximum number of bytes copied by a single system call
+CHUNK = 1024 * 1024 * 1024
+# The size of the buffer when reading and writing
+BUFFER = 1024 * 1024
+# The errors meaning that a backend cannot copy this file, and that the next one should be tried
+UNSUPPORTED = {
+    errno.EBADF, errno.EINVAL, errno.ENOSYS, errno.ENOTSUP, errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV,
+}
+
+
+class UnsupportedBackend(Exception):
+    pass
+
+
+def reflink(source: BinaryIO, destination: BinaryIO, size: int):
+    """
+    Clone the file, sharing its blocks
+    """
+    if fcntl is None:
+        raise UnsupportedBackend()
+    fcntl.ioctl(destination.fileno(), FICLONE, source.fileno())
+
+
+def copy_range(source: BinaryIO, destination: BinaryIO, size: int, offset: int = 0):
+    """
+    Copy a range of the file inside the kernel with copy_file_range, unsupported if it stops before the end
+    """
+    if not hasattr(os, 'copy_file_range'):
+        raise UnsupportedBackend()
+    end = offset + size
+    while offset < end:
+        copied = os.copy_file_range(source.fileno(), destination.fileno(), min(end - offset, CHUNK), offset, offset)
+        if copied == 0:
+            raise UnsupportedBackend()
+        offset += copied
+
+
+def sendfile(source: BinaryIO, destination: BinaryIO, size: int):
+    """
+    Copy the file inside the kernel with sendfile, unsupported if it stops before the end
+    """
+    if not hasattr(os, 'sendfile'):
+        raise UnsupportedBackend()
+    offset = 0
+    while offset < size:
+        copied = os.sendfile(destination.fileno(), source.fileno(), offset, min(size - offset, CHUNK))
+        if copied == 0:
+            raise UnsupportedBackend()
+        offset += copied
+
+
+def sparse(source: BinaryIO, destination: BinaryIO, size: int):
+    """
+    Copy only the data extents of the file, leaving its holes unallocated
+    """
+    if not hasattr(os, 'SEEK_DATA'):
+        raise UnsupportedBackend()
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(source.fileno(), offset, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno != errno.ENXIO:
+                raise
+            break
+        end = os.lseek(source.fileno(), start, os.SEEK_HOLE)
+        try:
+            copy_range(source, destination, end - start, start)
+        except UnsupportedBackend:
+            read_write_range(source, destination, end - start, start)
+        except OSError as e:
+            if e.errno not in UNSUPPORTED:
+                raise
+            read_write_range(source, destination, end - start, start)
+        offset = end
+    os.ftruncate(destination.fileno(), size)
+
+
+def read_write_range(source: BinaryIO, destination: BinaryIO, size: int, offset: int):
+    """
+    Copy a range of the file by reading and writing it
+    """
+    end = offset + size
+    while offset < end:
+        chunk = memoryview(os.pread(source.fileno(), min(end - offset, BUFFER), offset))
+        if not chunk:
+            break
+        while chunk:
+            written = os.pwrite(destination.fileno(), chunk, offset)
+            chunk = chunk[written:]
+            offset += written
+
+
+def read_write(source: BinaryIO, destination: BinaryIO, size: int):
+    """
+    Copy the file by reading and writing it
+    """
+    copyfileobj(source, destination, BUFFER)
+    destination.flush()
+
+
+# The available backends, in the order they are tried
+BACKENDS = {
+    'reflink': reflink,
+    'copy_file_range': copy_range,
+    'sendfile': sendfile,
+    'sparse': sparse,
+    'copy': read_write,
+}
+# The available methods
+METHODS = ['auto', *BACKENDS]
+
+
+def get_chain(method: str, sparse_file: bool):
+    """
+    Get the backends to try for a method
+    :param method: The method selected
+    :param sparse_file: Whether the file has holes
+    :return: The backends in the order they should be tried
+    """
+    chain = list(BACKENDS)
+    chain.remove('sparse')
+    if sparse_file:
+        chain.insert(1, 'sparse')
+    if method != 'auto':
+        if method in chain:
+            chain.remove(method)
+        chain.insert(0, method)
+    return chain
+
+
+def copy_file(source: Path, destination: Path, method: str = 'auto'):
+    """
+    Copy the content of a file, falling back to the next backend if a backend is not supported
+    :param source: The file to copy
+    :param destination: Where to copy the file
+    :param method: The backend to try first
+    :return: The name of the backend that copied the file
+    """
+    if method not in METHODS:
+        raise ValueError(f"invalid copy method {method}")
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        stat = os.fstat(src.fileno())
+        sparse_file = getattr(stat, 'st_blocks', stat.st_size) * 512 < stat.st_size
+        for name in get_chain(method, sparse_file):
+            try:
+                BACKENDS[name](src, dst, stat.st_size)
+                return name
+            except UnsupportedBackend:
+                pass
+            except OSError as e:
+                if e.errno not in UNSUPPORTED:
+                    raise
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+    raise ValueError(f"could not copy {source}")
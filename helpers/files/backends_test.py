@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from helpers.files.backends import copy_file, METHODS, get_chain
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_copy_file(tmp_path, method):
+    content = os.urandom(3 * 1024 * 1024 + 17)
+    (tmp_path / 'source').write_bytes(content)
+    used = copy_file(tmp_path / 'source', tmp_path / 'destination', method)
+    assert used in METHODS
+    assert (tmp_path / 'destination').read_bytes() == content
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_copy_sparse_file(tmp_path, method):
+    with (tmp_path / 'source').open('wb') as f:
+        f.write(b'start')
+        f.seek(16 * 1024 * 1024)
+        f.write(b'middle')
+        f.truncate(32 * 1024 * 1024)
+    copy_file(tmp_path / 'source', tmp_path / 'destination', method)
+    assert (tmp_path / 'destination').read_bytes() == (tmp_path / 'source').read_bytes()
+
+
+@pytest.mark.parametrize('method', ['copy_file_range', 'sendfile'])
+def test_copy_file_short(tmp_path, monkeypatch, method):
+    content = os.urandom(3 * 1024 * 1024 + 17)
+    (tmp_path / 'source').write_bytes(content)
+    calls = []
+
+    def short(*args):
+        calls.append(args)
+        return 1024 if len(calls) == 1 else 0
+    monkeypatch.setattr(os, 'copy_file_range', short)
+    monkeypatch.setattr(os, 'sendfile', short)
+    monkeypatch.setattr('helpers.files.backends.fcntl', None)
+    assert copy_file(tmp_path / 'source', tmp_path / 'destination', method) == 'copy'
+    assert (tmp_path / 'destination').read_bytes() == content
+
+
+@pytest.mark.parametrize(['method', 'sparse_file', 'expected'], [
+    pytest.param('auto', False, ['reflink', 'copy_file_range', 'sendfile', 'copy'], id='auto'),
+    pytest.param('auto', True, ['reflink', 'sparse', 'copy_file_range', 'sendfile', 'copy'], id='auto sparse'),
+    pytest.param('sendfile', False, ['sendfile', 'reflink', 'copy_file_range', 'copy'], id='sendfile'),
+    pytest.param('sparse', False, ['sparse', 'reflink', 'copy_file_range', 'sendfile', 'copy'], id='sparse'),
+])
+def test_get_chain(method, sparse_file, expected):
+    assert get_chain(method, sparse_file) == expected
@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture
+def source(tmp_path):
+    source = tmp_path / 'source'
+    (source / 'directory').mkdir(parents=True)
+    (source / 'first').write_text('first')
+    (source / 'directory' / 'second').write_text('second')
+    return source
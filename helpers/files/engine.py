@@ -0,0 +1,269 @@
+import os
+import stat as stats
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from threading import Condition
+from typing import Optional, Tuple, Callable, List
+
+from helpers.files.backends import copy_file, METHODS
+from helpers.files.links import get_link_file, symbolic_link, replace, LINKS
+from helpers.files.sync import Synchronizer
+from helpers.files.walker import plan, Entry, ENTRY
+
+
+def preserve_metadata(entry: Entry):
+    """
+    Copy the permissions and modification time of an entry to its destination
+    :param entry: The entry
+    """
+    if entry.type is not ENTRY.SYMLINK:
+        os.chmod(entry.destination, stats.S_IMODE(entry.stat.st_mode))
+    os.utime(entry.destination, ns=(entry.stat.st_atime_ns, entry.stat.st_mtime_ns), follow_symlinks=False)
+
+
+def copy_symlink(source: Path, destination: Path):
+    """
+    Recreate a symbolic link, keeping the destination if it already points to the same target
+    :param source: The symbolic link
+    :param destination: Where to create the link
+    :return: How the file was materialized
+    """
+    target = os.readlink(source)
+    if destination.is_symlink() and os.readlink(destination) == target:
+        return 'symlink'
+    replace(destination)
+    os.symlink(target, destination)
+    return 'symlink'
+
+
+class Copy:
+    """
+    A single copy of a tree
+
+    The tree is walked as a stream of entries, the directories are created on the walking thread and the files are
+    materialized on the executor. Each entry is identified by its position in the walk, so that the files can be
+    copied in any order while the failure reported is always the first one a sequential copy would have met.
+    """
+    executor: Optional[ThreadPoolExecutor]
+    copy_file: Callable[[Path, Path], str]
+    link_directory: Optional[Callable[[Path, Path], str]]
+    synchronizer: Optional[Synchronizer]
+    preserve: bool
+    condition: Condition
+    pending: int
+    failure: Optional[Tuple[int, BaseException]]
+    directories: List[Entry]
+
+    def __init__(self, executor, copy_file, link_directory=None, synchronizer=None, preserve=False):
+        """
+        Create a new copy
+        :param executor: The executor running the tasks, the tasks are run inline if None
+        :param copy_file: The function copying the content of a file
+        :param link_directory: The function linking a whole directory, directories are walked if None
+        :param synchronizer: The synchronizer deciding which files to copy, existing destinations fail if None
+        :param preserve: Whether to preserve the permissions, modification times and symbolic links
+        """
+        self.executor = executor
+        self.copy_file = copy_file
+        self.link_directory = link_directory
+        self.synchronizer = synchronizer
+        self.preserve = preserve
+        self.condition = Condition()
+        self.pending = 0
+        self.failure = None
+        self.directories = []
+
+    def fail(self, key: int, error: BaseException):
+        """
+        Record a failure
+        :param key: The key of the failing entry
+        :param error: The error
+        """
+        with self.condition:
+            if self.failure is None or key < self.failure[0]:
+                self.failure = (key, error)
+
+    def submit(self, key: int, entry: Entry):
+        """
+        Submit an entry to materialize
+        :param key: The key of the entry, its position in the walk
+        :param entry: The entry
+        """
+        with self.condition:
+            self.pending += 1
+        if self.executor is None:
+            self.run(key, entry)
+        else:
+            self.executor.submit(self.run, key, entry)
+
+    def run(self, key: int, entry: Entry):
+        """
+        Materialize an entry, recording its failure
+        :param key: The key of the entry
+        :param entry: The entry
+        """
+        try:
+            with self.condition:
+                if self.failure is not None and self.failure[0] < key:
+                    return
+            self.materialize(entry)
+        except BaseException as e:
+            self.fail(key, e)
+        finally:
+            with self.condition:
+                self.pending -= 1
+                if self.pending == 0:
+                    self.condition.notify_all()
+
+    def materialize(self, entry: Entry):
+        """
+        Materialize a file, a symbolic link, or a linked directory
+        :param entry: The entry
+        """
+        source, destination = Path(entry.source), Path(entry.destination)
+        if entry.type is ENTRY.DIRECTORY:
+            self.link_directory(source, destination)
+            return
+        if entry.type is ENTRY.SYMLINK:
+            copy_symlink(source, destination)
+        elif self.synchronizer is None:
+            self.copy_file(source, destination)
+        else:
+            self.synchronizer(source, destination)
+        if self.preserve:
+            preserve_metadata(entry)
+
+    def make_directories(self, directories: List[Entry]):
+        """
+        Create a batch of directories, parents first
+        :param directories: The directories
+        """
+        for directory in directories:
+            try:
+                os.mkdir(directory.destination)
+            except FileExistsError:
+                if self.synchronizer is None:
+                    raise ValueError(f"{directory.destination} already exists")
+                if not os.path.isdir(directory.destination):
+                    raise ValueError(f"{directory.destination} already exists and is not a directory")
+        if self.preserve:
+            self.directories.extend(directories)
+
+    def __call__(self, source: Path, destination: Path):
+        """
+        Run the copy
+        :param source: The file to copy
+        :param destination: Where to copy the file
+        """
+        if self.synchronizer is None and destination.exists():
+            raise ValueError(f"{destination} already exists")
+
+        entries = plan(str(source), str(destination), follow_symlinks=not self.preserve,
+                       recurse=self.link_directory is None, stat=self.preserve)
+        directories = []
+        key = 0
+        while self.failure is None:
+            try:
+                entry = next(entries, None)
+                if entry is None or entry.type is not ENTRY.DIRECTORY or self.link_directory is not None:
+                    self.make_directories(directories)
+                    directories = []
+            except BaseException as e:
+                self.fail(key, e)
+                break
+            if entry is None:
+                break
+            if entry.type is ENTRY.DIRECTORY and self.link_directory is None:
+                directories.append(entry)
+            else:
+                self.submit(key, entry)
+            key += 1
+
+        with self.condition:
+            while self.pending:
+                self.condition.wait()
+        if self.failure is not None:
+            raise self.failure[1]
+
+        for directory in reversed(self.directories):
+            preserve_metadata(directory)
+
+
+class CopyEngine:
+    jobs: int
+    method: str
+    link: Optional[str]
+    link_directories: bool
+    preserve: bool
+
+    def __init__(self, jobs: int = 1, method: str = 'auto', link: Optional[str] = None, link_directories: bool = False,
+                 preserve: bool = False):
+        """
+        Create a new copy engine
+        :param jobs: The number of files copied concurrently
+        :param method: The backend copying the content of the files
+        :param link: The kind of link created instead of copying the files, None to copy them
+        :param link_directories: Whether to symbolically link whole directories instead of walking them
+        :param preserve: Whether to preserve the permissions, modification times and symbolic links
+        """
+        if jobs < 1:
+            raise ValueError("invalid number of jobs")
+        if method not in METHODS:
+            raise ValueError(f"invalid copy method {method}")
+        if link is not None and link not in LINKS:
+            raise ValueError(f"invalid link {link}")
+        if link_directories and link != 'sym':
+            raise ValueError("directories can only be linked symbolically")
+        self.jobs = jobs
+        self.method = method
+        self.link = link
+        self.link_directories = link_directories
+        self.preserve = preserve
+
+    def copy(self, source: Path, destination: Path):
+        """
+        Copy a file or a directory tree, failing if any destination already exists
+        :param source: The file to copy
+        :param destination: Where to copy the file
+        """
+        self.run(source, destination, None)
+
+    def sync(self, source: Path, destination: Path, checksum: bool = False):
+        """
+        Copy the files of a tree that are missing or changed in the destination
+        :param source: The file to copy
+        :param destination: Where to copy the file
+        :param checksum: Whether to compare the content of the files, and not only their size and modification time
+        """
+        if checksum and self.link is not None:
+            raise ValueError("links cannot be synchronized with checksums")
+        synchronizer = Synchronizer(source, destination, checksum, self.get_copy_file())
+        try:
+            self.run(source, destination, synchronizer)
+        finally:
+            synchronizer.save()
+
+    def run(self, source: Path, destination: Path, synchronizer: Optional[Synchronizer]):
+        """
+        Run a copy on the engine threads
+        :param source: The file to copy
+        :param destination: Where to copy the file
+        :param synchronizer: The synchronizer deciding which files to copy, None to copy everything
+        """
+        link_directory = symbolic_link if self.link_directories else None
+        if self.jobs == 1:
+            Copy(None, self.get_copy_file(), link_directory, synchronizer, self.preserve)(source, destination)
+            return
+        with ThreadPoolExecutor(self.jobs) as executor:
+            Copy(executor, self.get_copy_file(), link_directory, synchronizer, self.preserve)(source, destination)
+
+    def get_copy_file(self):
+        """
+        Get the function materializing a file
+        :return: The function
+        """
+        copy = partial(copy_file, method=self.method)
+        if self.link is None:
+            return copy
+        return get_link_file(self.link, copy)
@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from helpers.files.engine import CopyEngine
+
+
+def make_tree(root: Path, width: int, depth: int):
+    root.mkdir()
+    for i in range(width):
+        (root / f'file{i}').write_text(f'{root.name} {i}')
+        if depth > 0:
+            make_tree(root / f'directory{i}', width, depth - 1)
+
+
+def read_tree(root: Path):
+    return {
+        path.relative_to(root): None if path.is_dir() else path.read_text() for path in root.rglob('*')
+    }
+
+
+@pytest.mark.parametrize('jobs', [1, 2, 8])
+def test_copy_tree(tmp_path, jobs):
+    make_tree(tmp_path / 'source', 4, 3)
+    CopyEngine(jobs).copy(tmp_path / 'source', tmp_path / 'destination')
+    assert read_tree(tmp_path / 'destination') == read_tree(tmp_path / 'source')
+
+
+@pytest.mark.parametrize('jobs', [1, 2, 8])
+def test_copy_first_failure(tmp_path, jobs):
+    make_tree(tmp_path / 'source', 4, 2)
+    make_tree(tmp_path / 'destination', 4, 2)
+    with pytest.raises(ValueError, match='destination already exists'):
+        CopyEngine(jobs).copy(tmp_path / 'source', tmp_path / 'destination')
+
+
+@pytest.mark.parametrize('jobs', [1, 2, 8])
+def test_copy_deterministic_failure(tmp_path, jobs):
+    make_tree(tmp_path / 'source', 4, 2)
+    for name in ['directory3/file0', 'directory1/file2', 'directory1/directory0/file1']:
+        (tmp_path / 'source' / name).unlink()
+        (tmp_path / 'source' / name).symlink_to(tmp_path / 'missing')
+    for i in range(5):
+        with pytest.raises(FileNotFoundError) as e:
+            CopyEngine(jobs).copy(tmp_path / 'source', tmp_path / f'destination{i}')
+        assert Path(e.value.filename) == tmp_path / 'source' / 'directory1' / 'directory0' / 'file1'
+
+
+@pytest.mark.parametrize('jobs', [1, 4])
+def test_copy_preserve(tmp_path, jobs):
+    source = tmp_path / 'source'
+    (source / 'bin').mkdir(parents=True)
+    (source / 'bin' / 'script').write_text('#!/bin/sh\n')
+    (source / 'bin' / 'script').chmod(0o755)
+    (source / 'link').symlink_to('bin/script')
+    (source / 'bin').chmod(0o555)
+    os.utime(source / 'bin', ns=(0, 1_000_000_000))
+
+    CopyEngine(jobs, preserve=True).copy(source, tmp_path / 'destination')
+    destination = tmp_path / 'destination'
+    assert (destination / 'bin' / 'script').stat().st_mode & 0o777 == 0o755
+    assert (destination / 'bin' / 'script').stat().st_mtime_ns == (source / 'bin' / 'script').stat().st_mtime_ns
+    assert (destination / 'bin').stat().st_mode & 0o777 == 0o555
+    assert (destination / 'bin').stat().st_mtime_ns == 1_000_000_000
+    assert os.readlink(destination / 'link') == 'bin/script'
+    (source / 'bin').chmod(0o755)
+    (destination / 'bin').chmod(0o755)
+
+
+def test_copy_follows_symlinks(tmp_path):
+    source = tmp_path / 'source'
+    source.mkdir()
+    (source / 'file').write_text('content')
+    (source / 'link').symlink_to('file')
+    CopyEngine().copy(source, tmp_path / 'destination')
+    assert not (tmp_path / 'destination' / 'link').is_symlink()
+    assert (tmp_path / 'destination' / 'link').read_text() == 'content'
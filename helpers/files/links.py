@@ -0,0 +1,67 @@
+import errno
+import os
+from pathlib import Path
+from typing import Callable
+
+# The available kinds of links
+LINKS = ['hard', 'sym']
+# The errors meaning that a hard link cannot be created, and that the file should be copied
+UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP}
+
+
+def replace(destination: Path):
+    """
+    Remove a file about to be replaced by a link
+    :param destination: The file
+    """
+    if destination.is_symlink() or destination.exists():
+        if destination.is_dir() and not destination.is_symlink():
+            raise ValueError(f"{destination} already exists and is a directory")
+        destination.unlink()
+
+
+def hard_link(source: Path, destination: Path, fallback: Callable[[Path, Path], str]):
+    """
+    Hard link a file, copying it if it is on another filesystem
+    :param source: The file to link
+    :param destination: Where to create the link
+    :param fallback: The function copying the file
+    :return: How the file was materialized
+    """
+    replace(destination)
+    try:
+        os.link(source, destination)
+        return 'hard'
+    except OSError as e:
+        if e.errno not in UNSUPPORTED:
+            raise
+    return fallback(source, destination)
+
+
+def symbolic_link(source: Path, destination: Path):
+    """
+    Symbolically link a file or a directory, keeping the link if it already points to it
+    :param source: The file to link
+    :param destination: Where to create the link
+    :return: How the file was materialized
+    """
+    target = source.resolve()
+    if destination.is_symlink() and Path(os.readlink(destination)) == target:
+        return 'sym'
+    replace(destination)
+    destination.symlink_to(target, target_is_directory=target.is_dir())
+    return 'sym'
+
+
+def get_link_file(link: str, fallback: Callable[[Path, Path], str]):
+    """
+    Get the function linking a file
+    :param link: The kind of link
+    :param fallback: The function copying a file that cannot be linked
+    :return: The function
+    """
+    if link == 'hard':
+        return lambda source, destination: hard_link(source, destination, fallback)
+    if link == 'sym':
+        return symbolic_link
+    raise ValueError(f"invalid link {link}")
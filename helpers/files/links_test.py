@@ -0,0 +1,53 @@
+import errno
+import os
+
+import pytest
+
+from helpers.files import links
+from helpers.files.engine import CopyEngine
+
+
+def test_hard_links(tmp_path, source):
+    destination = tmp_path / 'destination'
+    CopyEngine(2, link='hard').copy(source, destination)
+    assert (destination / 'directory').is_dir() and not (destination / 'directory').is_symlink()
+    assert (destination / 'directory' / 'second').stat().st_ino == (source / 'directory' / 'second').stat().st_ino
+
+
+def test_hard_links_fallback(tmp_path, source, monkeypatch):
+    def link(source, destination):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+    monkeypatch.setattr(links.os, 'link', link)
+    destination = tmp_path / 'destination'
+    CopyEngine(link='hard').copy(source, destination)
+    assert (destination / 'first').read_text() == 'first'
+    assert (destination / 'first').stat().st_ino != (source / 'first').stat().st_ino
+
+
+def test_symbolic_links(tmp_path, source):
+    destination = tmp_path / 'destination'
+    CopyEngine(link='sym').copy(source, destination)
+    assert not (destination / 'directory').is_symlink()
+    assert (destination / 'directory' / 'second').resolve() == (source / 'directory' / 'second').resolve()
+
+
+def test_symbolic_links_directories(tmp_path, source):
+    destination = tmp_path / 'destination'
+    CopyEngine(link='sym', link_directories=True).copy(source, destination)
+    assert destination.is_symlink()
+    assert destination.resolve() == source.resolve()
+    CopyEngine(link='sym', link_directories=True).sync(source, destination)
+
+
+def test_sync_replaces_changed_links(tmp_path, source):
+    destination = tmp_path / 'destination'
+    CopyEngine().copy(source, destination)
+    (source / 'first').write_text('changed')
+    CopyEngine(link='hard').sync(source, destination)
+    assert (destination / 'first').stat().st_ino == (source / 'first').stat().st_ino
+
+
+def test_hard_link_directories():
+    with pytest.raises(ValueError, match='directories can only be linked symbolically'):
+        CopyEngine(link='hard', link_directories=True)
@@ -0,0 +1,183 @@
+import json
+import os
+import stat as stats
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+from typing import Optional, Mapping, Callable
+
+from helpers.files.backends import copy_file
+
+# The name of the manifest kept in a synchronized directory
+MANIFEST = '.setups-manifest.json'
+# The version of the manifest format
+VERSION = 1
+# The size of the chunks read when hashing
+CHUNK = 1024 * 1024
+
+
+def hash_file(path: Path):
+    """
+    Hash the content of a file
+    :param path: The file
+    :return: The hexadecimal digest
+    """
+    digest = sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_hashed(source: Path, destination: Path):
+    """
+    Copy a file, hashing its content in the same pass
+    :param source: The file to copy
+    :param destination: Where to copy the file
+    :return: The hexadecimal digest of the content
+    """
+    digest = sha256()
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        for chunk in iter(lambda: src.read(CHUNK), b''):
+            digest.update(chunk)
+            dst.write(chunk)
+    return digest.hexdigest()
+
+
+def signature(stat: os.stat_result):
+    """
+    Get the signature used to detect changes of a file
+    :param stat: The stat of the file
+    :return: The size and modification time of the file
+    """
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class Synchronizer:
+    """
+    Decides which files of a tree need to be copied again
+
+    Files are compared by size and modification time, and by content hash if checksum is enabled. With checksums, the
+    hashes are recorded in a manifest at the root of the destination, so that unchanged files are not hashed again.
+    """
+    source: Path
+    destination: Path
+    checksum: bool
+    copy_file: Callable[[Path, Path], str]
+    manifest: Mapping[str, Mapping]
+    lock: Lock
+
+    def __init__(self, source: Path, destination: Path, checksum: bool, copy_file=copy_file):
+        """
+        Create a new synchronizer
+        :param source: The root of the tree to copy
+        :param destination: Where to copy the tree
+        :param checksum: Whether to compare the content of the files, the content is then copied by reading it
+        :param copy_file: The function copying the content of a file when not comparing the content
+        """
+        self.source = source
+        self.destination = destination
+        self.checksum = checksum
+        self.copy_file = copy_file
+        self.manifest = self.load() if checksum else {}
+        self.lock = Lock()
+
+    def load(self):
+        """
+        Load the manifest of the destination
+        :return: The entries of the manifest, empty if there is none
+        """
+        try:
+            with (self.destination / MANIFEST).open() as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifest, dict) or manifest.get('version') != VERSION:
+            return {}
+        return manifest.get('files', {})
+
+    def save(self):
+        """
+        Save the manifest in the destination, if the destination is a directory
+        """
+        if not self.checksum or not self.destination.is_dir():
+            return
+        with (self.destination / MANIFEST).open('w') as f:
+            json.dump({'version': VERSION, 'files': self.manifest}, f)
+
+    def get_entry(self, source: Path) -> Optional[Mapping]:
+        """
+        Get the manifest entry of a file
+        :param source: The file
+        :return: The entry, None if there is none
+        """
+        with self.lock:
+            return self.manifest.get(source.relative_to(self.source).as_posix())
+
+    def set_entry(self, source: Path, source_stat: os.stat_result, destination: Path, digest: str):
+        """
+        Record a synchronized file in the manifest
+        :param source: The file
+        :param source_stat: The stat of the file
+        :param destination: Where the file was copied
+        :param digest: The hash of its content
+        """
+        entry = {
+            'source': signature(source_stat),
+            'destination': signature(destination.stat()),
+            'hash': digest,
+        }
+        with self.lock:
+            self.manifest[source.relative_to(self.source).as_posix()] = entry
+
+    def is_unchanged(self, source: Path, source_stat: os.stat_result, destination: Path,
+                     destination_stat: os.stat_result):
+        """
+        Whether the destination already has the content of the source
+        :param source: The file to copy
+        :param source_stat: The stat of the file to copy
+        :param destination: Where to copy the file
+        :param destination_stat: The stat of the destination
+        :return: Whether the file can be skipped
+        """
+        if source_stat.st_size != destination_stat.st_size:
+            return False
+        if not self.checksum:
+            return source_stat.st_mtime_ns == destination_stat.st_mtime_ns
+
+        entry = self.get_entry(source)
+        source_known = entry is not None and entry['source'] == signature(source_stat)
+        destination_known = entry is not None and entry['destination'] == signature(destination_stat)
+        if source_known and destination_known:
+            return True
+        source_hash = entry['hash'] if source_known else hash_file(source)
+        destination_hash = entry['hash'] if destination_known else hash_file(destination)
+        if source_hash != destination_hash:
+            return False
+        self.set_entry(source, source_stat, destination, source_hash)
+        return True
+
+    def __call__(self, source: Path, destination: Path):
+        """
+        Copy a file if it changed
+        :param source: The file to copy
+        :param destination: Where to copy the file
+        """
+        source_stat = source.stat()
+        try:
+            destination_stat = destination.stat()
+        except FileNotFoundError:
+            destination_stat = None
+        else:
+            if stats.S_ISDIR(destination_stat.st_mode):
+                raise ValueError(f"{destination} already exists and is a directory")
+            if self.is_unchanged(source, source_stat, destination, destination_stat):
+                return
+
+        if self.checksum:
+            digest = copy_hashed(source, destination)
+        else:
+            self.copy_file(source, destination)
+        os.utime(destination, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns), follow_symlinks=False)
+        if self.checksum:
+            self.set_entry(source, source_stat, destination, digest)
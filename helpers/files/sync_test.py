@@ -0,0 +1,56 @@
+import pytest
+
+from helpers.files import sync
+from helpers.files.engine import CopyEngine
+
+
+def synchronize(source, destination, checksum=False):
+    """
+    Synchronize a tree, returning the names of the files written
+    """
+    before = {path: path.stat().st_ctime_ns for path in destination.rglob('*')} if destination.exists() else {}
+    CopyEngine(2).sync(source, destination, checksum)
+    return sorted(
+        path.name for path in destination.rglob('*')
+        if path.is_file() and path.name != sync.MANIFEST and before.get(path) != path.stat().st_ctime_ns
+    )
+
+
+@pytest.mark.parametrize('checksum', [False, True])
+def test_sync_skips_unchanged(tmp_path, source, checksum):
+    destination = tmp_path / 'destination'
+    assert synchronize(source, destination, checksum) == ['first', 'second']
+    assert (destination / 'directory' / 'second').read_text() == 'second'
+    assert synchronize(source, destination, checksum) == []
+
+    (source / 'first').write_text('changed')
+    assert synchronize(source, destination, checksum) == ['first']
+    assert (destination / 'first').read_text() == 'changed'
+
+
+def test_sync_manifest_skips_hashing(tmp_path, source, monkeypatch):
+    destination = tmp_path / 'destination'
+    CopyEngine().sync(source, destination, True)
+    assert (destination / sync.MANIFEST).exists()
+
+    def hash_file(path):
+        raise AssertionError(f"{path} should not be hashed")
+
+    monkeypatch.setattr(sync, 'hash_file', hash_file)
+    CopyEngine().sync(source, destination, True)
+
+
+def test_sync_checksum_same_content(tmp_path, source):
+    destination = tmp_path / 'destination'
+    synchronize(source, destination, True)
+    (destination / sync.MANIFEST).unlink()
+    (source / 'first').touch()
+    assert synchronize(source, destination, True) == []
+
+
+def test_sync_directory_over_file(tmp_path, source):
+    destination = tmp_path / 'destination'
+    destination.mkdir()
+    (destination / 'directory').write_text('file')
+    with pytest.raises(ValueError, match='already exists and is not a directory'):
+        CopyEngine().sync(source, destination)
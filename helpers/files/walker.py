@@ -0,0 +1,81 @@
+import os
+import stat as stats
+from enum import Enum
+from typing import Optional
+
+
+class ENTRY(Enum):
+    DIRECTORY = 0
+    FILE = 1
+    SYMLINK = 2
+
+
+class Entry:
+    type: ENTRY
+    source: str
+    destination: str
+    stat: Optional[os.stat_result]
+
+    def __init__(self, type, source, destination, stat=None):
+        self.type = type
+        self.source = source
+        self.destination = destination
+        self.stat = stat
+
+    def __repr__(self):
+        return f"Entry(type={repr(self.type)}, source={repr(self.source)}, destination={repr(self.destination)})"
+
+
+def get_type(directory: bool, symlink: bool, follow_symlinks: bool):
+    """
+    Get the type of an entry
+    :param directory: Whether the entry is a directory, following symbolic links
+    :param symlink: Whether the entry is a symbolic link
+    :param follow_symlinks: Whether symbolic links are followed
+    :return: The type of the entry
+    """
+    if symlink and not follow_symlinks:
+        return ENTRY.SYMLINK
+    return ENTRY.DIRECTORY if directory else ENTRY.FILE
+
+
+def scan(path: str):
+    """
+    List a directory
+    :param path: The directory
+    :return: The entries of the directory, sorted by name
+    """
+    with os.scandir(path) as entries:
+        return sorted(entries, key=lambda entry: entry.name)
+
+
+def plan(source: str, destination: str, follow_symlinks: bool = True, recurse: bool = True, stat: bool = False):
+    """
+    Yield the entries to materialize to copy a tree, each directory before its content
+
+    The types of the entries come from the directory listings, so that a file is only stat-ed if it is a symbolic
+    link or if its metadata is requested.
+    :param source: The file to copy
+    :param destination: Where to copy the file
+    :param follow_symlinks: Whether to copy the targets of the symbolic links, instead of the links
+    :param recurse: Whether to yield the content of the directories
+    :param stat: Whether to attach the stat of the entries, to preserve their metadata
+    """
+    root = os.stat(source, follow_symlinks=follow_symlinks)
+    type = get_type(stats.S_ISDIR(root.st_mode), stats.S_ISLNK(root.st_mode), follow_symlinks)
+    yield Entry(type, source, destination, root)
+    if type is not ENTRY.DIRECTORY or not recurse:
+        return
+
+    stack = [(iter(scan(source)), destination)]
+    while stack:
+        entries, directory = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+        type = get_type(entry.is_dir(), entry.is_symlink(), follow_symlinks)
+        target = os.path.join(directory, entry.name)
+        yield Entry(type, entry.path, target, entry.stat(follow_symlinks=follow_symlinks) if stat else None)
+        if type is ENTRY.DIRECTORY and recurse:
+            stack.append((iter(scan(entry.path)), target))
@@ -0,0 +1,223 @@
+import json
+import os
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from helpers.lookup import CONFIG
+
+# The name of the index kept in a directory of setups
+INDEX = '.index.json'
+# The version of the index format
+VERSION = 1
+# The directory containing the indexes of the directories of setups which are not writable
+CACHE = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'setups'
+
+
+def get_path(directory: Path):
+    """
+    Get the path to the index of a directory of setups, kept in the cache when the directory is not writable
+    :param directory: The directory of the setups
+    :return: The path to the index
+    """
+    if os.access(directory, os.W_OK):
+        return directory / INDEX
+    return CACHE / f'{sha256(str(directory.resolve()).encode()).hexdigest()}{INDEX}'
+
+
+def get_description(config: Path):
+    """
+    Get the description of a setup, from the comment at the top of its configuration
+    :param config: The path to the configuration
+    :return: The lines of the comment joined by spaces, empty if there is none
+    """
+    lines = []
+    try:
+        with config.open(errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line.startswith('#'):
+                    if line or lines:
+                        break
+                    continue
+                lines.append(line.lstrip('#').strip())
+    except OSError:
+        return ''
+    return ' '.join(line for line in lines if line)
+
+
+def count_commands(config: Path) -> Optional[int]:
+    """
+    Count the commands of a configuration, without caching it, as listing the setups does not run them
+    :param config: The path to the configuration
+    :return: The number of commands, None if the configuration is missing or invalid
+    """
+    # The parser is only imported when a setup changed, to keep listing the setups quick
+    from helpers.parsing.lexer_error import LexerError
+    from helpers.parsing.parser_error import ParserError
+    from helpers.setups import parse_configuration
+
+    try:
+        return len(parse_configuration(config, use_cache=False).commands)
+    except (OSError, ValueError, LexerError, ParserError):
+        return None
+
+
+class SetupInfo:
+    """
+    What the index records about a setup
+    """
+    name: str
+    directories: Dict[str, int]
+    modified: int
+    commands: Optional[int]
+    assets: int
+    description: str
+
+    def __init__(self, name, directories, modified, commands, assets, description):
+        """
+        Create the information of a setup
+        :param name: The name of the setup
+        :param directories: The modification time of each directory of the setup, in nanoseconds, by relative path
+        :param modified: The modification time of the configuration, in nanoseconds, 0 if there is none
+        :param commands: The number of commands of the configuration, None if it is missing or invalid
+        :param assets: The total size of the other files of the setup, in bytes
+        :param description: The description of the setup
+        """
+        self.name = name
+        self.directories = directories
+        self.modified = modified
+        self.commands = commands
+        self.assets = assets
+        self.description = description
+
+    @classmethod
+    def scan(cls, subdirectory: Path):
+        """
+        Gather the information of a setup
+        :param subdirectory: The directory of the setup
+        :return: The information
+        """
+        directories = {}
+        assets = 0
+        for path, _, files in os.walk(subdirectory):
+            relative = os.path.relpath(path, subdirectory)
+            directories[relative] = os.stat(path).st_mtime_ns
+            for file in files:
+                if relative == '.' and file == CONFIG:
+                    continue
+                try:
+                    assets += os.lstat(os.path.join(path, file)).st_size
+                except OSError:
+                    pass
+        config = subdirectory / CONFIG
+        try:
+            modified = config.stat().st_mtime_ns
+        except OSError:
+            return cls(subdirectory.name, directories, 0, None, assets, '')
+        return cls(subdirectory.name, directories, modified, count_commands(config), assets, get_description(config))
+
+    def is_current(self, subdirectory: Path):
+        """
+        Whether the information is still up to date, none of the directories of the setup and its configuration
+        having been modified since it was gathered
+        :param subdirectory: The directory of the setup
+        :return: Whether the information is up to date
+        """
+        try:
+            if (subdirectory / CONFIG).stat().st_mtime_ns != self.modified:
+                return False
+            return all(os.stat(subdirectory / path).st_mtime_ns == modified
+                       for path, modified in self.directories.items())
+        except OSError:
+            return False
+
+    def to_json(self):
+        """
+        Convert the information to the JSON stored in the index
+        :return: The JSON object
+        """
+        return {
+            'directories': self.directories,
+            'modified': self.modified,
+            'commands': self.commands,
+            'assets': self.assets,
+            'description': self.description,
+        }
+
+    @classmethod
+    def from_json(cls, name: str, data):
+        """
+        Read the information stored in the index
+        :param name: The name of the setup
+        :param data: The JSON object
+        :return: The information
+        """
+        return cls(name, data['directories'], data['modified'], data['commands'], data['assets'], data['description'])
+
+
+def load(directory: Path):
+    """
+    Load the index of a directory of setups
+    :param directory: The directory of the setups
+    :return: The modification time of the directory when the index was written, None if there is no valid index, and
+             the information of each setup by name
+    """
+    try:
+        with get_path(directory).open() as f:
+            index = json.load(f)
+        if not isinstance(index, dict) or index.get('version') != VERSION:
+            return None, {}
+        return index['modified'], {name: SetupInfo.from_json(name, data) for name, data in index['setups'].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, {}
+
+
+def save(directory: Path, modified: int, setups: List[SetupInfo]):
+    """
+    Save the index of a directory of setups, silently skipped if it cannot be written
+
+    The index is written in place once it exists, as replacing it would modify the directory and invalidate it.
+    :param directory: The directory of the setups
+    :param modified: The modification time of the directory when it was listed, in nanoseconds
+    :param setups: The information of the setups
+    """
+    index = {'version': VERSION, 'modified': modified, 'setups': {info.name: info.to_json() for info in setups}}
+    path = get_path(directory)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open('w') as f:
+            json.dump(index, f)
+    except OSError:
+        pass
+
+
+def get_setups(directory: Path, check: bool = True) -> List[SetupInfo]:
+    """
+    Get the information of the setups of a directory, updating the index with the setups which changed
+
+    The directory is only listed again if it was modified since the index was written, and a setup is only scanned
+    again if one of its directories or its configuration was modified.
+    :param directory: The directory of the setups
+    :param check: Whether to check that the information of the setups is up to date, otherwise only new setups are
+                  scanned
+    :return: The information of each setup, sorted by name
+    """
+    modified = directory.stat().st_mtime_ns
+    indexed, setups = load(directory)
+    changed = indexed != modified
+    if changed:
+        names = sorted(entry.name for entry in os.scandir(directory) if entry.is_dir())
+    else:
+        names = sorted(setups)
+
+    infos = []
+    for name in names:
+        info = setups.get(name)
+        if info is None or (check and not info.is_current(directory / name)):
+            info = SetupInfo.scan(directory / name)
+            changed = True
+        infos.append(info)
+    if changed:
+        save(directory, modified, infos)
+    return infos
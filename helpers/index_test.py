@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from helpers import cache
+from helpers.index import INDEX, SetupInfo, get_setups, load
+
+
+@pytest.fixture(autouse=True)
+def cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'DIRECTORY', tmp_path / 'cache')
+
+
+def make_setup(directory, name, config, assets=None):
+    (directory / name).mkdir(parents=True)
+    (directory / name / '.config.setup').write_text(config)
+    for path, content in (assets or {}).items():
+        (directory / name / path).parent.mkdir(parents=True, exist_ok=True)
+        (directory / name / path).write_bytes(content)
+
+
+def test_index_information(tmp_path):
+    directory = tmp_path / 'setups'
+    make_setup(directory, 'web', '\n# Serve the site\n#   locally\necho 1\n# not the description\necho 2 ; echo 3\n',
+               {'index.html': b'x' * 10, 'static/app.js': b'y' * 5})
+    make_setup(directory, 'broken', 'echo "unterminated\n')
+    make_setup(directory, 'binary', '')
+    (directory / 'binary' / '.config.setup').write_bytes(b'echo \xff\n')
+    (directory / 'empty').mkdir(parents=True)
+    setups = get_setups(directory)
+    assert [setup.name for setup in setups] == ['binary', 'broken', 'empty', 'web']
+    binary, broken, empty, web = setups
+    assert (web.commands, web.assets, web.description) == (3, 15, 'Serve the site locally')
+    assert broken.commands is None
+    assert binary.commands is None
+    assert (empty.commands, empty.modified, empty.assets) == (None, 0, 0)
+    assert (directory / INDEX).exists()
+    assert not (tmp_path / 'cache').exists()
+
+
+def test_index_refresh(tmp_path, monkeypatch):
+    directory = tmp_path / 'setups'
+    make_setup(directory, 'first', 'echo 1\n')
+    make_setup(directory, 'second', 'echo 1\n', {'sub/file': b'abc'})
+    get_setups(directory)
+
+    scanned = []
+    scan = SetupInfo.scan.__func__
+    monkeypatch.setattr(SetupInfo, 'scan', classmethod(lambda cls, path: scanned.append(path.name) or scan(cls, path)))
+    assert [setup.assets for setup in get_setups(directory)] == [0, 3]
+    assert scanned == []
+
+    (directory / 'second' / 'sub' / 'other').write_bytes(b'de')
+    make_setup(directory, 'third', 'echo 1\n')
+    assert [setup.assets for setup in get_setups(directory)] == [0, 5, 0]
+    assert scanned == ['second', 'third']
+
+    scanned.clear()
+    config = directory / 'first' / '.config.setup'
+    config.write_text('echo 1\necho 2\n')
+    os.utime(config, ns=(0, 1))
+    assert get_setups(directory, check=False)[0].commands == 1
+    assert get_setups(directory)[0].commands == 2
+    assert scanned == ['first']
+    assert load(directory)[0] == directory.stat().st_mtime_ns
@@ -0,0 +1,86 @@
+import asyncio
+from typing import List, Callable, Mapping, Optional, TYPE_CHECKING
+
+from helpers.output import with_capture
+
+if TYPE_CHECKING:
+    from helpers.commands.abstract_command import AbstractCommand
+    from helpers.runner import Runner
+
+
+class Jobs:
+    """
+    The commands running in the background, driven by an asyncio event loop
+
+    The commands are started as soon as they are submitted, the loop only runs while waiting for them.
+    """
+    loop: asyncio.AbstractEventLoop
+    tasks: List[asyncio.Task]
+    report: Callable[[ValueError], None]
+
+    def __init__(self, report):
+        """
+        Create the background jobs
+        :param report: The function reporting the error of a job
+        """
+        self.loop = asyncio.new_event_loop()
+        self.tasks = []
+        self.report = report
+
+    def start(self, command: 'AbstractCommand', runner: 'Runner', arguments: Mapping[str, str]):
+        """
+        Start a command in the background
+        :param command: The command
+        :param runner: The runner
+        :param arguments: The parsed arguments of the command
+        """
+        self.add(command.start(runner, self.loop, **arguments))
+
+    def call(self, function: Callable[[], Optional[int]]):
+        """
+        Start a function in the background, on a thread of the loop executor, writing to the capture of the current
+        thread
+        :param function: The function
+        """
+        self.add(self.loop.run_in_executor(None, with_capture(function)))
+
+    def add(self, future):
+        """
+        Watch a job started
+        :param future: The future of the job
+        """
+        self.tasks.append(self.loop.create_task(self.watch(future)))
+
+    async def watch(self, future):
+        """
+        Wait for a job
+        :param future: The future of the job
+        :return: The exit code of the job
+        """
+        try:
+            result = await future
+            return 0 if result is None else result
+        except ValueError as e:
+            self.report(e)
+            return 1
+
+    def wait(self):
+        """
+        Wait for all the jobs started
+        :return: The exit code of the first job that failed, in the order they were started, zero if none failed
+        """
+        if not self.tasks:
+            return 0
+        tasks, self.tasks = self.tasks, []
+        results = self.loop.run_until_complete(asyncio.gather(*tasks))
+        return next((result for result in results if result != 0), 0)
+
+    def close(self):
+        """
+        Wait for the remaining jobs and close the event loop
+        :return: The exit code of the first job that failed, zero if none failed
+        """
+        try:
+            return self.wait()
+        finally:
+            self.loop.close()
@@ -0,0 +1,91 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+# The directory containing the setups in the home directory, when SETUPS_PATH is not set
+DIRECTORY = '.setups'
+# The name of a configuration file
+CONFIG = '.config.setup'
+
+# The setups found, with the modification times of the directories searched to find them, by directories and name
+resolved: Dict[Tuple[Tuple[Path, ...], str], Tuple[Path, List[int]]] = {}
+
+
+def get_directories(environment: Optional[Mapping[str, str]] = None) -> List[Path]:
+    """
+    Get the directories containing the setups, from the colon-separated SETUPS_PATH, ~/.setups if not set
+    :param environment: The environment variables, the ones of the process if None
+    :return: The directories, by priority
+    """
+    if environment is None:
+        environment = os.environ
+    home = Path(environment['HOME']) if environment.get('HOME') else Path.home()
+    path = environment.get('SETUPS_PATH')
+    if not path:
+        return [home / DIRECTORY]
+    directories = [directory for directory in path.split(os.pathsep) if directory]
+    return [home / directory[2:] if directory == '~' or directory.startswith('~/') else Path(directory)
+            for directory in directories]
+
+
+def get_modified(directory: Path):
+    """
+    Get the modification time of a directory of setups
+    :param directory: The directory
+    :return: The modification time in nanoseconds, None if it does not exist
+    """
+    try:
+        return directory.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def list_setups(check=True):
+    """
+    Get the available setups, from the index of each directory of setups, a setup hiding the setups with the same name
+    in the directories after it
+    :param check: Whether to check that the information of the setups is up to date, otherwise only new setups are
+                  scanned
+    :return: The information of each setup, sorted by name
+    """
+    # Imported here, as the index depends on the name of the configuration file
+    from helpers.index import get_setups
+
+    setups = {}
+    for directory in get_directories():
+        try:
+            infos = get_setups(directory, check)
+        except FileNotFoundError:
+            continue
+        for info in infos:
+            setups.setdefault(info.name, info)
+    return [setups[name] for name in sorted(setups)]
+
+
+def get_setup(name, environment=None):
+    """
+    Get the path to a setup, from the first directory of setups containing it
+
+    The directory found is remembered with the modification times of the directories searched: as adding or removing a
+    setup modifies its directory, the next lookups only check these times instead of looking for the setup again. The
+    lookups are only remembered in memory, for the runs of the daemon.
+    :param name: The name of the setup
+    :param environment: The environment variables giving the directories of setups, the ones of the process if None
+    :return: The path to the setup
+    """
+    directories = get_directories(environment)
+    key = (tuple(directories), name)
+    if key in resolved:
+        subdirectory, modified = resolved[key]
+        if [get_modified(directory) for directory in directories[:len(modified)]] == modified:
+            return subdirectory
+        del resolved[key]
+
+    modified = []
+    for directory in directories:
+        modified.append(get_modified(directory))
+        subdirectory = directory / name
+        if modified[-1] is not None and subdirectory.is_dir():
+            resolved[key] = subdirectory, modified
+            return subdirectory
+    raise ValueError(f"setup {name} does not exist")
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from helpers import cache, index, lookup
+from helpers.lookup import get_setup, list_setups
+
+
+@pytest.fixture
+def directories(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'DIRECTORY', tmp_path / 'cache')
+    monkeypatch.setattr(index, 'CACHE', tmp_path / 'cache')
+    monkeypatch.setattr(lookup, 'resolved', {})
+    personal, shared = tmp_path / 'personal', tmp_path / 'shared'
+    for directory, names in [(personal, ['mine', 'both']), (shared, ['team', 'both'])]:
+        for name in names:
+            (directory / name).mkdir(parents=True)
+            (directory / name / '.config.setup').write_text(f'# {directory.name} {name}\necho 1\n')
+    monkeypatch.setenv('SETUPS_PATH', f'{personal}{os.pathsep}{tmp_path / "missing"}{os.pathsep}{shared}')
+    return personal, shared
+
+
+def test_get_setup_first_match(directories):
+    personal, shared = directories
+    assert get_setup('both') == personal / 'both'
+    assert get_setup('team') == shared / 'team'
+    with pytest.raises(ValueError, match='setup other does not exist'):
+        get_setup('other')
+
+
+def test_get_setup_cached(directories, monkeypatch):
+    personal, shared = directories
+    assert get_setup('team') == shared / 'team'
+    checked = []
+    is_dir = type(shared).is_dir
+    monkeypatch.setattr(type(shared), 'is_dir', lambda path: checked.append(path) or is_dir(path))
+    assert get_setup('team') == shared / 'team'
+    assert checked == []
+
+    (personal / 'team').mkdir()
+    assert get_setup('team') == personal / 'team'
+
+
+def test_list_setups_merged(directories, monkeypatch):
+    personal, shared = directories
+    access = os.access
+    monkeypatch.setattr(os, 'access', lambda path, mode: path != shared and access(path, mode))
+    setups = list_setups()
+    assert [(setup.name, setup.description) for setup in setups] == [
+        ('both', 'personal both'), ('mine', 'personal mine'), ('team', 'shared team')]
+    assert (personal / index.INDEX).exists()
+    assert not (shared / index.INDEX).exists()
+    assert index.load(shared)[0] == shared.stat().st_mtime_ns
+
+
+def test_get_setup_environment(directories, tmp_path):
+    personal, shared = directories
+    assert get_setup('team', {'SETUPS_PATH': '~/shared', 'HOME': str(tmp_path)}) == shared / 'team'
+    (tmp_path / '.setups' / 'own').mkdir(parents=True)
+    assert get_setup('own', {'HOME': str(tmp_path)}) == tmp_path / '.setups' / 'own'
@@ -0,0 +1,180 @@
+import json
+import os
+from hashlib import sha256
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import Dict, Iterable, List, Set
+
+from helpers.files.sync import hash_file, signature
+
+# The name of the state kept in the directory a setup runs in
+STATE = '.setups-state.json'
+# The version of the state format
+VERSION = 1
+
+
+class Memo:
+    """
+    Remembers the steps which ran successfully in a directory, to skip them while they would run the same way
+
+    A step is keyed by the setup, its resolved command and the content of the paths it reads. The hashes of the files
+    are recorded in the state with their size and modification time, so that unchanged files are not hashed again.
+    Only the hashes of the files looked at by the current run are saved, the others being stale.
+    """
+    directory: Path
+    force: bool
+    steps: Dict[str, str]
+    hashes: Dict[str, List]
+    seen: Set[str]
+    saved: bool
+    lock: Lock
+
+    def __init__(self, directory: Path, force: bool = False):
+        """
+        Create a new memo
+        :param directory: The directory the setup runs in, holding the state
+        :param force: Whether to run all the steps, still recording them
+        """
+        self.directory = directory
+        self.force = force
+        self.steps = {}
+        self.hashes = {}
+        self.seen = set()
+        self.saved = False
+        self.lock = Lock()
+        self.load()
+
+    def load(self):
+        """
+        Load the state of the directory, if there is a valid one
+        """
+        try:
+            with (self.directory / STATE).open() as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(state, dict) and state.get('version') == VERSION:
+            self.steps = state.get('steps', {})
+            self.hashes = state.get('hashes', {})
+
+    def save(self):
+        """
+        Save the state in the directory atomically, the lock being held
+        """
+        hashes = {path: entry for path, entry in self.hashes.items() if path in self.seen}
+        with NamedTemporaryFile('w', dir=self.directory, prefix=STATE, delete=False) as f:
+            try:
+                json.dump({'version': VERSION, 'steps': self.steps, 'hashes': hashes}, f)
+            except BaseException:
+                os.unlink(f.name)
+                raise
+        try:
+            os.replace(f.name, self.directory / STATE)
+        except OSError:
+            os.unlink(f.name)
+            raise
+        self.saved = True
+
+    def hash_file(self, path: str, stat: os.stat_result):
+        """
+        Hash the content of a file, unless it did not change since it was last hashed
+        :param path: The file
+        :param stat: The stat of the file
+        :return: The hexadecimal digest
+        """
+        with self.lock:
+            entry = self.hashes.get(path)
+            self.seen.add(path)
+        if entry is not None and entry[:2] == signature(stat):
+            return entry[2]
+        digest = hash_file(Path(path))
+        with self.lock:
+            self.hashes[path] = [*signature(stat), digest]
+        return digest
+
+    def hash_path(self, path: Path):
+        """
+        Hash the content of a path, the names and content of the files of a directory
+        :param path: The file or directory
+        :return: The hexadecimal digest, empty if the path does not exist
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return ''
+        if not path.is_dir():
+            return self.hash_file(str(path), stat)
+        digest = sha256()
+        for root, directories, files in os.walk(path):
+            directories.sort()
+            for file in sorted(files):
+                if file.startswith(STATE):
+                    continue
+                file = os.path.join(root, file)
+                try:
+                    file_hash = self.hash_file(file, os.stat(file))
+                except OSError:
+                    continue
+                digest.update(f'{os.path.relpath(file, path)}\0{file_hash}\0'.encode(errors='surrogateescape'))
+        return digest.hexdigest()
+
+    def get_key(self, setup: Path, command: List[str], inputs: Iterable[Path]):
+        """
+        Get the key of a step
+        :param setup: The directory of the setup
+        :param command: The resolved command of the step
+        :param inputs: The paths read by the step
+        :return: The key
+        """
+        digest = sha256()
+        for part in [str(setup), *command]:
+            digest.update(part.encode(errors='surrogateescape') + b'\0')
+        digest.update(b'\0')
+        for path in inputs:
+            digest.update(f'{path}\0{self.hash_path(path)}\0'.encode(errors='surrogateescape'))
+        return digest.hexdigest()
+
+    def is_done(self, name: str, key: str):
+        """
+        Whether a step already ran successfully with the same key
+        :param name: The name of the step
+        :param key: The key of the step
+        :return: Whether the step can be skipped
+        """
+        with self.lock:
+            return not self.force and self.steps.get(name) == key
+
+    def has_run(self, name: str):
+        """
+        Whether a step already ran successfully in the directory, the same way or not
+        :param name: The name of the step
+        :return: Whether the step is recorded
+        """
+        with self.lock:
+            return name in self.steps
+
+    def complete(self, name: str, key: str):
+        """
+        Record that a step ran successfully, saving the state
+        :param name: The name of the step
+        :param key: The key of the step
+        """
+        with self.lock:
+            self.steps[name] = key
+            try:
+                self.save()
+            except OSError:
+                pass
+
+    def close(self):
+        """
+        Save the state again at the end of a run which saved it, with the hashes of the files looked at after it was
+        saved
+        """
+        with self.lock:
+            if self.saved:
+                try:
+                    self.save()
+                except OSError:
+                    pass
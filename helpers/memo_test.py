@@ -0,0 +1,96 @@
+import json
+from io import StringIO
+
+import pytest
+
+from helpers.memo import Memo, STATE
+from helpers.parsing.lexer import Lexer
+from helpers.parsing.parser import Parser
+from helpers.runner import Runner
+
+CONFIG = '''
+step copy file data.txt
+step --needs copy --reads data.txt count command sh -c "wc -c < data.txt >> counts"
+step --always stamp command sh -c "echo run >> stamps"
+'''
+
+
+def run(setup, target, force=False, workers=1, config=CONFIG):
+    ast = Parser(Lexer(StringIO(config))).parse()
+    return Runner(setup, workers, working_directory=target, memo=Memo(target, force)).run(ast)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_memo_skips_unchanged_steps(tmp_path, capfd, workers):
+    setup, target = tmp_path / 'setup', tmp_path / 'target'
+    setup.mkdir()
+    target.mkdir()
+    (setup / 'data.txt').write_text('abc')
+    assert run(setup, target, workers=workers) == 0
+    assert run(setup, target, workers=workers) == 0
+    assert (target / 'counts').read_text().split() == ['3']
+    assert (target / 'stamps').read_text().split() == ['run', 'run']
+    assert 'Step count is up to date' in capfd.readouterr().out
+
+    (setup / 'data.txt').write_text('abcd')
+    assert run(setup, target, workers=workers) == 0
+    assert (target / 'counts').read_text().split() == ['3', '4']
+    assert (target / 'data.txt').read_text() == 'abcd'
+
+    assert run(setup, target, force=True, workers=workers) == 0
+    assert (target / 'counts').read_text().split() == ['3', '4', '4']
+    assert list(target.glob(f'{STATE}*')) == [target / STATE]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_memo_reads_produced_file(tmp_path, workers):
+    config = '''
+set value "{}"
+step make command sh -c "echo ${{value}} > made; echo made >> log"
+step --needs make --reads made use command sh -c "cat made >> used"
+'''
+    for value in ['1', '1', '2', '2']:
+        assert run(tmp_path, tmp_path, workers=workers, config=config.format(value)) == 0
+    assert (tmp_path / 'log').read_text().split() == ['made', 'made']
+    assert (tmp_path / 'used').read_text().split() == ['1', '2']
+
+
+@pytest.mark.parametrize('always', [False, True])
+def test_memo_plain_file(tmp_path, capfd, always):
+    setup, target = tmp_path / 'setup', tmp_path / 'target'
+    (setup / 'tree').mkdir(parents=True)
+    target.mkdir()
+    (setup / 'tree' / 'data.txt').write_text('abc')
+    config = 'step --always copy file tree\n' if always else 'file tree\n'
+    assert run(setup, target, config=config) == 0
+    assert run(setup, target, config=config) == 0
+    assert ('is up to date' in capfd.readouterr().out) is not always
+    (setup / 'tree' / 'data.txt').write_text('abcd')
+    assert run(setup, target, config=config) == 0
+    assert (target / 'tree' / 'data.txt').read_text() == 'abcd'
+
+    (target / 'other').mkdir()
+    assert run(setup, target, config='file tree --destination other\n') == 1
+    assert 'already exists' in capfd.readouterr().err
+
+
+def test_memo_prunes_hashes(tmp_path):
+    for name in ['first', 'second']:
+        (tmp_path / name).write_text(name)
+    config = 'step --reads {} read command sh -c "echo {} >> log"\nstep --reads second other command true\n'
+    for name, expected in [('first', ['first', 'second']), ('second', ['second']), ('second', ['second'])]:
+        assert run(tmp_path, tmp_path, config=config.format(name, name)) == 0
+        hashes = json.loads((tmp_path / STATE).read_text())['hashes']
+        assert sorted(hashes) == [str(tmp_path / path) for path in expected]
+    assert (tmp_path / 'log').read_text().split() == ['first', 'second']
+
+
+def test_memo_hashes_directories(tmp_path):
+    (tmp_path / 'tree' / 'sub').mkdir(parents=True)
+    (tmp_path / 'tree' / 'sub' / 'file').write_text('a')
+    memo = Memo(tmp_path)
+    digest = memo.hash_path(tmp_path / 'tree')
+    assert memo.hash_path(tmp_path / 'tree') == digest
+    (tmp_path / 'tree' / 'sub' / 'file').write_text('b')
+    assert memo.hash_path(tmp_path / 'tree') != digest
+    assert memo.hash_path(tmp_path / 'missing') == ''
@@ -0,0 +1,248 @@
+import codecs
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple, TextIO, TypeVar, Union
+
+T = TypeVar('T')
+
+
+class Capture:
+    """
+    The output written by a thread, in the order it was written
+    """
+    chunks: List[Tuple[str, str]]
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, stream: str, text: str):
+        """
+        Record some output
+        :param stream: The name of the stream written, stdout or stderr
+        :param text: The text written
+        """
+        self.chunks.append((stream, text))
+
+    def replay(self):
+        """
+        Write the output recorded to the streams of the current thread
+        """
+        for stream, text in self.chunks:
+            getattr(sys, stream).write(text)
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+class Prefixed:
+    """
+    The output written by a thread, written to the original streams line by line, each line after a prefix
+    """
+    prefix: str
+    pending: Dict[str, str]
+    writing: threading.Lock
+
+    def __init__(self, prefix):
+        """
+        Create a prefixed output
+        :param prefix: The text written before each line
+        """
+        self.prefix = prefix
+        self.pending = {}
+        self.writing = threading.Lock()
+
+    def write(self, stream: str, text: str):
+        """
+        Write some output, once its lines are complete
+        :param stream: The name of the stream written, stdout or stderr
+        :param text: The text written
+        """
+        with self.writing:
+            *lines, self.pending[stream] = (self.pending.get(stream, '') + text).split('\n')
+        if lines:
+            self.emit(stream, lines)
+
+    def emit(self, stream: str, lines: List[str]):
+        """
+        Write lines to an original stream, without interleaving them with the lines of the other threads
+        :param stream: The name of the stream written, stdout or stderr
+        :param lines: The lines
+        """
+        original = getattr(sys, stream).stream
+        with lock:
+            original.write(''.join(f'{self.prefix}{line}\n' for line in lines))
+            original.flush()
+
+    def close(self):
+        """
+        Write the last lines, even if incomplete
+        """
+        with self.writing:
+            pending, self.pending = self.pending, {}
+        for stream, text in pending.items():
+            if text:
+                self.emit(stream, [text])
+
+
+class Pumps:
+    """
+    The pipes the processes started by a thread whose output is captured write to, each one copied to the capture by
+    a thread as it is written
+    """
+    capture: Union[Capture, Prefixed]
+    threads: List[threading.Thread]
+
+    def __init__(self, capture):
+        """
+        Create the pumps of a capture
+        :param capture: The capture
+        """
+        self.capture = capture
+        self.threads = []
+
+    def open(self, stream: str):
+        """
+        Open a pipe copied to the capture
+        :param stream: The name of the stream written, stdout or stderr
+        :return: The file descriptor of the end of the pipe written by the processes, to close once they started
+        """
+        read, write = os.pipe()
+        thread = threading.Thread(target=self.copy, args=(stream, read), daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        return write
+
+    def copy(self, stream: str, descriptor: int):
+        """
+        Copy a pipe to the capture until all the processes writing to it closed it
+        :param stream: The name of the stream written, stdout or stderr
+        :param descriptor: The file descriptor of the end of the pipe read
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        try:
+            while True:
+                data = os.read(descriptor, 65536)
+                text = decoder.decode(data, final=not data)
+                if text:
+                    self.capture.write(stream, text)
+                if not data:
+                    return
+        finally:
+            os.close(descriptor)
+
+    def join(self):
+        """
+        Wait for the pipes to be copied
+        """
+        for thread in self.threads:
+            thread.join()
+
+
+class Output:
+    """
+    A stream writing to the capture of the current thread if there is one, and to the original stream otherwise
+    """
+    name: str
+    stream: TextIO
+
+    def __init__(self, name, stream):
+        """
+        Create a new output
+        :param name: The name of the stream, stdout or stderr
+        :param stream: The original stream
+        """
+        self.name = name
+        self.stream = stream
+
+    def write(self, text: str):
+        capture = getattr(local, 'capture', None)
+        if capture is None:
+            return self.stream.write(text)
+        capture.write(self.name, text)
+        return len(text)
+
+    def flush(self):
+        if getattr(local, 'capture', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+local = threading.local()
+lock = threading.Lock()
+
+
+def install():
+    """
+    Replace the standard streams by outputs, once
+    """
+    with lock:
+        for name in ['stdout', 'stderr']:
+            if not isinstance(getattr(sys, name), Output):
+                setattr(sys, name, Output(name, getattr(sys, name)))
+
+
+def is_captured():
+    """
+    Whether the output of the current thread is captured
+    :return: Whether the output is captured
+    """
+    return getattr(local, 'capture', None) is not None
+
+
+def get_capture() -> Optional[Union[Capture, Prefixed]]:
+    """
+    Get the capture of the output of the current thread
+    :return: The capture, None if the output is not captured
+    """
+    return getattr(local, 'capture', None)
+
+
+def with_capture(function: Callable[[], T]) -> Callable[[], T]:
+    """
+    Make a function called on another thread write to the capture of the current thread, for the jobs it starts
+    :param function: The function
+    :return: The function writing to the capture
+    """
+    capture = getattr(local, 'capture', None)
+
+    def call():
+        previous = getattr(local, 'capture', None)
+        local.capture = capture
+        try:
+            return function()
+        finally:
+            local.capture = previous
+    return call
+
+
+@contextmanager
+def capture():
+    """
+    Capture the output of the current thread
+    """
+    install()
+    previous = getattr(local, 'capture', None)
+    local.capture = Capture()
+    try:
+        yield local.capture
+    finally:
+        local.capture = previous
+
+
+@contextmanager
+def prefix(text: str):
+    """
+    Prefix each line of the output of the current thread
+    :param text: The text written before each line
+    """
+    install()
+    previous = getattr(local, 'capture', None)
+    local.capture = Prefixed(text)
+    try:
+        yield local.capture
+    finally:
+        local.capture.close()
+        local.capture = previous
@@ -1,6 +1,21 @@
+import re
+
+# The characters separating the words
+WHITESPACE = ' '
+# The characters ending a word, as they are tokens on their own
+SPECIAL = ';|><'
+
+# The characters of a word that are kept as is, outside of quotes
+WORD_RAW = re.compile(f'[^{re.escape(WHITESPACE + SPECIAL)}"$\\\\]+')
+# The characters of a quoted string that are kept as is
+QUOTED_RAW = re.compile('[^"$\\\\]+')
+# The whitespace before a token
+SPACES = re.compile(f'[{re.escape(WHITESPACE)}]*')
+
+
 def is_whitespace(char):
-    return char == ' '
+    return char in WHITESPACE
 
 
 def is_special(char):
-    return char in [';']
+    return char in SPECIAL
@@ -0,0 +1,207 @@
+from array import array
+from collections.abc import Sequence as SequenceABC
+from typing import Dict, Iterable, List, Optional, Union, TYPE_CHECKING
+
+from helpers.parsing.parser import Sequence, Command, Pipeline, Background, Redirect
+from helpers.parsing.word import Word, Raw, Quoted, Variable
+
+if TYPE_CHECKING:
+    from helpers.compiler import CompiledElement
+
+# The tags of the segments
+RAW = 0
+VARIABLE = 1
+QUOTED = 2
+# The flags of the elements
+PIPELINE = 1
+BACKGROUND = 2
+# The kind of the words that are arguments, and not redirection targets
+ARGUMENT = -1
+
+
+class Elements(SequenceABC):
+    """
+    A view of the elements of a compact sequence, decoded when accessed
+    """
+    sequence: 'CompactSequence'
+
+    def __init__(self, sequence):
+        self.sequence = sequence
+
+    def __len__(self):
+        return len(self.sequence.flags)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.sequence.decode(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('element index out of range')
+        return self.sequence.decode(index)
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, Elements)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __ne__(self, other):
+        return not (self == other)
+
+
+class CompactSequence(Sequence):
+    """
+    A sequence stored as flat arrays of integers referring to a table of unique strings
+
+    Each segment is a pair of integers, its tag and its string, or the number of segments it contains for quoted
+    segments. Words, commands and elements are ranges of segments, words and commands, stored as the offset where each
+    one ends. The elements are decoded to regular nodes when they are accessed, through the commands view.
+
+    The elements compiled by a long-lived process can be kept with the sequence, to run them again without decoding
+    and compiling them. They are not pickled.
+    """
+    visit = 'visit_sequence'
+    strings: List[str]
+    ids: Optional[Dict[str, int]]
+    segments: array
+    words: array
+    kinds: array
+    commands_ends: array
+    elements: array
+    flags: array
+    compiled: Optional[List['CompiledElement']]
+    __slots__ = ('strings', 'ids', 'segments', 'words', 'kinds', 'commands_ends', 'elements', 'flags', 'compiled')
+
+    def __init__(self, commands: Optional[Iterable[Union[Command, Pipeline, Background]]] = None):
+        """
+        Create a compact sequence
+        :param commands: The elements of the sequence
+        """
+        self.strings = []
+        self.ids = {}
+        self.segments = array('i')
+        self.words = array('i', [0])
+        self.kinds = array('i')
+        self.commands_ends = array('i', [0])
+        self.elements = array('i', [0])
+        self.flags = array('b')
+        self.compiled = None
+        for command in commands or []:
+            self.append(command)
+
+    @property
+    def commands(self):
+        return Elements(self)
+
+    def intern(self, string: str):
+        """
+        Get the id of a string, adding it to the table if needed
+        :param string: The string
+        :return: The id of the string
+        """
+        if self.ids is None:
+            self.ids = {string: i for i, string in enumerate(self.strings)}
+        id = self.ids.get(string)
+        if id is None:
+            id = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return id
+
+    def encode_segments(self, segments: List[Union[Raw, Quoted, Variable]]):
+        """
+        Encode the segments of a word
+        :param segments: The segments
+        """
+        for segment in segments:
+            if isinstance(segment, Quoted):
+                self.segments.extend((QUOTED, len(segment.segments)))
+                self.encode_segments(segment.segments)
+            elif isinstance(segment, Variable):
+                self.segments.extend((VARIABLE, self.intern(segment.name)))
+            else:
+                self.segments.extend((RAW, self.intern(segment.value)))
+
+    def encode_word(self, word: Word, kind: int):
+        """
+        Encode a word
+        :param word: The word
+        :param kind: The id of the kind of redirection the word is the target of, ARGUMENT if it is an argument
+        """
+        self.encode_segments(word.segments)
+        self.words.append(len(self.segments) // 2)
+        self.kinds.append(kind)
+
+    def append(self, command: Union[Command, Pipeline, Background]):
+        flags = 0
+        if isinstance(command, Background):
+            flags |= BACKGROUND
+            command = command.command
+        if isinstance(command, Pipeline):
+            flags |= PIPELINE
+            commands = command.commands
+        else:
+            commands = [command]
+        for command in commands:
+            for argument in command.arguments:
+                self.encode_word(argument, ARGUMENT)
+            for redirect in command.redirects:
+                self.encode_word(redirect.target, self.intern(redirect.kind))
+            self.commands_ends.append(len(self.kinds))
+        self.elements.append(len(self.commands_ends) - 1)
+        self.flags.append(flags)
+        self.compiled = None
+        return self
+
+    def decode_segments(self, start: int, end: int):
+        """
+        Decode a range of segments
+        :param start: The index of the first segment
+        :param end: The index after the last segment
+        :return: The segments
+        """
+        segments = []
+        i = start
+        while i < end:
+            tag, value = self.segments[2 * i], self.segments[2 * i + 1]
+            if tag == QUOTED:
+                segments.append(Quoted(self.decode_segments(i + 1, i + 1 + value)))
+                i += 1 + value
+                continue
+            segments.append(Variable(self.strings[value]) if tag == VARIABLE else Raw(self.strings[value]))
+            i += 1
+        return segments
+
+    def decode_command(self, index: int):
+        """
+        Decode a command
+        :param index: The index of the command
+        :return: The command
+        """
+        command = Command()
+        for i in range(self.commands_ends[index], self.commands_ends[index + 1]):
+            word = Word(self.decode_segments(self.words[i], self.words[i + 1]))
+            if self.kinds[i] == ARGUMENT:
+                command.append(word)
+            else:
+                command.redirect(Redirect(self.strings[self.kinds[i]], word))
+        return command
+
+    def decode(self, index: int):
+        """
+        Decode an element
+        :param index: The index of the element
+        :return: The element
+        """
+        commands = [self.decode_command(i) for i in range(self.elements[index], self.elements[index + 1])]
+        flags = self.flags[index]
+        element = Pipeline(commands) if flags & PIPELINE else commands[0]
+        return Background(element) if flags & BACKGROUND else element
+
+    def __getstate__(self):
+        return None, {name: getattr(self, name) for name in self.__slots__ if name not in ('ids', 'compiled')}
+
+    def __setstate__(self, state):
+        for name, value in state[1].items():
+            setattr(self, name, value)
+        self.ids = None
+        self.compiled = None
@@ -0,0 +1,59 @@
+import pickle
+from io import StringIO
+
+from helpers.parsing.compact import CompactSequence
+from helpers.parsing.lexer import Lexer
+from helpers.parsing.parser import Parser, Command
+from helpers.parsing.word import Word, Raw
+
+CONFIG = '''
+echo "${COLOR:2}Copying ${name}${RESET}" to\\$here
+command ls -la | command grep x > "out file" &
+command cat < in >> log
+step --needs a b echo ""
+'''
+
+
+def parse():
+    return Parser(Lexer(StringIO(CONFIG))).parse()
+
+
+def test_compact_sequence():
+    sequence = parse()
+    compact = CompactSequence(sequence.commands)
+    assert compact == sequence
+    assert len(compact.commands) == 4
+    assert compact.commands[-1] == sequence.commands[-1]
+    assert compact.commands[1:3] == sequence.commands[1:3]
+    assert compact.strings.count('command') == 1
+
+
+def test_compact_sequence_pickle():
+    compact = pickle.loads(pickle.dumps(CompactSequence(parse().commands)))
+    assert compact == parse()
+    compact.append(Command([Word([Raw('echo')])]))
+    assert compact.commands[-1] == Command([Word([Raw('echo')])])
+    assert compact.strings.count('echo') == 1
+
+
+def test_compact_sequence_visitor():
+    class Visitor:
+        def __init__(self):
+            self.visited = []
+
+        def visit_sequence(self, sequence):
+            for command in sequence.commands:
+                command.apply(self)
+
+        def visit_command(self, command):
+            self.visited.append(command)
+
+        def visit_pipeline(self, pipeline):
+            self.visited.append(pipeline)
+
+        def visit_background(self, background):
+            self.visited.append(background)
+
+    visitor = Visitor()
+    CompactSequence(parse().commands).apply(visitor)
+    assert visitor.visited == parse().commands
@@ -0,0 +1,54 @@
+from hashlib import blake2b
+from typing import Dict, List
+
+from helpers.parsing.lexer import Token, tokenize
+from helpers.parsing.lexer_error import LexerError
+
+
+def get_key(line: str):
+    """
+    Get the key of a line in the cache
+    :param line: The line, without its line break
+    :return: The key, a hash of the content of the line
+    """
+    return blake2b(line.encode(), digest_size=16).digest()
+
+
+class LineCache:
+    """
+    The tokens of lines, keyed by a hash of their content, to only split the lines that changed
+
+    The cache is used as the tokenize function of a lexer. As the lines are split independently of each other, the
+    tokens of a line can be reused wherever the line moved to. The entries used since the cache was created are kept
+    apart, so that saving the cache drops the lines that were removed from the configuration.
+    """
+    entries: Dict[bytes, List[Token]]
+    used: Dict[bytes, List[Token]]
+    misses: int
+
+    def __init__(self, entries=None):
+        """
+        Create a line cache
+        :param entries: The tokens of the lines, by key
+        """
+        self.entries = {} if entries is None else entries
+        self.used = {}
+        self.misses = 0
+
+    def __call__(self, line: str):
+        """
+        Split a line into tokens, reusing the tokens of the same line if it was already split
+        :param line: The line, without its line break
+        :return: The tokens, followed by the error met if the rest of the line could not be split
+        """
+        key = get_key(line)
+        tokens = self.used.get(key)
+        if tokens is None:
+            tokens = self.entries.get(key)
+        if tokens is None:
+            self.misses += 1
+            tokens = tokenize(line)
+            if tokens and isinstance(tokens[-1], LexerError):
+                return tokens
+        self.used[key] = tokens
+        return tokens
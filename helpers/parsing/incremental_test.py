@@ -0,0 +1,36 @@
+from io import StringIO
+
+import pytest
+
+from helpers.parsing.incremental import LineCache
+from helpers.parsing.lexer import Lexer
+from helpers.parsing.lexer_error import LexerError
+from helpers.parsing.parser import Parser
+
+LINES = ['echo "line ${COLOR:2}{}${RESET}"'.replace('{}', str(i)) for i in range(5000)]
+
+
+def parse(lines, tokenize=None):
+    content = StringIO('\n'.join(lines) + '\n')
+    return Parser(Lexer(content) if tokenize is None else Lexer(content, tokenize)).parse()
+
+
+def test_line_cache_edit():
+    cache = LineCache()
+    parse(LINES, cache)
+    assert cache.misses == len(LINES)
+
+    lines = LINES.copy()
+    lines[2500] = 'command ls -la'
+    lines.insert(10, 'echo inserted')
+    cache = LineCache(cache.used)
+    assert parse(lines, cache) == parse(lines)
+    assert cache.misses == 2
+    assert len(cache.used) == len(lines)
+
+
+def test_line_cache_error():
+    cache = LineCache()
+    with pytest.raises(LexerError):
+        parse(['echo ok', 'echo "unfinished'], cache)
+    assert len(cache.used) == 1
@@ -1,8 +1,10 @@
+import re
 from enum import Enum
-from typing import Optional, TextIO
+from typing import Callable, Optional, TextIO, Union, List
 
-from helpers.parsing.characters import is_whitespace
-from helpers.parsing.word import Word
+from helpers.parsing.characters import WHITESPACE, SPECIAL, WORD_RAW
+from helpers.parsing.lexer_error import LexerError
+from helpers.parsing.word import Word, Raw
 
 
 class TOKEN(Enum):
@@ -10,11 +12,15 @@ class TOKEN(Enum):
     END = 1
     SEPARATOR = 2
     WORD = 3
+    BACKGROUND = 4
+    PIPE = 5
+    REDIRECT = 6
 
 
 class Token:
     type: TOKEN
-    value: Optional[Word]
+    value: Optional[Union[Word, str]]
+    __slots__ = ('type', 'value')
 
     def __init__(self, type, value=None):
         self.type = type
@@ -42,6 +48,18 @@ class Token:
     def word(cls, word):
         return cls(TOKEN.WORD, word)
 
+    @classmethod
+    def background(cls):
+        return cls(TOKEN.BACKGROUND)
+
+    @classmethod
+    def pipe(cls):
+        return cls(TOKEN.PIPE)
+
+    @classmethod
+    def redirect(cls, kind):
+        return cls(TOKEN.REDIRECT, kind)
+
     def __eq__(self, other):
         if not isinstance(other, Token):
             return False
@@ -51,17 +69,58 @@ class Token:
         return not (self == other)
 
 
+# The characters ending a word
+WORD_END = f'(?=$|[{re.escape(WHITESPACE + SPECIAL)}])'
+# The next token of a line after the whitespace, a standalone & being a background token, and a word without quotes,
+# variables or escaped characters being matched at once
+TOKENS = re.compile(f'[{re.escape(WHITESPACE)}]*(?:(?P<comment>#)|(?P<separator>;)|(?P<background>&{WORD_END})|'
+                    f'(?P<pipe>\\|)|(?P<redirect>>>|[<>])|(?P<raw>{WORD_RAW.pattern}){WORD_END})?')
+
+
+def tokenize(line: str):
+    """
+    Split a line into tokens, without the separator ending it
+    :param line: The line, without its line break
+    :return: The tokens, followed by the error met if the rest of the line could not be split
+    """
+    tokens = []
+    pos = 0
+    try:
+        while True:
+            match = TOKENS.match(line, pos)
+            kind = match.lastgroup
+            pos = match.end()
+            if kind == 'raw':
+                tokens.append(Token.word(Word([Raw(match.group(kind))])))
+            elif kind == 'comment' or (kind is None and pos == len(line)):
+                return tokens
+            elif kind is None:
+                pos, word = Word.parse(line, pos)
+                tokens.append(Token.word(word))
+            elif kind == 'redirect':
+                tokens.append(Token.redirect(match.group(kind)))
+            else:
+                tokens.append(getattr(Token, kind)())
+    except LexerError as e:
+        tokens.append(e)
+        return tokens
+
+
 class Lexer:
     file: TextIO
-    pos: int
+    tokenize: Callable[[str], List[Union[Token, LexerError]]]
     line: str
+    tokens: List[Union[Token, LexerError]]
+    index: int
 
     token: Token
 
-    def __init__(self, file):
+    def __init__(self, file, tokenize=tokenize):
         self.file = file
+        self.tokenize = tokenize
         self.line = ''
-        self.pos = 0
+        self.tokens = []
+        self.index = 0
         self.token = Token.none()
 
         self.eat()
@@ -70,37 +129,27 @@ class Lexer:
         return self.token
 
     def eat_once(self):
-        if self.token == TOKEN.END:
-            return self.token
-
-        while self.pos < len(self.line) and is_whitespace(self.line[self.pos]):
-            self.pos += 1
-
-        if self.pos == len(self.line):
-            if self.token.type == TOKEN.SEPARATOR or self.token.type == TOKEN.NONE:
-                self.pos = 0
-                self.line = self.file.readline()
-                if self.line == '':
-                    self.token = Token.end()
-                    return self.token
-                if self.line[-1] == '\n':
-                    self.line = self.line[:-1]
-                return self.eat_once()
-            else:
+        while self.index == len(self.tokens):
+            if self.token.type is TOKEN.END:
+                return self.token
+            if self.token.type is not TOKEN.SEPARATOR and self.token.type is not TOKEN.NONE:
                 self.token = Token.separator()
                 return self.token
-        if self.line[self.pos] == '#':
-            self.pos = len(self.line)
-            return self.eat_once()
-        elif self.line[self.pos] == ';':
-            self.pos += 1
-            self.token = Token.separator()
-            return self.token
-        else:
-            start = self.pos
-            self.pos, word = Word.parse(self.line, start)
-            self.token = Token.word(word)
-            return self.token
+            self.line = self.file.readline()
+            if self.line == '':
+                self.token = Token.end()
+                return self.token
+            if self.line[-1] == '\n':
+                self.line = self.line[:-1]
+            self.tokens = self.tokenize(self.line)
+            self.index = 0
+
+        token = self.tokens[self.index]
+        self.index += 1
+        if isinstance(token, LexerError):
+            raise token
+        self.token = token
+        return token
 
     def eat(self):
         return self.eat_once()
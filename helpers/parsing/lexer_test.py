@@ -87,6 +87,35 @@ from helpers.parsing.word import Word, Raw, Variable, Quoted
     pytest.param('myword # This is a test',
                  [Token.word(Word([Raw('myword')])), Token.separator()],
                  id="a command after words"),
+
+    pytest.param('first &',
+                 [Token.word(Word([Raw('first')])), Token.background(), Token.separator()],
+                 id="background"),
+    pytest.param('first & second&;',
+                 [Token.word(Word([Raw('first')])), Token.background(), Token.word(Word([Raw('second&')])),
+                  Token.separator()],
+                 id="background between two commands"),
+    pytest.param('first &;',
+                 [Token.word(Word([Raw('first')])), Token.background(), Token.separator()],
+                 id="background before separator"),
+
+    pytest.param('first | second',
+                 [Token.word(Word([Raw('first')])), Token.pipe(), Token.word(Word([Raw('second')])), Token.separator()],
+                 id="pipe"),
+    pytest.param('first|second',
+                 [Token.word(Word([Raw('first')])), Token.pipe(), Token.word(Word([Raw('second')])), Token.separator()],
+                 id="pipe without spaces"),
+    pytest.param('first > out >> log < in',
+                 [Token.word(Word([Raw('first')])), Token.redirect('>'), Token.word(Word([Raw('out')])),
+                  Token.redirect('>>'), Token.word(Word([Raw('log')])), Token.redirect('<'),
+                  Token.word(Word([Raw('in')])), Token.separator()],
+                 id="redirections"),
+    pytest.param('"first | second>"',
+                 [Token.word(Word([Quoted([Raw('first | second>')])])), Token.separator()],
+                 id="quoted pipe and redirection"),
+
+    pytest.param('# comment\n\n' * 5000 + 'a', [Token.word(Word([Raw('a')])), Token.separator()],
+                 id="many comment lines"),
 ])
 def test_lexer_successful(input: str, expected: List[Token]):
     io = StringIO(input)
@@ -2,47 +2,137 @@ from typing import Union, List
 
 from helpers.parsing.lexer import Lexer, TOKEN
 from helpers.parsing.parser_error import ParserError
+from helpers.parsing.word import Word
 
 
 class Node:
+    visit: str
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'visit' not in cls.__dict__:
+            name = ''.join((f"_{c.lower()}" if c.isupper() else c) for c in cls.__name__).lstrip('_')
+            cls.visit = f"visit_{name}"
+
     def apply(self, visitor):
-        name = ''.join((f"_{c.lower()}" if c.isupper() else c) for c in self.__class__.__name__).lstrip('_')
-        fun = getattr(visitor, f"visit_{name}")
-        fun(self)
+        getattr(visitor, self.visit)(self)
+
+
+class Redirect(Node):
+    kind: str
+    target: Word
+    __slots__ = ('kind', 'target')
+
+    def __init__(self, kind, target):
+        self.kind = kind
+        self.target = target
+
+    def __str__(self):
+        return f'{self.kind} {self.target}'
+
+    def __repr__(self):
+        return f'Redirect(kind={repr(self.kind)}, target={repr(self.target)})'
+
+    def __eq__(self, other):
+        if not isinstance(other, Redirect):
+            return False
+        return self.kind == other.kind and self.target == other.target
+
+    def __ne__(self, other):
+        return not (self == other)
 
 
 class Command(Node):
-    arguments: List[str]
+    arguments: List[Word]
+    redirects: List[Redirect]
+    __slots__ = ('arguments', 'redirects')
 
-    def __init__(self, arguments=None):
+    def __init__(self, arguments=None, redirects=None):
         self.arguments = [] if arguments is None else arguments
+        self.redirects = [] if redirects is None else redirects
 
-    def append(self, argument: str):
+    def append(self, argument: Word):
         self.arguments.append(argument)
         return self
 
+    def redirect(self, redirect: Redirect):
+        self.redirects.append(redirect)
+        return self
+
     def __str__(self):
         return repr(self)
 
     def __repr__(self):
-        return f'Command(arguments={repr(self.arguments)})'
+        if not self.redirects:
+            return f'Command(arguments={repr(self.arguments)})'
+        return f'Command(arguments={repr(self.arguments)}, redirects={repr(self.redirects)})'
 
     def __eq__(self, other):
         if not isinstance(other, Command):
             return False
-        return self.arguments == other.arguments
+        return self.arguments == other.arguments and self.redirects == other.redirects
+
+    def __ne__(self, other):
+        return not (self == other)
+
+
+class Pipeline(Node):
+    commands: List[Command]
+    __slots__ = ('commands',)
+
+    def __init__(self, commands=None):
+        self.commands = [] if commands is None else commands
+
+    def append(self, command: Command):
+        self.commands.append(command)
+        return self
+
+    def __str__(self):
+        return repr(self)
+
+    def __repr__(self):
+        return f'Pipeline(commands={repr(self.commands)})'
+
+    def __eq__(self, other):
+        if not isinstance(other, Pipeline):
+            return False
+        return self.commands == other.commands
+
+    def __ne__(self, other):
+        return not (self == other)
+
+
+class Background(Node):
+    command: Union[Command, Pipeline]
+    __slots__ = ('command',)
+
+    def __init__(self, command):
+        self.command = command
+
+    def __str__(self):
+        return repr(self)
+
+    def __repr__(self):
+        return f'Background(command={repr(self.command)})'
+
+    def __eq__(self, other):
+        if not isinstance(other, Background):
+            return False
+        return self.command == other.command
 
     def __ne__(self, other):
         return not (self == other)
 
 
 class Sequence(Node):
-    commands: List[Union[Command]]
+    commands: List[Union[Command, Pipeline, Background]]
+    __slots__ = ('commands',)
 
     def __init__(self, commands=None):
         self.commands = [] if commands is None else commands
 
-    def append(self, command: Union[Command]):
+    def append(self, command: Union[Command, Pipeline, Background]):
         self.commands.append(command)
         return self
 
@@ -72,29 +162,50 @@ class Parser:
         command = Command()
         command.append(self.lexer.current().value)
         self.lexer.eat()
-        while self.lexer.current().type not in [TOKEN.SEPARATOR, TOKEN.END]:
-            command.append(self.lexer.current().value)
+        while self.lexer.current().type in [TOKEN.WORD, TOKEN.REDIRECT]:
+            if self.lexer.current().type == TOKEN.WORD:
+                command.append(self.lexer.current().value)
+                self.lexer.eat()
+                continue
+            kind = self.lexer.current().value
+            if self.lexer.eat().type != TOKEN.WORD:
+                raise ParserError("missing redirection target", self.lexer.current())
+            command.redirect(Redirect(kind, self.lexer.current().value))
             self.lexer.eat()
-        self.lexer.eat()
         return command
 
+    def parse_pipeline(self):
+        pipeline = Pipeline([self.parse_command()])
+        while self.lexer.current().type == TOKEN.PIPE:
+            if self.lexer.eat().type != TOKEN.WORD:
+                raise ParserError("unexpected token", self.lexer.current())
+            pipeline.append(self.parse_command())
+        element = pipeline.commands[0] if len(pipeline.commands) == 1 else pipeline
+
+        if self.lexer.current().type == TOKEN.BACKGROUND:
+            element = Background(element)
+        elif self.lexer.current().type not in [TOKEN.SEPARATOR, TOKEN.END]:
+            raise ParserError("unexpected token", self.lexer.current())
+        self.lexer.eat()
+        return element
+
     def parse_sequence_element(self):
         if self.lexer.current().type == TOKEN.WORD:
-            return self.parse_command()
+            return self.parse_pipeline()
         else:
             raise ParserError("unexpected token", self.lexer.current())
 
-    def parse_sequence(self):
-        commands = Sequence()
+    def parse_elements(self):
         while self.lexer.current().type != TOKEN.END:
             if self.lexer.current().type == TOKEN.WORD:
-                element = self.parse_sequence_element()
-                commands.append(element)
+                yield self.parse_sequence_element()
             elif self.lexer.current().type == TOKEN.SEPARATOR:
                 self.lexer.eat()
             else:
                 raise ParserError("unexpected token", self.lexer.current())
-        return commands
+
+    def parse_sequence(self):
+        return Sequence(list(self.parse_elements()))
 
     def parse(self):
         return self.parse_sequence()
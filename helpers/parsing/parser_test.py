@@ -3,7 +3,8 @@ from typing import List
 import pytest
 
 from helpers.parsing.lexer import Token
-from helpers.parsing.parser import Parser, Sequence, Command
+from helpers.parsing.parser import Parser, Sequence, Command, Background, Pipeline, Redirect
+from helpers.parsing.parser_error import ParserError
 
 
 class MockedLexer:
@@ -38,8 +39,50 @@ class MockedLexer:
     pytest.param([Token.word('first'), Token.separator(), Token.word('second')],
                  Sequence([Command(['first']), Command(['second'])]),
                  id='several commands'),
+
+    pytest.param([Token.word('first'), Token.background()],
+                 Sequence([Background(Command(['first']))]),
+                 id='background'),
+    pytest.param([Token.word('first'), Token.background(), Token.word('second'), Token.separator()],
+                 Sequence([Background(Command(['first'])), Command(['second'])]),
+                 id='background then command'),
+
+    pytest.param([Token.word('first'), Token.pipe(), Token.word('second'), Token.word('third')],
+                 Sequence([Pipeline([Command(['first']), Command(['second', 'third'])])]),
+                 id='pipeline'),
+    pytest.param([Token.word('first'), Token.redirect('>'), Token.word('out'), Token.word('second')],
+                 Sequence([Command(['first', 'second'], [Redirect('>', 'out')])]),
+                 id='redirection'),
+    pytest.param([Token.word('first'), Token.redirect('<'), Token.word('in'), Token.pipe(), Token.word('second'),
+                  Token.redirect('>>'), Token.word('out'), Token.background()],
+                 Sequence([Background(Pipeline([Command(['first'], [Redirect('<', 'in')]),
+                                                Command(['second'], [Redirect('>>', 'out')])]))]),
+                 id='background pipeline with redirections'),
 ])
 def test_parser_successful(input: List[Token], expected: Sequence):
     lexer = MockedLexer(input)
     parser = Parser(lexer)
     assert parser.parse() == expected
+
+
+@pytest.mark.parametrize(['input', 'error'], [
+    pytest.param([Token.pipe()], 'unexpected token', id='pipe first'),
+    pytest.param([Token.word('first'), Token.pipe()], 'unexpected token', id='missing command after pipe'),
+    pytest.param([Token.word('first'), Token.redirect('>')], 'missing redirection target', id='missing target'),
+    pytest.param([Token.word('first'), Token.redirect('>'), Token.pipe()], 'missing redirection target',
+                 id='pipe as target'),
+])
+def test_parser_unsuccessful(input: List[Token], error: str):
+    lexer = MockedLexer(input)
+    parser = Parser(lexer)
+    with pytest.raises(ParserError) as e:
+        parser.parse()
+    assert e.value.error == error
+
+
+def test_parser_elements():
+    lexer = MockedLexer([Token.word('first'), Token.separator(), Token.pipe()])
+    elements = Parser(lexer).parse_elements()
+    assert next(elements) == Command(['first'])
+    with pytest.raises(ParserError):
+        next(elements)
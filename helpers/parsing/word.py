@@ -1,31 +1,44 @@
 from typing import Union, List
 
-from helpers.parsing.characters import is_whitespace, is_special
+from helpers.parsing.characters import WORD_RAW, QUOTED_RAW
 from helpers.parsing.lexer_error import LexerError
 
 
 class Node:
+    visit: str
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'visit' not in cls.__dict__:
+            name = ''.join((f"_{c.lower()}" if c.isupper() else c) for c in cls.__name__).lstrip('_')
+            cls.visit = f"visit_{name}"
+
     def apply(self, visitor):
-        name = ''.join((f"_{c.lower()}" if c.isupper() else c) for c in self.__class__.__name__).lstrip('_')
-        fun = getattr(visitor, f"visit_{name}")
-        fun(self)
+        getattr(visitor, self.visit)(self)
+
+
+# The characters following a backslash, and the characters they stand for
+ESCAPES = {
+    'n': '\n', 't': '\t', '$': '$', '\\': '\\', '"': '"', 'a': '\a', 'b': '\b', 'f': '\f', 'r': '\r', 'v': '\v',
+}
+# The translation of the characters that must be escaped back to their escape sequences
+UNESCAPES = str.maketrans({character: f'\\{escape}' for escape, character in ESCAPES.items()})
 
 
 def parse_escaped(line: str, i: int):
     i += 1
     if i == len(line):
         raise LexerError("missing escaped character", line)
-    characters = {
-        'n': '\n', 't': '\t', '$': '$', '\\': '\\', '"': '"', 'a': '\a', 'b': '\b', 'f': '\f', 'r': '\r', 'v': '\v',
-    }
     try:
-        return i + 1, characters[line[i]]
+        return i + 1, ESCAPES[line[i]]
     except KeyError:
         raise LexerError("invalid escaped character", line)
 
 
 class Variable(Node):
     name: str
+    __slots__ = ('name',)
 
     def __init__(self, name):
         self.name = name
@@ -49,43 +62,21 @@ class Variable(Node):
         i += 1
         if i == len(line) or line[i] != '{':
             raise LexerError("missing variable start", line)
-        i += 1
-        name = ''
-        while i < len(line) and line[i] != '}':
-            name += line[i]
-            i += 1
-        if i == len(line):
+        end = line.find('}', i + 1)
+        if end == -1:
             raise LexerError("missing variable end", line)
-        i += 1
-        return i, cls(name)
+        return end + 1, cls(line[i + 1:end])
 
 
 class Raw(Node):
     value: str
+    __slots__ = ('value',)
 
     def __init__(self, value):
         self.value = value
 
     def __str__(self):
-        s = ''
-        characters = {
-            '\n': '\\n',
-            '\t': '\\t',
-            '$': '\\$',
-            '\\': '\\\\',
-            '"': '\\"',
-            '\a': '\\a',
-            '\b': '\\b',
-            '\f': '\\f',
-            '\r': '\\r',
-            '\v': '\\v',
-        }
-        for char in self.value:
-            if char in characters:
-                s += characters[char]
-            else:
-                s += char
-        return s
+        return self.value.translate(UNESCAPES)
 
     def __repr__(self):
         return f'Raw(value={repr(self.value)})'
@@ -101,6 +92,7 @@ class Raw(Node):
 
 class Quoted(Node):
     segments: List[Union[Variable, Raw]]
+    __slots__ = ('segments',)
 
     def __init__(self, segments):
         self.segments = segments
@@ -125,32 +117,35 @@ class Quoted(Node):
 
     @classmethod
     def parse(cls, line: str, i: int):
-        tokens = []
-        current_token = ''
+        segments = []
+        raw = []
         i += 1
-        while i < len(line) and line[i] != '"':
-            if line[i] == '$':
-                if current_token:
-                    tokens.append(Raw(current_token))
-                    current_token = ''
-                i, variable = Variable.parse(line, i)
-                tokens.append(variable)
-            elif line[i] == '\\':
-                i, subtoken = parse_escaped(line, i)
-                current_token += subtoken
+        while True:
+            match = QUOTED_RAW.match(line, i)
+            if match is not None:
+                raw.append(match.group())
+                i = match.end()
+            if i == len(line):
+                raise LexerError("missing quote end", line)
+            if line[i] == '"':
+                break
+            if line[i] == '\\':
+                i, escaped = parse_escaped(line, i)
+                raw.append(escaped)
             else:
-                current_token += line[i]
-                i += 1
-        if i == len(line):
-            raise LexerError("missing quote end", line)
-        i += 1
-        if current_token:
-            tokens.append(Raw(current_token))
-        return i, cls(tokens)
+                if raw:
+                    segments.append(Raw(''.join(raw)))
+                    raw = []
+                i, variable = Variable.parse(line, i)
+                segments.append(variable)
+        if raw:
+            segments.append(Raw(''.join(raw)))
+        return i + 1, cls(segments)
 
 
 class Word(Node):
     segments: List[Union[Raw, Variable]]
+    __slots__ = ('segments',)
 
     def __init__(self, segments):
         self.segments = segments
@@ -171,28 +166,26 @@ class Word(Node):
 
     @classmethod
     def parse(cls, line: str, i: int):
-        tokens = []
-        current_token = ''
-        while i < len(line) and not is_whitespace(line[i]) and not is_special(line[i]):
-            if line[i] == '"':
-                if current_token:
-                    tokens.append(Raw(current_token))
-                    current_token = ''
-                i, quoted = Quoted.parse(line, i)
-                tokens.append(quoted)
-            elif line[i] == '$':
-                if current_token:
-                    tokens.append(Raw(current_token))
-                    current_token = ''
-                i, variable = Variable.parse(line, i)
-                tokens.append(variable)
-            elif line[i] == '\\':
-                i, subtoken = parse_escaped(line, i)
-                current_token += subtoken
+        segments = []
+        raw = []
+        while True:
+            match = WORD_RAW.match(line, i)
+            if match is not None:
+                raw.append(match.group())
+                i = match.end()
+            if i == len(line):
+                break
+            if line[i] == '\\':
+                i, escaped = parse_escaped(line, i)
+                raw.append(escaped)
+            elif line[i] in '"$':
+                if raw:
+                    segments.append(Raw(''.join(raw)))
+                    raw = []
+                i, segment = (Quoted if line[i] == '"' else Variable).parse(line, i)
+                segments.append(segment)
             else:
-                current_token += line[i]
-                i += 1
-        if current_token:
-            tokens.append(Raw(current_token))
-
-        return i, Word(tokens)
+                break
+        if raw:
+            segments.append(Raw(''.join(raw)))
+        return i, Word(segments)
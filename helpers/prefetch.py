@@ -0,0 +1,49 @@
+from queue import Queue, Empty
+from threading import Thread, Event
+from typing import Iterable, TypeVar, Iterator
+
+T = TypeVar('T')
+
+# The number of items produced ahead of their consumer
+SIZE = 64
+# The marker of the end of the items
+END = object()
+
+
+def prefetch(items: Iterable[T], size: int = SIZE) -> Iterator[T]:
+    """
+    Produce items on a thread, ahead of their consumer
+    :param items: The items
+    :param size: The maximum number of items produced ahead
+    :return: The items, the error raised while producing them being raised after the items produced before it
+    """
+    queue = Queue(size)
+    stop = Event()
+
+    def produce():
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                queue.put((item, None))
+            queue.put((END, None))
+        except BaseException as e:
+            queue.put((END, e))
+
+    thread = Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = queue.get()
+            if item is END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        while thread.is_alive():
+            try:
+                queue.get(timeout=0.01)
+            except Empty:
+                pass
@@ -0,0 +1,30 @@
+import threading
+
+import pytest
+
+from helpers.prefetch import prefetch
+
+
+def test_prefetch_order():
+    assert list(prefetch(range(1000), 8)) == list(range(1000))
+
+
+def test_prefetch_error():
+    def items():
+        yield 1
+        yield 2
+        raise ValueError("failed")
+
+    consumed = []
+    with pytest.raises(ValueError, match="failed"):
+        for item in prefetch(items()):
+            consumed.append(item)
+    assert consumed == [1, 2]
+
+
+def test_prefetch_close():
+    threads = threading.active_count()
+    items = prefetch(iter(range(1000000)), 4)
+    assert next(items) == 0
+    items.close()
+    assert threading.active_count() == threads
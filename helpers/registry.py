@@ -0,0 +1,103 @@
+import os
+import sys
+from importlib import import_module
+from typing import Dict, Generic, List, Optional, Type, TypeVar
+
+T = TypeVar('T')
+
+# The suffixes of the directories holding the metadata of the installed distributions
+METADATA = ('.dist-info', '.egg-info')
+
+
+def find_entry_points(group: str):
+    """
+    Find the entry points of a group declared by the installed distributions
+
+    The metadata is read directly, as importing importlib.metadata takes longer than starting the script.
+    :param group: The name of the group
+    :return: The reference to the object of each entry point, by name, the first distribution on the path winning
+    """
+    entry_points = {}
+    for path in sys.path:
+        try:
+            entries = [entry.path for entry in os.scandir(path or '.') if entry.name.endswith(METADATA)]
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                with open(os.path.join(entry, 'entry_points.txt')) as f:
+                    lines = f.read().splitlines()
+            except OSError:
+                continue
+            section = None
+            for line in lines:
+                line = line.strip()
+                if line.startswith('['):
+                    section = line.strip('[]').strip()
+                elif section == group and '=' in line:
+                    name, reference = line.split('=', 1)
+                    entry_points.setdefault(name.strip(), reference.split('[')[0].strip())
+    return entry_points
+
+
+class Registry(Generic[T]):
+    """
+    Classes registered by name, as references like module:Class, only imported the first time they are used
+
+    Other distributions can register more classes as entry points of the group of the registry. The entry points are
+    only looked up when a name is not registered by the package itself, or when all the names are listed.
+    """
+    group: str
+    references: Dict[str, str]
+    classes: Dict[str, Type[T]]
+    discovered: bool
+
+    def __init__(self, group, references):
+        """
+        Create a registry
+        :param group: The group of the entry points registering more classes
+        :param references: The reference to each class, by name
+        """
+        self.group = group
+        self.references = dict(references)
+        self.classes = {}
+        self.discovered = False
+
+    def discover(self):
+        """
+        Register the classes of the entry points, the first time
+        """
+        if not self.discovered:
+            self.discovered = True
+            for name, reference in find_entry_points(self.group).items():
+                self.references.setdefault(name, reference)
+
+    def __contains__(self, name: str):
+        if name not in self.references:
+            self.discover()
+        return name in self.references
+
+    def names(self) -> List[str]:
+        """
+        Get the names of all the classes registered
+        :return: The names
+        """
+        self.discover()
+        return list(self.references)
+
+    def get(self, name: str) -> Optional[Type[T]]:
+        """
+        Get a class, importing it if needed
+        :param name: The name of the class
+        :return: The class, None if no class is registered with this name
+        """
+        if name in self.classes:
+            return self.classes[name]
+        if name not in self:
+            return None
+        module, _, attribute = self.references[name].partition(':')
+        value = import_module(module)
+        for part in attribute.split('.') if attribute else []:
+            value = getattr(value, part)
+        self.classes[name] = value
+        return value
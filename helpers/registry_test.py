@@ -0,0 +1,30 @@
+import sys
+
+from helpers.registry import Registry, find_entry_points
+
+
+def test_registry_lazy(monkeypatch):
+    monkeypatch.delitem(sys.modules, 'helpers.commands.wait', raising=False)
+    registry = Registry('setups.test', {'wait': 'helpers.commands.wait:Wait'})
+    assert 'helpers.commands.wait' not in sys.modules
+    assert registry.get('wait').name == 'wait'
+    assert 'helpers.commands.wait' in sys.modules
+    assert registry.get('wait') is registry.get('wait')
+
+
+def test_registry_entry_points(tmp_path, monkeypatch):
+    metadata = tmp_path / 'plugin-1.0.dist-info'
+    metadata.mkdir()
+    (metadata / 'entry_points.txt').write_text(
+        '[console_scripts]\nplugin = plugin:main\n\n'
+        '[setups.test]\ngreet = helpers.commands.echo:Echo\nwait = plugin:Wait [extra]\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    assert find_entry_points('setups.test') == {'greet': 'helpers.commands.echo:Echo', 'wait': 'plugin:Wait'}
+
+    registry = Registry('setups.test', {'wait': 'helpers.commands.wait:Wait'})
+    assert not registry.discovered
+    assert registry.get('wait').name == 'wait'
+    assert not registry.discovered
+    assert registry.get('greet').name == 'echo'
+    assert registry.get('missing') is None
+    assert registry.names() == ['wait', 'greet']
@@ -1,111 +1,407 @@
+import os
 import sys
+from functools import partial
 from pathlib import Path
-from typing import Mapping, List
+from typing import Dict, Mapping, List, Optional, Union, Iterable, Set as SetType, TYPE_CHECKING
 
-from helpers.colors import rgb, number, reset
+from helpers.colors import number, reset, get_color
 from helpers.commands.abstract_command import AbstractCommand
-from helpers.commands.ask import Ask
-from helpers.commands.command import Command
-from helpers.commands.echo import Echo
-from helpers.commands.file import File
-from helpers.commands.set import Set
-from helpers.parsing.parser import Sequence as SequenceNode, Command as CommandNode
-from helpers.parsing.word import Word, Raw, Quoted, Variable
+from helpers.compiler import CompiledElement, compile_word
+from helpers.coprocess import Coprocess
+from helpers.memo import Memo
+from helpers.output import Pumps, get_capture
+from helpers.parsing.lexer_error import LexerError
+from helpers.parsing.parser import Sequence as SequenceNode, Command as CommandNode, Background as BackgroundNode, \
+    Pipeline as PipelineNode, Redirect as RedirectNode
+from helpers.parsing.parser_error import ParserError
+from helpers.parsing.word import Word
+from helpers.registry import Registry
+from helpers.scheduler import Scheduler
+from helpers.trace import Tracer, STEP_CATEGORY, span, wait
 
+if TYPE_CHECKING:
+    from helpers.jobs import Jobs
 
-class RunnerVisitor:
-    runner: 'Runner'
-    exit: int
 
-    def __init__(self, runner):
-        self.runner = runner
-        self.exit = 0
-
-    def visit_command(self, command: CommandNode):
-        print('> ' + ' '.join(str(argument) for argument in command.arguments))
-        self.exit = self.runner(command.arguments)
-
-    def visit_sequence(self, sequence: SequenceNode):
-        for command in sequence.commands:
-            command.apply(self)
-            if self.exit != 0:
-                break
-
-
-class RunnerResolver:
-    runner: 'Runner'
-    result: str
-
-    def __init__(self, runner):
-        self.runner = runner
-        self.result = ''
-
-    def visit_word(self, word: Word):
-        for segment in word.segments:
-            segment.apply(self)
-
-    def visit_raw(self, word: Raw):
-        self.result += word.value
-
-    def visit_quoted(self, quoted: Quoted):
-        for segment in quoted.segments:
-            segment.apply(self)
-
-    def visit_variable(self, variable: Variable):
-        self.result += self.runner.get_variable(variable.name)
+# The flags used to open the target of a redirection
+REDIRECTIONS = {
+    '<': os.O_RDONLY,
+    '>': os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+    '>>': os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+}
+# The commands that can be run from a configuration, imported when first run
+BUILTINS: Registry[AbstractCommand] = Registry('setups.builtins', {
+    'ask': 'helpers.commands.ask:Ask',
+    'command': 'helpers.commands.command:Command',
+    'echo': 'helpers.commands.echo:Echo',
+    'file': 'helpers.commands.file:File',
+    'set': 'helpers.commands.set:Set',
+    'step': 'helpers.commands.step:Step',
+    'wait': 'helpers.commands.wait:Wait',
+})
 
 
 class Runner:
     variables: Mapping[str, str]
-    commands: Mapping[str, AbstractCommand]
+    commands: Dict[str, AbstractCommand]
     directory: Path
+    jobs: Optional['Jobs']
+    workers: int
+    infer: bool
+    steps: SetType[str]
+    shell: bool
+    coprocess: Optional[Coprocess]
+    tracer: Optional[Tracer]
+    working_directory: Path
+    memo: Optional[Memo]
 
-    def __init__(self, directory):
+    def __init__(self, directory, workers=1, infer=False, shell=False, tracer=None, working_directory=None,
+                 memo=None):
         """
         Create a runner
         :param directory: The setup directory
+        :param workers: The maximum number of steps running at the same time
+        :param infer: Whether to infer the dependencies of the steps on the files copied
+        :param shell: Whether to run the commands in a persistent shell
+        :param tracer: The tracer recording the time spent running the commands, None if not tracing
+        :param working_directory: The directory the commands run in, the current directory if None
+        :param memo: The memo of the steps which already ran in the working directory, None to always run them
         """
         self.variables = {}
         self.directory = directory
-        self.commands = {
-            f'{command.get_name()}': command for command in [
-                Ask(),
-                Command(),
-                Echo(),
-                File(),
-                Set()
-            ]
-        }
+        self.jobs = None
+        self.workers = workers
+        self.infer = infer
+        self.steps = set()
+        self.shell = shell
+        self.coprocess = None
+        self.tracer = tracer
+        self.working_directory = Path.cwd() if working_directory is None else working_directory
+        self.memo = memo
+        self.commands = {}
 
     def run(self, ast: SequenceNode):
         """
-        Run an ast
+        Run an ast, with the elements compiled with it if it kept them
         :param ast: The ast
         :return: The result from the commands
         """
-        visitor = RunnerVisitor(self)
-        ast.apply(visitor)
-        return visitor.exit
+        compiled = getattr(ast, 'compiled', None)
+        return self.stream(ast.commands if compiled is None else compiled)
+
+    def stream(self, elements: Iterable[Union[CommandNode, PipelineNode, BackgroundNode, CompiledElement]]):
+        """
+        Run the elements of an ast as they are parsed
+        :param elements: The elements, or the elements already compiled
+        :return: The result from the commands
+        """
+        try:
+            exit = self.sequence(elements)
+        finally:
+            jobs, self.jobs = self.jobs, None
+            background = jobs.close() if jobs is not None else 0
+            coprocess, self.coprocess = self.coprocess, None
+            if coprocess is not None:
+                coprocess.close()
+            if self.memo is not None:
+                self.memo.close()
+        return exit if exit != 0 else background
+
+    def sequence(self, elements: Iterable[Union[CommandNode, PipelineNode, BackgroundNode, CompiledElement]]):
+        """
+        Compile and run the elements of a sequence as they come, until one fails
+
+        The steps waiting to run as a dependency graph still run when the next element cannot be parsed, as they would
+        have run one after the other, before the error is raised.
+        :param elements: The elements, or the elements already compiled
+        :return: The result from the element that failed, zero if none failed
+        """
+        steps = []
+        try:
+            for element in elements:
+                if not isinstance(element, CompiledElement):
+                    element = CompiledElement(element)
+                if self.workers > 1 and element.step is not None:
+                    steps.append(element.step)
+                    continue
+                if steps:
+                    pending, steps = steps, []
+                    exit = self.schedule(pending)
+                    if exit != 0:
+                        return exit
+                if self.tracer is None:
+                    exit = element.run(self)
+                else:
+                    with self.tracer.span(element.description, STEP_CATEGORY) as args:
+                        exit = args['exit'] = element.run(self)
+                if exit != 0:
+                    return exit
+        except (LexerError, ParserError):
+            if steps:
+                pending, steps = steps, []
+                exit = self.schedule(pending)
+                if exit != 0:
+                    return exit
+            raise
+        return self.schedule(steps) if steps else 0
+
+    def find(self, arguments: List[str]):
+        """
+        Find a command
+        :param arguments: The resolved arguments of the command, starting with its name
+        :return: The command found and its parsed arguments
+        """
+        command = self.commands.get(arguments[0])
+        if command is None:
+            command_class = BUILTINS.get(arguments[0])
+            if command_class is None:
+                raise ValueError(f'invalid command {arguments[0]}')
+            command = self.commands[arguments[0]] = command_class()
+        with span(self.tracer, 'bind', 'bind', command=arguments[0]):
+            return command, command.parse(arguments[1:])
 
-    def __call__(self, command: List[str]):
+    def prepare(self, command: List[Word]):
+        """
+        Resolve the arguments of a command and find it
+        :param command: The command
+        :return: The command found and its parsed arguments
+        """
+        with span(self.tracer, 'resolve', 'resolve'):
+            arguments = [self.resolve(argument) for argument in command]
+        return self.find(arguments)
+
+    def __call__(self, command: List[Word]):
         """
         Run a command
         :param command: The command
         :return: The result from the command, if there is one
         """
-        arguments = [self.resolve(argument) for argument in command]
-        try:
-            command = self.commands[arguments[0]]
-        except KeyError:
-            raise ValueError(f'invalid command {arguments[0]}')
-        arguments = command.parse(arguments[1:])
+        return self.invoke(*self.prepare(command))
+
+    def execute(self, arguments: List[str]):
+        """
+        Run a command whose arguments are already resolved, the commands creating paths being skipped like steps when
+        they already ran the same way in the directory
+        :param arguments: The arguments of the command, starting with its name
+        :return: The result from the command, if there is one
+        """
+        command, parsed = self.find(arguments)
+        if self.memo is not None and command.get_outputs(self, **parsed):
+            name = ' '.join(arguments)
+            return self.memoize(name, name, arguments, command, parsed)
+        return self.invoke(command, parsed)
+
+    def invoke(self, command: AbstractCommand, arguments: Mapping[str, str]):
+        """
+        Call a command, reporting its error
+        :param command: The command
+        :param arguments: The parsed arguments of the command
+        :return: The result from the command, if there is one
+        """
         try:
-            result = command(self, **arguments)
+            with span(self.tracer, command.get_name(), 'execute'):
+                result = command(self, **arguments)
             return 0 if result is None else result
         except ValueError as e:
-            print(f"{number(1)}{str(e).capitalize()}{reset()}", file=sys.stderr)
+            self.report(e)
             return 1
 
+    def pipe(self, stages: List[CommandNode]):
+        """
+        Run a pipeline, or a command with redirections
+        :param stages: The commands of the pipeline
+        :return: Zero if all the commands succeeded, one otherwise
+        """
+        try:
+            self.connect(stages)
+            return 0
+        except ValueError as e:
+            self.report(e)
+            return 1
+
+    def connect(self, stages: List[CommandNode]):
+        """
+        Run the processes of a pipeline, connected by pipes and redirected to files
+        :param stages: The commands of the pipeline
+        """
+        prepared = [self.prepare(stage.arguments) for stage in stages]
+        for command, _ in prepared:
+            if not isinstance(command, BUILTINS.get('command')):
+                raise ValueError(f"{command.get_name()} cannot be piped or redirected")
+
+        processes = []
+        descriptors = []
+        stdin = None
+        # The output of the processes is copied to the capture of the thread, as they do not write to its streams
+        capture = get_capture()
+        pumps = None if capture is None else Pumps(capture)
+        with span(self.tracer, 'pipeline', 'execute'):
+            try:
+                stderr = None if pumps is None else pumps.open('stderr')
+                if stderr is not None:
+                    descriptors.append(stderr)
+                for i, (stage, (command, arguments)) in enumerate(zip(stages, prepared)):
+                    stage_stdin, stage_stdout, next_stdin = stdin, None, None
+                    if i + 1 < len(stages):
+                        next_stdin, stage_stdout = os.pipe()
+                        descriptors += [next_stdin, stage_stdout]
+                    for redirect in stage.redirects:
+                        descriptor = self.open_redirect(redirect)
+                        descriptors.append(descriptor)
+                        if redirect.kind == '<':
+                            stage_stdin = descriptor
+                        else:
+                            stage_stdout = descriptor
+                    if stage_stdout is None and pumps is not None:
+                        stage_stdout = pumps.open('stdout')
+                        descriptors.append(stage_stdout)
+                    processes.append(command.spawn(arguments['command'], stage_stdin, stage_stdout,
+                                               self.get_working_directory(), stderr))
+                    stdin = next_stdin
+            finally:
+                for descriptor in descriptors:
+                    os.close(descriptor)
+                returncodes = [wait(process, self.tracer) for process in processes]
+                if pumps is not None:
+                    pumps.join()
+
+        failed = [returncode for returncode in returncodes if returncode != 0]
+        if failed:
+            prepared[0][0].check(failed[-1])
+
+    def open_redirect(self, redirect: RedirectNode):
+        """
+        Open the target of a redirection
+        :param redirect: The redirection
+        :return: The file descriptor
+        """
+        path = self.get_working_directory() / self.resolve(redirect.target)
+        try:
+            return os.open(path, REDIRECTIONS[redirect.kind], 0o666)
+        except OSError as e:
+            raise ValueError(f"could not open {path}: {e.strerror}")
+
+    def background(self, node: Union[CommandNode, PipelineNode]):
+        """
+        Start a command, or a pipeline, in the background
+        :param node: The command
+        """
+        if self.jobs is None:
+            # The event loop driving the jobs is only imported by the setups running commands in the background
+            from helpers.jobs import Jobs
+            self.jobs = Jobs(self.report)
+        if isinstance(node, PipelineNode):
+            self.jobs.call(partial(self.connect, node.commands))
+        elif node.redirects:
+            self.jobs.call(partial(self.connect, [node]))
+        else:
+            command, arguments = self.prepare(node.arguments)
+            self.jobs.start(command, self, arguments)
+
+    def schedule(self, steps: List[CommandNode]):
+        """
+        Run consecutive steps as a dependency graph
+        :param steps: The step nodes
+        :return: The exit code of the first step that failed, zero if none failed
+        """
+        try:
+            return Scheduler(self, self.workers, self.infer).run(steps)
+        except ValueError as e:
+            self.report(e)
+            return 1
+
+    def check_step(self, name: str, needs: List[str], command: List[str], pending=()):
+        """
+        Check that a step can run
+        :param name: The name of the step
+        :param needs: The names of the steps that must run before
+        :param command: The command of the step
+        :param pending: The names of the steps declared before, but that have not run yet
+        """
+        if not command:
+            raise ValueError(f"missing command for step {name}")
+        if name in self.steps or name in pending:
+            raise ValueError(f"step {name} already exists")
+        for need in needs:
+            if need not in self.steps and need not in pending:
+                raise ValueError(f"step {name} needs step {need} which is not declared before")
+
+    def run_step(self, name: str, command: List[str], reads: Iterable[str] = (), always: bool = False):
+        """
+        Run the command of a step, unless it already ran successfully with the same command and the same content of
+        the paths it reads, and the paths it creates still exist
+        :param name: The name of the step
+        :param command: The resolved command of the step
+        :param reads: The paths read by the command, relative to the working directory
+        :param always: Whether to run the step even if it already ran the same way
+        :return: The result of the command
+        """
+        if self.memo is None:
+            return self.execute(command)
+        found, arguments = self.find(command)
+        return self.memoize(name, f"Step {name}", command, found, arguments, reads, always)
+
+    def memoize(self, name: str, label: str, command: List[str], found: AbstractCommand, arguments: Mapping[str, str],
+                reads: Iterable[str] = (), always: bool = False):
+        """
+        Run a command recorded in the state of the directory, unless it already ran successfully with the same command
+        and the same content of the paths it reads, and the paths it creates still exist. A command running again
+        replaces the paths it created.
+        :param name: The name the command is recorded with
+        :param label: How the command is named when it is skipped
+        :param command: The resolved command
+        :param found: The command found
+        :param arguments: The parsed arguments of the command
+        :param reads: The paths read by the command, relative to the working directory
+        :param always: Whether to run the command even if it already ran the same way
+        :return: The result of the command
+        """
+        outputs = found.get_outputs(self, **arguments)
+        if always and not outputs:
+            return self.invoke(found, arguments)
+        inputs = [*(self.get_working_directory() / path for path in reads), *found.get_inputs(self, **arguments)]
+        key = self.memo.get_key(self.directory, command, inputs)
+        if not always and self.memo.is_done(name, key) and all(path.exists() for path in outputs):
+            print(f"{number(2)}{label} is up to date{reset()}")
+            return 0
+        if self.memo.has_run(name) and any(path.exists() for path in outputs):
+            arguments = found.get_replacing_arguments(**arguments)
+        result = self.invoke(found, arguments)
+        if result == 0:
+            self.memo.complete(name, key)
+        return result
+
+    def complete_step(self, name: str):
+        """
+        Record that a step ran successfully
+        :param name: The name of the step
+        """
+        self.steps.add(name)
+
+    def wait(self):
+        """
+        Wait for the commands running in the background
+        :return: The exit code of the first command that failed, zero if none failed
+        """
+        return 0 if self.jobs is None else self.jobs.wait()
+
+    def get_coprocess(self):
+        """
+        Get the persistent shell running the commands, starting it the first time
+        :return: The shell, None if the commands are not run in a persistent shell
+        """
+        if self.shell and self.coprocess is None:
+            self.coprocess = Coprocess.start(self.get_working_directory())
+            self.shell = self.coprocess is not None
+        return self.coprocess
+
+    def report(self, error: ValueError):
+        """
+        Report the error of a command
+        :param error: The error
+        """
+        print(f"{number(1)}{str(error).capitalize()}{reset()}", file=sys.stderr)
+
     def get_directory(self):
         """
         Get the directory
@@ -113,6 +409,13 @@ class Runner:
         """
         return self.directory
 
+    def get_working_directory(self):
+        """
+        Get the directory the commands run in
+        :return: The working directory
+        """
+        return self.working_directory
+
     def set_variable(self, name: str, value: str):
         """
         Set the value of a variable
@@ -127,21 +430,10 @@ class Runner:
         :param name: The name of the variable
         :return: The value of the variable
         """
-        if name.startswith('COLOR:'):
-            try:
-                return number(int(name[len('COLOR:'):]))
-            except ValueError:
-                pass
-
-            values = name[len('COLOR:'):].split(':')
-            if len(values) == 3:
-                try:
-                    return rgb(*(int(value) for value in values))
-                except ValueError:
-                    pass
-        elif name == 'RESET':
-            return reset()
-        elif name in self.variables:
+        color = get_color(name)
+        if color is not None:
+            return color
+        if not name.startswith('COLOR:') and name in self.variables:
             return self.variables[name]
         raise ValueError(f'variable {name} not found')
 
@@ -151,7 +443,4 @@ class Runner:
         :param argument: The argument to resolve
         :return: The resolved argument
         """
-
-        resolver = RunnerResolver(self)
-        argument.apply(resolver)
-        return resolver.result
+        return compile_word(argument)(self)
@@ -0,0 +1,200 @@
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Optional, Set, TYPE_CHECKING
+
+from helpers.output import capture
+from helpers.parsing.parser import Command as CommandNode
+from helpers.parsing.word import Word, Raw
+from helpers.trace import STEP_CATEGORY, span
+
+if TYPE_CHECKING:
+    from helpers.runner import Runner
+
+# The first word of a step
+STEP = Word([Raw('step')])
+
+
+def is_step(node):
+    """
+    Whether a node of a sequence is a step, without redirections
+    :param node: The node
+    :return: Whether the node is a step
+    """
+    return isinstance(node, CommandNode) and not node.redirects and bool(node.arguments) and node.arguments[0] == STEP
+
+
+def is_inside(path: str, directory: str):
+    """
+    Whether a path is a directory or inside it
+    :param path: The normalized path
+    :param directory: The normalized directory
+    :return: Whether the path is inside the directory
+    """
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+class ScheduledStep:
+    index: int
+    node: CommandNode
+    name: str
+    needs: List[str]
+    command: List[str]
+    reads: List[str]
+    always: bool
+    output: Optional[str]
+    dependencies: Set[int]
+    dependents: List[int]
+    priority: int
+
+    def __init__(self, index, node, name, needs, command, reads=(), always=False):
+        self.index = index
+        self.node = node
+        self.name = name
+        self.needs = needs
+        self.command = command
+        self.reads = list(reads)
+        self.always = always
+        self.output = None
+        self.dependencies = set()
+        self.dependents = []
+        self.priority = 1
+
+    def depends_on(self, other: 'ScheduledStep'):
+        """
+        Add a dependency
+        :param other: The step that must run before
+        """
+        if other.index not in self.dependencies:
+            self.dependencies.add(other.index)
+            other.dependents.append(self.index)
+
+
+class Scheduler:
+    """
+    Runs consecutive steps as a dependency graph
+
+    The steps run on a pool of workers, the ready step with the longest chain of steps after it first. The output of
+    each step is captured and printed in the order the steps are declared.
+    """
+    runner: 'Runner'
+    workers: int
+    infer: bool
+
+    def __init__(self, runner, workers, infer=False):
+        """
+        Create a scheduler
+        :param runner: The runner
+        :param workers: The maximum number of steps running at the same time
+        :param infer: Whether to infer the dependencies on the files copied by the file steps
+        """
+        self.runner = runner
+        self.workers = workers
+        self.infer = infer
+
+    def prepare(self, nodes: List[CommandNode]):
+        """
+        Resolve the steps and build their dependency graph
+        :param nodes: The step nodes
+        :return: The steps
+        """
+        steps = []
+        names = {}
+        for index, node in enumerate(nodes):
+            _, arguments = self.runner.prepare(node.arguments)
+            step = ScheduledStep(index, node, arguments['step'], arguments['needs'], arguments['command'],
+                                 arguments['reads'], arguments['always'])
+            self.runner.check_step(step.name, step.needs, step.command, names)
+            if step.command[0] == 'ask':
+                raise ValueError(f"step {step.name} cannot ask for input, as the output of the steps is captured")
+            for need in step.needs:
+                if need in names:
+                    step.depends_on(steps[names[need]])
+            names[step.name] = index
+            steps.append(step)
+
+        if self.infer:
+            self.infer_dependencies(steps)
+
+        for step in reversed(steps):
+            step.priority = 1 + max((steps[dependent].priority for dependent in step.dependents), default=0)
+        return steps
+
+    def infer_dependencies(self, steps: List[ScheduledStep]):
+        """
+        Make the steps using a path depend on the file steps creating it
+        :param steps: The steps
+        """
+        for step in steps:
+            if step.command[0] == 'file':
+                _, arguments = self.runner.find(step.command)
+                step.output = os.path.normpath(arguments['destination'] or arguments['file'])
+
+        for step in steps:
+            paths = [os.path.normpath(argument) for argument in step.command[1:]]
+            for other in steps[:step.index]:
+                if other.output is None:
+                    continue
+                if any(is_inside(path, other.output) for path in paths) or (
+                        step.output is not None and is_inside(other.output, step.output)):
+                    step.depends_on(other)
+
+    def execute(self, step: ScheduledStep):
+        """
+        Run a step, capturing its output
+        :param step: The step
+        :return: The exit code of the step and its output
+        """
+        header = ' '.join(str(argument) for argument in step.node.arguments)
+        with capture() as output, span(self.runner.tracer, header, STEP_CATEGORY) as args:
+            print('> ' + header)
+            result = self.runner.run_step(step.name, step.command, step.reads, step.always)
+            if args is not None:
+                args['exit'] = result
+        return result, output
+
+    def run(self, nodes: List[CommandNode]):
+        """
+        Run steps
+        :param nodes: The step nodes
+        :return: The exit code of the first step that failed in declaration order, zero if none failed
+        """
+        steps = self.prepare(nodes)
+        remaining = [len(step.dependencies) for step in steps]
+        ready = [(-step.priority, step.index) for step in steps if not step.dependencies]
+        heapq.heapify(ready)
+        results = {}
+        outputs = {}
+        printed = 0
+        failed = False
+
+        with ThreadPoolExecutor(self.workers) as executor:
+            running = {}
+            while ready or running:
+                while ready and not failed and len(running) < self.workers:
+                    _, index = heapq.heappop(ready)
+                    running[executor.submit(self.execute, steps[index])] = index
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    results[index], outputs[index] = future.result()
+                    if results[index] != 0:
+                        failed = True
+                        continue
+                    self.runner.complete_step(steps[index].name)
+                    for dependent in steps[index].dependents:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            heapq.heappush(ready, (-steps[dependent].priority, dependent))
+
+                while printed in outputs:
+                    outputs[printed].replay()
+                    printed += 1
+
+        for index in range(printed, len(steps)):
+            if index in outputs:
+                outputs[index].replay()
+        return next((results[index] for index in sorted(results) if results[index] != 0), 0)
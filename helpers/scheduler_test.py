@@ -0,0 +1,81 @@
+from io import StringIO
+
+import pytest
+
+from helpers.parsing.lexer import Lexer
+from helpers.parsing.lexer_error import LexerError
+from helpers.parsing.parser import Parser
+from helpers.runner import Runner
+from helpers.scheduler import Scheduler
+
+
+def parse(config: str):
+    return Parser(Lexer(StringIO(config))).parse()
+
+
+CONFIG = '''
+step first command sh -c "sleep 0.2; echo first"
+step second echo second
+step --needs first third echo third
+step --needs second --needs third fourth echo fourth
+'''
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_scheduler_output_order(tmp_path, capfd, workers):
+    assert Runner(tmp_path, workers).run(parse(CONFIG)) == 0
+    lines = [line for line in capfd.readouterr().out.splitlines() if not line.startswith('>')]
+    assert lines == ['first', 'second', 'third', 'fourth']
+
+
+def test_scheduler_priorities(tmp_path):
+    steps = Scheduler(Runner(tmp_path), 4).prepare(parse(CONFIG).commands)
+    assert [step.priority for step in steps] == [3, 2, 2, 1]
+    assert [sorted(step.dependencies) for step in steps] == [[], [], [0], [1, 2]]
+
+
+def test_scheduler_infer(tmp_path):
+    config = 'step copy file assets\nstep list command ls assets/sub\nstep other echo assets2\n'
+    steps = Scheduler(Runner(tmp_path), 4, infer=True).prepare(parse(config).commands)
+    assert [sorted(step.dependencies) for step in steps] == [[], [0], []]
+
+
+@pytest.mark.parametrize(['config', 'error'], [
+    pytest.param('step first echo 1\nstep first echo 2\n', 'step first already exists', id='duplicate'),
+    pytest.param('step --needs second first echo 1\nstep second echo 2\n',
+                 'step first needs step second which is not declared before', id='forward need'),
+    pytest.param('step first\n', 'missing command for step first', id='missing command'),
+])
+@pytest.mark.parametrize('workers', [1, 4])
+def test_scheduler_invalid(tmp_path, capfd, config, error, workers):
+    assert Runner(tmp_path, workers).run(parse(config)) == 1
+    assert error.capitalize() in capfd.readouterr().err
+
+
+def test_scheduler_ask(tmp_path, capfd):
+    config = 'step first echo 1\nstep second ask name "Name?"\n'
+    assert Runner(tmp_path, 4).run(parse(config)) == 1
+    out, err = capfd.readouterr()
+    assert 'Step second cannot ask for input' in err
+    assert 'Name?' not in out
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_scheduler_failure(tmp_path, capfd, workers):
+    config = 'step first command false\nstep --needs first second echo second\nstep third echo third\n'
+    assert Runner(tmp_path, workers).run(parse(config)) == 1
+    assert 'second' not in capfd.readouterr().out.splitlines()
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_scheduler_parse_error(tmp_path, capfd, workers):
+    config = 'step first echo 1\nstep second echo 2\necho "unterminated\n'
+    with pytest.raises(LexerError):
+        Runner(tmp_path, workers).stream(Parser(Lexer(StringIO(config))).parse_elements())
+    assert [line for line in capfd.readouterr().out.splitlines() if not line.startswith('>')] == ['1', '2']
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_scheduler_parse_error_failure(tmp_path, capfd, workers):
+    config = 'step first command false\nstep second echo 2\necho "unterminated\n'
+    assert Runner(tmp_path, workers).stream(Parser(Lexer(StringIO(config))).parse_elements()) == 1
@@ -1,38 +1,73 @@
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from io import StringIO
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
+from helpers import cache
 from helpers.colors import number, reset
-from helpers.parsing.lexer import Lexer
+from helpers.compiler import compile_sequence
+from helpers.lookup import CONFIG, get_setup
+from helpers.memo import Memo
+from helpers.output import prefix
+from helpers.parsing.lexer import Lexer, tokenize
 from helpers.parsing.lexer_error import LexerError
-from helpers.parsing.parser import Parser
+from helpers.parsing.compact import CompactSequence
+from helpers.parsing.parser import Parser, Sequence
 from helpers.parsing.parser_error import ParserError
+from helpers.parsing.word import Word, Raw
+from helpers.prefetch import prefetch
 from helpers.runner import Runner
+from helpers.trace import span
 
-# The directory containing the setups
-DIRECTORY = Path.home() / '.setups'
-# The name of a configuration file
-CONFIG = '.config.setup'
+# The first word of the command asking for input
+ASK = Word([Raw('ask')])
 
 
-def list_setups():
+class Memory:
     """
-    Yield each available setup
+    The abstract syntax trees of the configurations parsed by a long-lived process, replaced when their configuration
+    is modified
+
+    A tree is kept as long as the modification time and size of its configuration do not change, without reading the
+    configuration again. Nothing is kept unless enabled, as processes running a single setup do not need it. The
+    elements of a tree are compiled when it is kept, for the runs forked from the process to only run them.
     """
-    for subdirectory in DIRECTORY.iterdir():
-        if subdirectory.is_dir():
-            yield subdirectory.name
+    enabled: bool
+    entries: Dict[Path, Tuple[int, int, CompactSequence]]
 
+    def __init__(self):
+        self.enabled = False
+        self.entries = {}
+
+    def load(self, config: Path, stat) -> Optional[CompactSequence]:
+        """
+        Get the abstract syntax tree of a configuration
+        :param config: The path to the configuration
+        :param stat: The stat of the configuration
+        :return: The abstract syntax tree, None if it is not kept or the configuration was modified
+        """
+        entry = self.entries.get(config)
+        if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+            return None
+        return entry[2]
+
+    def store(self, config: Path, stat, ast: CompactSequence):
+        """
+        Keep the abstract syntax tree of a configuration and its compiled elements, if enabled
+        :param config: The path to the configuration
+        :param stat: The stat of the configuration when it was read
+        :param ast: The abstract syntax tree
+        """
+        if self.enabled:
+            ast.compiled = compile_sequence(ast)
+            self.entries[config] = (stat.st_mtime_ns, stat.st_size, ast)
 
-def get_setup(name):
-    """
-    Get the path to a setup
-    :param name: The name of the setup
-    :return: The path to the setup
-    """
-    subdirectory = DIRECTORY / name
-    if not subdirectory.is_dir():
-        raise ValueError(f"setup {name} does not exist")
-    return subdirectory
+
+# The abstract syntax trees kept in memory
+MEMORY = Memory()
 
 
 def read_configuration(name, subdirectory):
@@ -51,29 +86,195 @@ def read_configuration(name, subdirectory):
         raise ValueError(f"setup {name} does not contain a configuration file")
 
 
-def setup(name):
+def parse_elements(file, tokenize=tokenize, tracer=None):
+    """
+    Parse the elements of a configuration
+    :param file: The configuration file
+    :param tokenize: The function splitting each line into tokens
+    :param tracer: The tracer recording the time spent lexing each line and parsing each element, None if not tracing
+    :return: The elements of the abstract syntax tree
+    """
+    if tracer is None:
+        return Parser(Lexer(file, tokenize)).parse_elements()
+    return tracer.iterate(Parser(Lexer(file, tracer.wrap(tokenize, 'lex', 'lexer'))).parse_elements(), 'parse',
+                          'parser')
+
+
+def parse_configuration(config, use_cache=True, tracer=None):
+    """
+    Parse a configuration, using the cached abstract syntax tree when it is up to date, and otherwise the cached tokens
+    of the lines that did not change
+    :param config: The path to the configuration
+    :param use_cache: Whether to read and write the cache
+    :param tracer: The tracer recording the time spent parsing the configuration, None if not tracing
+    :return: The abstract syntax tree
+    """
+    if not use_cache:
+        return CompactSequence(parse_elements(StringIO(config.read_text()), tracer=tracer))
+
+    stat = config.stat()
+    ast = MEMORY.load(config, stat)
+    if ast is not None:
+        return ast
+    content = config.read_bytes()
+    with span(tracer, 'load', 'cache'):
+        ast = cache.load(config, stat, content)
+    if ast is not None:
+        MEMORY.store(config, stat, ast)
+        return ast
+
+    lines = cache.load_lines(config)
+    complete = False
+    try:
+        ast = CompactSequence(parse_elements(StringIO(content.decode()), lines, tracer))
+        complete = True
+    finally:
+        cache.store_lines(config, lines, complete)
+    cache.store(config, stat, content, ast)
+    MEMORY.store(config, stat, ast)
+    return ast
+
+
+def stream_configuration(config, use_cache=True, tracer=None):
+    """
+    Parse a configuration on another thread, yielding each element of the abstract syntax tree as soon as it is parsed
+    :param config: The path to the configuration
+    :param use_cache: Whether to read and write the cache, the whole tree is kept in memory to be cached if so
+    :param tracer: The tracer recording the time spent parsing the configuration, None if not tracing
+    :return: The elements of the abstract syntax tree, already compiled when it is kept in memory
+    """
+    if not use_cache:
+        with config.open() as f:
+            yield from prefetch(parse_elements(f, tracer=tracer))
+        return
+
+    stat = config.stat()
+    ast = MEMORY.load(config, stat)
+    if ast is not None:
+        yield from ast.compiled
+        return
+    content = config.read_bytes()
+    with span(tracer, 'load', 'cache'):
+        ast = cache.load(config, stat, content)
+    if ast is not None:
+        MEMORY.store(config, stat, ast)
+        yield from ast.commands if ast.compiled is None else ast.compiled
+        return
+
+    ast = CompactSequence()
+    lines = cache.load_lines(config)
+    complete = False
+    try:
+        with closing(prefetch(parse_elements(StringIO(content.decode()), lines, tracer))) as elements:
+            for element in elements:
+                ast.append(element)
+                yield element
+        complete = True
+    finally:
+        cache.store_lines(config, lines, complete)
+    cache.store(config, stat, content, ast)
+    MEMORY.store(config, stat, ast)
+
+
+def report(error: Exception):
+    """
+    Report an error of the configuration
+    :param error: The lexer or parser error
+    :return: The exit code: 1 if lexer error, 2 if parser error
+    """
+    if isinstance(error, LexerError):
+        print(f"{number(1)}{str(error.error).capitalize()}{reset()} on line:", file=sys.stderr)
+        print(error.line, file=sys.stderr)
+        return 1
+    print(f"{number(1)}{str(error.error).capitalize()}{reset()} on token:", file=sys.stderr)
+    print(repr(error.token), file=sys.stderr)
+    return 2
+
+
+def setup(name, use_cache=True, workers=1, infer=False, shell=False, validate_first=False, tracer=None,
+          directory=None, force=False):
     """
     Setup a setup
     :param name: The name of the setup
+    :param use_cache: Whether to use the cached abstract syntax tree
+    :param workers: The maximum number of steps running at the same time
+    :param infer: Whether to infer the dependencies of the steps on the files copied
+    :param shell: Whether to run the commands in a persistent shell
+    :param validate_first: Whether to parse the whole configuration before running it, instead of running each command
+                           as soon as it is parsed
+    :param tracer: The tracer recording the time spent parsing and running the configuration, None if not tracing
+    :param directory: Where to run the setup, the current directory if None
+    :param force: Whether to run the steps which already ran the same way in the directory
     :return: The exit code
     """
     subdirectory = get_setup(name)
-    config = subdirectory / '.config.setup'
+    config = subdirectory / CONFIG
+
+    directory = Path.cwd() if directory is None else directory
+    runner = Runner(subdirectory, workers, infer, shell, tracer, directory, Memo(directory, force))
+    try:
+        if validate_first:
+            exit = runner.run(parse_configuration(config, use_cache, tracer))
+        else:
+            with closing(stream_configuration(config, use_cache, tracer)) as elements:
+                exit = runner.stream(elements)
+    except (LexerError, ParserError) as e:
+        return report(e)
 
-    with config.open() as file:
-        lexer = Lexer(file)
-        parser = Parser(lexer)
-        try:
-            ast = parser.parse()
-        except LexerError as e:
-            print(f"{number(1)}{str(e.error).capitalize()}{reset()} on line:", file=sys.stderr)
-            print(e.line, file=sys.stderr)
-            return 1
-        except ParserError as e:
-            print(f"{number(1)}{str(e.error).capitalize()}{reset()} on token:", file=sys.stderr)
-            print(repr(e.token), file=sys.stderr)
-            return 2
-
-    runner = Runner(subdirectory)
-    exit = runner.run(ast)
     return 0 if exit == 0 else exit + 2
+
+
+def asks(ast: Sequence):
+    """
+    Whether a configuration asks for input outside of its steps
+    :param ast: The abstract syntax tree of the configuration
+    :return: Whether one of its commands is ask
+    """
+    for element in ast.commands:
+        element = getattr(element, 'command', element)
+        if any(command.arguments[:1] == [ASK] for command in getattr(element, 'commands', [element])):
+            return True
+    return False
+
+
+def setup_all(name, directories, jobs=1, use_cache=True, infer=False, shell=False, tracer=None, force=False):
+    """
+    Setup a setup in several directories at the same time, each line of output being prefixed by its directory
+    :param name: The name of the setup
+    :param directories: Where to run the setup
+    :param jobs: The maximum number of directories set up at the same time
+    :param use_cache: Whether to use the cached abstract syntax tree
+    :param infer: Whether to infer the dependencies of the steps on the files copied
+    :param shell: Whether to run the commands in a persistent shell
+    :param tracer: The tracer recording the time spent parsing and running the configuration, None if not tracing
+    :param force: Whether to run the steps which already ran the same way in the directories
+    :return: The exit code of the first directory that failed, in the order given, 0 if all succeeded
+    """
+    if len(directories) > 1 and shell:
+        print(f"{number(1)}The commands cannot run in a persistent shell in several directories at once{reset()}",
+              file=sys.stderr)
+        return 3
+    subdirectory = get_setup(name)
+    try:
+        ast = parse_configuration(subdirectory / CONFIG, use_cache, tracer)
+    except (LexerError, ParserError) as e:
+        return report(e)
+    if len(directories) > 1 and asks(ast):
+        print(f"{number(1)}Setup {name} asks for input, it cannot run in several directories at once{reset()}",
+              file=sys.stderr)
+        return 3
+    if ast.compiled is None:
+        # The elements are compiled once for all the directories
+        ast.compiled = compile_sequence(ast)
+
+    def run(directory: Path):
+        with prefix(f"{number(6)}[{os.path.relpath(directory)}]{reset()} "):
+            exit = Runner(subdirectory, 1, infer, shell, tracer, directory, Memo(directory, force)).run(ast)
+        return 0 if exit == 0 else exit + 2
+
+    with ThreadPoolExecutor(jobs, thread_name_prefix='target') as executor:
+        exits = list(executor.map(run, directories))
+    for directory, exit in zip(directories, exits):
+        if exit != 0:
+            print(f"{number(1)}{os.path.relpath(directory)}{reset()} failed with exit code {exit}", file=sys.stderr)
+    return next((exit for exit in exits if exit != 0), 0)
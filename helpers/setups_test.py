@@ -0,0 +1,109 @@
+import pickle
+import re
+
+import pytest
+
+from helpers import cache, compiler, setups
+from helpers.setups import Memory, parse_configuration, setup, setup_all
+
+# The escape sequences of the colors
+COLORS = re.compile(r'\033\[[0-9;]*m')
+
+
+def test_setup_directory(tmp_path, monkeypatch, capfd):
+    monkeypatch.setenv('SETUPS_PATH', str(tmp_path / 'setups'))
+    (tmp_path / 'setups' / 'touch').mkdir(parents=True)
+    (tmp_path / 'setups' / 'touch' / '.config.setup').write_text('command touch created\ncommand echo done > log\n')
+    (tmp_path / 'target').mkdir()
+    assert setup('touch', use_cache=False, directory=tmp_path / 'target') == 0
+    assert (tmp_path / 'target' / 'created').exists()
+    assert (tmp_path / 'target' / 'log').read_text() == 'done\n'
+    assert not (tmp_path / 'created').exists()
+
+
+def test_setup_all(tmp_path, monkeypatch, capfd):
+    monkeypatch.setenv('SETUPS_PATH', str(tmp_path / 'setups'))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'setups' / 'check').mkdir(parents=True)
+    (tmp_path / 'setups' / 'check' / '.config.setup').write_text('echo "checking"\ncommand test -e marker\n')
+    directories = [tmp_path / name for name in ['first', 'second', 'third']]
+    for directory in directories:
+        directory.mkdir()
+    (tmp_path / 'first' / 'marker').touch()
+    (tmp_path / 'third' / 'marker').touch()
+    assert setup_all('check', directories, jobs=2, use_cache=False) == 3
+    out, err = capfd.readouterr()
+    lines = [line for line in COLORS.sub('', out).splitlines() if '] > ' not in line]
+    assert sorted(lines) == ['[first] checking', '[second] checking', '[third] checking']
+    assert 'second failed with exit code 3' in COLORS.sub('', err)
+    assert 'first failed' not in COLORS.sub('', err)
+
+
+def test_setup_all_ask(tmp_path, monkeypatch, capfd):
+    monkeypatch.setenv('SETUPS_PATH', str(tmp_path / 'setups'))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'setups' / 'greet').mkdir(parents=True)
+    config = tmp_path / 'setups' / 'greet' / '.config.setup'
+    directories = [tmp_path / 'first', tmp_path / 'second']
+    for directory in directories:
+        directory.mkdir()
+
+    config.write_text('echo "start"\nask name "Name?"\n')
+    assert setup_all('greet', directories, use_cache=False) == 3
+    out, err = capfd.readouterr()
+    assert 'start' not in out
+    assert 'Setup greet asks for input' in err
+
+    config.write_text('step greet ask name "Name?"\n')
+    assert setup_all('greet', directories, use_cache=False) == 3
+    out, err = capfd.readouterr()
+    assert 'Name?' not in out.replace('> step greet ask name "Name?"', '')
+    assert 'Cannot ask for input while the output is captured' in COLORS.sub('', err)
+
+
+def test_setup_all_processes(tmp_path, monkeypatch, capfd):
+    monkeypatch.setenv('SETUPS_PATH', str(tmp_path / 'setups'))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'setups' / 'processes').mkdir(parents=True)
+    (tmp_path / 'setups' / 'processes' / '.config.setup').write_text(
+        'command echo piped | command cat\ncommand echo background &\necho builtin &\n'
+        'command sh -c "echo redirected >&2" > log\ncommand sh -c "echo error >&2; printf partial"\n')
+    directories = [tmp_path / 'first', tmp_path / 'second']
+    for directory in directories:
+        directory.mkdir()
+    assert setup_all('processes', directories, use_cache=False) == 0
+    out, err = capfd.readouterr()
+    for directory in ['first', 'second']:
+        lines = [line for line in COLORS.sub('', out).splitlines() if '] > ' not in line]
+        assert sorted(line for line in lines if line.startswith(f'[{directory}] ')) == [
+            f'[{directory}] background', f'[{directory}] builtin', f'[{directory}] partial', f'[{directory}] piped']
+        assert f'[{directory}] error' in COLORS.sub('', err)
+        assert f'[{directory}] redirected' in COLORS.sub('', err)
+    assert all(line.startswith('[') for line in COLORS.sub('', out + err).splitlines())
+
+    assert setup_all('processes', directories, use_cache=False, shell=True) == 3
+    assert 'persistent shell in several directories' in capfd.readouterr().err
+
+
+@pytest.mark.parametrize('validate_first', [False, True])
+def test_setup_memory_compiled(tmp_path, monkeypatch, capfd, validate_first):
+    monkeypatch.setenv('SETUPS_PATH', str(tmp_path / 'setups'))
+    monkeypatch.setattr(cache, 'DIRECTORY', tmp_path / 'cache')
+    monkeypatch.setattr(setups, 'MEMORY', Memory())
+    setups.MEMORY.enabled = True
+    (tmp_path / 'setups' / 'hello').mkdir(parents=True)
+    config = tmp_path / 'setups' / 'hello' / '.config.setup'
+    config.write_text('echo hello\ncommand touch created &\n')
+    ast = parse_configuration(config)
+    assert [element.description for element in ast.compiled] == ['echo hello', 'command touch created &']
+    assert pickle.loads(pickle.dumps(ast)).compiled is None
+
+    def compile_element(element, description=None):
+        raise AssertionError(f"{description} compiled again")
+
+    monkeypatch.setattr(compiler, 'compile_element', compile_element)
+    for directory in ['first', 'second']:
+        (tmp_path / directory).mkdir()
+        assert setup('hello', validate_first=validate_first, directory=tmp_path / directory) == 0
+        assert (tmp_path / directory / 'created').exists()
+    assert capfd.readouterr().out.count('hello\n') == 4
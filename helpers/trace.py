@@ -0,0 +1,160 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from subprocess import Popen
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+# The context of the spans that are not recorded
+UNTRACED = nullcontext()
+# The category of the spans of the elements of a configuration
+STEP_CATEGORY = 'step'
+# The number of bytes of the unit of the maximum resident set size reported by the system
+RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+class Tracer:
+    """
+    Records spans of time, written as Chrome trace events to be viewed in chrome://tracing or Perfetto
+
+    The spans of each thread are nested, the resources used by the processes waited for during a span are added to the
+    span and to the spans containing it.
+    """
+    events: List[Dict[str, Any]]
+    start: float
+    pid: int
+    local: threading.local
+
+    def __init__(self):
+        self.events = []
+        self.start = time.perf_counter()
+        self.pid = os.getpid()
+        self.local = threading.local()
+
+    def get_stack(self):
+        """
+        Get the spans open on the current thread, naming the thread in the trace the first time
+        :return: The arguments of the spans, from the outermost
+        """
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+            self.events.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': threading.get_ident(),
+                                'args': {'name': threading.current_thread().name}})
+        return stack
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        """
+        Record a span
+        :param name: The name of the span
+        :param category: The category of the span
+        :param args: The arguments shown with the span
+        :return: The arguments of the span, which can be completed until it ends
+        """
+        stack = self.get_stack()
+        stack.append(args)
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            self.events.append({'name': name, 'cat': category, 'ph': 'X', 'ts': (start - self.start) * 1e6,
+                                'dur': (end - start) * 1e6, 'pid': self.pid, 'tid': threading.get_ident(),
+                                'args': args})
+
+    def wrap(self, function: Callable[..., T], name: str, category: str) -> Callable[..., T]:
+        """
+        Record a span for each call of a function
+        :param function: The function
+        :param name: The name of the spans
+        :param category: The category of the spans
+        :return: The function recording the spans
+        """
+        def wrapper(*args, **kwargs):
+            with self.span(name, category):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def iterate(self, items: Iterable[T], name: str, category: str) -> Iterator[T]:
+        """
+        Record a span for the production of each item
+        :param items: The items
+        :param name: The name of the spans
+        :param category: The category of the spans
+        :return: The items
+        """
+        iterator = iter(items)
+        while True:
+            with self.span(name, category):
+                item = next(iterator, StopIteration)
+            if item is StopIteration:
+                return
+            yield item
+
+    def record_usage(self, usage):
+        """
+        Add the resources used by a process to the spans open on the current thread
+        :param usage: The resource usage of the process, as returned by os.wait4
+        """
+        for args in self.get_stack():
+            args['user'] = args.get('user', 0) + usage.ru_utime
+            args['system'] = args.get('system', 0) + usage.ru_stime
+            args['max_rss'] = max(args.get('max_rss', 0), usage.ru_maxrss * RSS_UNIT)
+
+    def write(self, path: Path):
+        """
+        Write the trace
+        :param path: The path to the trace file
+        """
+        path.write_text(json.dumps({'traceEvents': self.events, 'displayTimeUnit': 'ms'}))
+
+    def summary(self, count: int = 10):
+        """
+        Summarize the slowest elements of the configuration
+        :param count: The maximum number of elements listed
+        :return: The table of the elements, from the slowest
+        """
+        steps = [event for event in self.events if event.get('cat') == STEP_CATEGORY]
+        steps.sort(key=lambda event: -event['dur'])
+        lines = [f"{'time':>10} {'cpu':>10} {'max rss':>10}  step"]
+        for event in steps[:count]:
+            args = event['args']
+            cpu = f"{args['user'] + args['system']:.3f}s" if 'user' in args else '-'
+            rss = f"{args['max_rss'] / 2 ** 20:.1f}M" if 'max_rss' in args else '-'
+            lines.append(f"{event['dur'] / 1e6:>9.3f}s {cpu:>10} {rss:>10}  {event['name']}")
+        return '\n'.join(lines)
+
+
+def span(tracer: Optional[Tracer], name: str, category: str, **args):
+    """
+    Record a span if tracing
+    :param tracer: The tracer, None if not tracing
+    :param name: The name of the span
+    :param category: The category of the span
+    :param args: The arguments shown with the span
+    :return: The context of the span
+    """
+    return UNTRACED if tracer is None else tracer.span(name, category, **args)
+
+
+def wait(process: Popen, tracer: Optional[Tracer]):
+    """
+    Wait for a process, recording the resources it used if tracing
+    :param process: The process
+    :param tracer: The tracer, None if not tracing
+    :return: The exit code of the process
+    """
+    if tracer is None or process.returncode is not None:
+        return process.wait()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    tracer.record_usage(usage)
+    return process.returncode
+
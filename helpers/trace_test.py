@@ -0,0 +1,41 @@
+import json
+import sys
+from io import StringIO
+from subprocess import Popen
+
+from helpers.parsing.lexer import Lexer
+from helpers.parsing.parser import Parser
+from helpers.runner import Runner
+from helpers.trace import Tracer, wait
+
+
+def test_tracer_spans(tmp_path):
+    tracer = Tracer()
+    with tracer.span('outer', 'step') as args:
+        args['exit'] = 0
+        assert list(tracer.iterate([1, 2], 'inner', 'parser')) == [1, 2]
+    path = tmp_path / 'trace.json'
+    tracer.write(path)
+    events = json.loads(path.read_text())['traceEvents']
+    assert [event['name'] for event in events if event['ph'] == 'X'] == ['inner', 'inner', 'inner', 'outer']
+    outer = events[-1]
+    assert outer['cat'] == 'step' and outer['args'] == {'exit': 0}
+    assert all(outer['ts'] <= event['ts'] and event['dur'] <= outer['dur'] for event in events if event['ph'] == 'X')
+
+
+def test_tracer_usage():
+    tracer = Tracer()
+    with tracer.span('command', 'step') as args:
+        process = Popen([sys.executable, '-c', 'x = bytearray(2 ** 25)'])
+        assert wait(process, tracer) == 0
+    assert args['user'] + args['system'] > 0
+    assert args['max_rss'] > 2 ** 25
+    assert 'command' in tracer.summary()
+
+
+def test_tracer_background_usage(tmp_path):
+    tracer = Tracer()
+    config = f'command {sys.executable} -c "x = bytearray(2 ** 25)" &\nwait'
+    assert Runner(tmp_path, tracer=tracer).run(Parser(Lexer(StringIO(config))).parse()) == 0
+    [args] = [event['args'] for event in tracer.events if event.get('cat') == 'execute' and 'max_rss' in event['args']]
+    assert args['max_rss'] > 2 ** 25
@@ -0,0 +1,17 @@
+import pytest
+
+from benchmarks.startup import STARTUPS, get_startup_time
+
+# The modules that must not be imported to describe the commands or to list the setups
+HEAVY = ['helpers.runner', 'helpers.setups', 'helpers.cache', 'helpers.commands.command', 'asyncio', 'subprocess']
+# The time the modules imported by the script can take to import, in seconds, generous next to the budget of the
+# startup benchmarks for slow machines
+BUDGET = 0.3
+
+
+@pytest.mark.parametrize('arguments', STARTUPS.values(), ids=STARTUPS.keys())
+def test_script_startup(arguments, tmp_path):
+    (tmp_path / '.setups').mkdir()
+    duration, imports = get_startup_time(arguments, tmp_path)
+    assert [module for module in HEAVY if module in imports] == []
+    assert duration < BUDGET